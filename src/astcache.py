@@ -0,0 +1,408 @@
+"""
+This module contains an on-disk cache of parsed Markdown documents.
+
+Parsing is the most expensive part of rendering a page. When a page has to be
+regenerated but its source did not change, such as after the template was
+edited or in a full rebuild, the ASTCache loads the document's tree of
+HTMLNodes from disk instead of parsing the document again.
+
+Every tree is stored in its own file, named after the hash of the document's
+source and the parser version (`blocks.PARSER_VERSION`), so a changed document
+or parser never loads a stale tree. A file starts with a header holding a magic
+number, the format version, the length of the payload and its CRC-32, and the
+payload is the tree encoded as nested tuples with `marshal`. Files whose header
+or payload do not check out are treated as missing and removed.
+
+The cache is bounded by the total size of its files, and evicts the least
+recently used trees first. Recency is kept in the modification time of the
+files, so it survives between builds.
+"""
+import marshal
+import os
+import struct
+import tempfile
+import zlib
+from collections import OrderedDict
+from blocks import PARSER_VERSION, markdown_to_html_node
+from htmlnode import HTMLNode, LeafNode, ParentNode
+from inlinecache import InlineCache
+from manifest import content_digest
+from textnode import InlineNode, TextNode, TextType
+
+MAGIC: bytes = b"SSGT"
+# Changing how trees are encoded requires a new format version.
+FORMAT_VERSION: int = 1
+SUFFIX: str = ".ast"
+
+# The magic number, format version, payload length and payload CRC-32.
+_HEADER: struct.Struct = struct.Struct("<4sHxxII")
+
+# The kinds of encoded nodes.
+_PARENT: int = 0
+_INLINE: int = 1
+_LEAF: int = 2
+
+# Looking a TextType up by its value is much faster than calling TextType.
+_TEXT_TYPES: dict[str, TextType] = {text_type.value: text_type for text_type in TextType}
+
+# An encoded node: its kind, followed by the fields of that kind of node.
+EncodedNode = tuple
+
+
+def encode_tree(node: HTMLNode) -> EncodedNode:
+    """
+    Encodes a tree of HTMLNodes as nested tuples of strings, which `marshal`
+    can store compactly.
+
+    :param node: The root of the tree.
+    :return: The encoded tree.
+    :raise: TypeError if the tree holds a node that cannot be encoded.
+    """
+    if not isinstance(node, (LeafNode, ParentNode)):
+        raise TypeError(f"Cannot encode a {type(node).__name__}.")
+
+    props: tuple[tuple[str, str], ...] | None = None if node.props is None else tuple(node.props.items())
+
+    if isinstance(node, InlineNode):
+        text_nodes: tuple = tuple((text.text, text.text_type.value, text.url) for text in node.text_nodes)
+        return _INLINE, node.tag, props, text_nodes
+    if isinstance(node, LeafNode):
+        return _LEAF, node.tag, node.value, props
+
+    return _PARENT, node.tag, props, tuple(encode_tree(child) for child in node.children)
+
+
+def decode_tree(encoded: EncodedNode) -> HTMLNode:
+    """
+    Rebuilds a tree of HTMLNodes from the output of `encode_tree`.
+
+    :param encoded: The encoded tree.
+    :return: The root of the tree.
+    :raise: ValueError if the encoded tree is malformed.
+    """
+    try:
+        kind, tag = encoded[0], encoded[1]
+
+        if kind == _INLINE:
+            text_nodes: list[TextNode] = [
+                TextNode(text, _TEXT_TYPES[text_type], url) for text, text_type, url in encoded[3]
+            ]
+            return InlineNode(tag, text_nodes, _decode_props(encoded[2]))
+        if kind == _LEAF:
+            return LeafNode(tag, encoded[2], _decode_props(encoded[3]))
+        if kind == _PARENT:
+            return ParentNode(tag, [decode_tree(child) for child in encoded[3]], _decode_props(encoded[2]))
+    except (IndexError, KeyError, TypeError) as error:
+        raise ValueError(f"Malformed tree: {error}") from error
+
+    raise ValueError(f"Malformed tree: unknown node kind {kind!r}")
+
+
+def dump_tree(node: HTMLNode) -> bytes:
+    """
+    Serializes a tree of HTMLNodes with a header for detecting corruption.
+
+    :param node: The root of the tree.
+    :return: The header followed by the encoded tree.
+    :raise: TypeError if the tree holds a node that cannot be encoded.
+    """
+    payload: bytes = marshal.dumps(encode_tree(node))
+
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, len(payload), zlib.crc32(payload)) + payload
+
+
+def load_tree(data: bytes) -> HTMLNode:
+    """
+    Deserializes a tree of HTMLNodes written by `dump_tree`.
+
+    :param data: The header followed by the encoded tree.
+    :return: The root of the tree.
+    :raise: ValueError if the data is truncated, corrupted or of another
+        format version.
+    """
+    if len(data) < _HEADER.size:
+        raise ValueError("Truncated tree header.")
+
+    magic, version, length, checksum = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a serialized tree.")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported tree format version {version}.")
+
+    payload: memoryview = memoryview(data)[_HEADER.size:]
+    if len(payload) != length or zlib.crc32(payload) != checksum:
+        raise ValueError("Corrupted tree payload.")
+
+    try:
+        encoded: EncodedNode = marshal.loads(payload)
+    except (EOFError, TypeError, ValueError) as error:
+        raise ValueError(f"Corrupted tree payload: {error}") from error
+
+    return decode_tree(encoded)
+
+
+class ASTCache:
+    """
+    Stores the parsed trees of Markdown documents in a directory, so documents
+    that were parsed by an earlier build are not parsed again.
+    """
+
+    __slots__ = ("directory", "_max_bytes", "hits", "misses", "corrupt", "evictions", "_entries", "_size")
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024) -> None:
+        """
+        Instantiates an ASTCache, picking up the trees already stored in its
+        directory.
+
+        :param directory: The directory the trees are stored in. It is created
+            when the first tree is stored.
+        :param max_bytes: The most bytes of trees kept in the directory.
+        :raise: ValueError if `max_bytes` is less than one.
+        """
+        self.directory: str = directory
+        self._max_bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.corrupt: int = 0
+        self.evictions: int = 0
+        # The size of every stored tree, from the least to the most recently used.
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._size: int = 0
+
+        self._scan()
+        self.max_bytes = max_bytes
+
+    @property
+    def max_bytes(self) -> int:
+        """
+        The most bytes of trees kept in the directory.
+        """
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes: int) -> None:
+        """
+        Changes the capacity of the cache, evicting the least recently used
+        trees if it shrinks below the size of the stored trees.
+
+        :param max_bytes: The new capacity.
+        :raise: ValueError if `max_bytes` is less than one.
+        """
+        if max_bytes < 1:
+            raise ValueError(f"The cache must hold at least 1 byte, not {max_bytes}.")
+
+        self._max_bytes = max_bytes
+        self._evict()
+
+    @staticmethod
+    def key(markdown: str) -> str:
+        """
+        Finds the key a document's tree is stored under.
+
+        :param markdown: The Markdown document.
+        :return: The hex digest of the document and the parser version.
+        """
+        return content_digest(PARSER_VERSION.encode(), markdown.encode("utf-8"))
+
+    def parse(self, markdown: str, inline_cache: InlineCache = None) -> ParentNode:
+        """
+        Converts a Markdown document into a tree of HTMLNodes, the same as
+        `markdown_to_html_node`, loading the tree if it is stored and storing
+        it if it is not.
+
+        :param markdown: The Markdown document.
+        :param inline_cache: A cache of parsed inline Markdown used when the
+            document is parsed, if any.
+        :return: A `div` element holding an element for every block.
+        :raise: ValueError in the cases where a delimiter is not closed.
+        """
+        key: str = self.key(markdown)
+
+        node: HTMLNode | None = self.load(key)
+        if node is None:
+            node = markdown_to_html_node(markdown, inline_cache)
+            self.store(key, node)
+
+        return node
+
+    def load(self, key: str) -> HTMLNode | None:
+        """
+        Loads a stored tree. A tree that is corrupted is removed.
+
+        :param key: The key returned by `key`.
+        :return: The tree, or None if it is not stored.
+        """
+        path: str = self._path(key)
+
+        try:
+            with open(path, "rb") as file:
+                data: bytes = file.read()
+        except OSError:
+            self.misses += 1
+            self._forget(key)
+            return None
+
+        try:
+            node: HTMLNode = load_tree(data)
+        except ValueError:
+            self.misses += 1
+            self.corrupt += 1
+            self._remove(key)
+            return None
+
+        self.hits += 1
+        self._touch(key, path, len(data))
+
+        return node
+
+    def store(self, key: str, node: HTMLNode) -> bool:
+        """
+        Stores a tree, evicting the least recently used trees to make room for
+        it. The file is replaced atomically, so a reader never sees a partly
+        written tree.
+
+        :param key: The key returned by `key`.
+        :param node: The tree to store.
+        :return: Whether the tree was stored. Trees larger than the whole cache
+            are not.
+        """
+        data: bytes = dump_tree(node)
+        if len(data) > self._max_bytes:
+            return False
+
+        os.makedirs(self.directory, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(data)
+            os.replace(temporary, self._path(key))
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+        self._forget(key)
+        self._entries[key] = len(data)
+        self._size += len(data)
+        self._evict()
+
+        return True
+
+    def stats(self) -> dict[str, int]:
+        """
+        Reports how well the cache is working.
+
+        :return: The hits, misses, corrupted trees, evictions, current number
+            of trees, their total size and the capacity.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "corrupt": self.corrupt,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self._max_bytes,
+        }
+
+    def clear(self) -> None:
+        """
+        Removes every stored tree and resets the counters.
+        """
+        for key in list(self._entries):
+            self._remove(key)
+
+        self.hits = self.misses = self.corrupt = self.evictions = 0
+
+    def _path(self, key: str) -> str:
+        """
+        Finds the file a tree is stored in.
+
+        :param key: The key of the tree.
+        :return: The path of the file.
+        """
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def _scan(self) -> None:
+        """
+        Records the trees stored in the directory, ordered by the time they
+        were last used.
+        """
+        try:
+            names: list[str] = os.listdir(self.directory)
+        except OSError:
+            return
+
+        found: list[tuple[int, str, int]] = []
+        for name in names:
+            if not name.endswith(SUFFIX):
+                continue
+            try:
+                stat: os.stat_result = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            found.append((stat.st_mtime_ns, name[:-len(SUFFIX)], stat.st_size))
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._size += size
+
+    def _touch(self, key: str, path: str, size: int) -> None:
+        """
+        Marks a tree as the most recently used, in memory and on disk.
+
+        :param key: The key of the tree.
+        :param path: The file the tree is stored in.
+        :param size: The size of the file.
+        """
+        self._forget(key)
+        self._entries[key] = size
+        self._size += size
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _forget(self, key: str) -> None:
+        """
+        Stops accounting for a tree, without removing its file.
+
+        :param key: The key of the tree.
+        """
+        size: int | None = self._entries.pop(key, None)
+        if size is not None:
+            self._size -= size
+
+    def _remove(self, key: str) -> None:
+        """
+        Removes a tree. A file that was already removed, such as by another
+        process sharing the directory, is ignored.
+
+        :param key: The key of the tree.
+        """
+        self._forget(key)
+
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> None:
+        """
+        Evicts the least recently used trees until the cache is within its
+        capacity.
+        """
+        while self._size > self._max_bytes and self._entries:
+            key: str = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+
+def _decode_props(props: tuple[tuple[str, str], ...] | None) -> dict[str, str] | None:
+    """
+    Rebuilds the attributes of a node from their encoded form.
+
+    :param props: The attributes as key-value pairs, or None.
+    :return: The attributes, or None if the node has none.
+    """
+    return None if props is None else dict(props)
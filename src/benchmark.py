@@ -0,0 +1,963 @@
+"""
+This module contains benchmarks for the static site generator.
+
+Run it from the repository root with `./bench.sh` (or `python3 src/benchmark.py`).
+Every benchmark in `BENCHMARKS` times one hot path of the generator on a
+synthetic corpus whose size is set with `--size`, and reports the operations
+per second and the peak memory allocated by a single operation. The functions
+in `REPORTS` measure properties that are not a single operation, such as the
+memory of each node class or the speedup of parallel builds.
+
+Results can be written as JSON with `--json` and compared against an earlier
+run with `--compare` to catch regressions between versions.
+"""
+import argparse
+import html
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterator
+from astcache import dump_tree, load_tree
+from blocks import markdown_to_html_node
+from build import build_site, find_sources, write_listings
+from htmlnode import HTMLNode, LeafNode, ParentNode, escape_value
+from inlinecache import InlineCache
+from markdown import (
+    _IMAGE_PATTERN, _LINK_PATTERN, extract_markdown_images, extract_markdown_links, split_node_delimiter,
+    split_nodes_images, split_nodes_link, text_to_textnodes
+)
+from output import OutputWriter
+from profiling import peak_rss
+from rendercache import RenderCache
+from textnode import TextNode, TextType, text_node_to_html_node, text_nodes_to_html
+
+# A benchmark takes the size of the corpus and returns the operation to time.
+Benchmark = Callable[[int], Callable[[], Any]]
+# A report takes the size of the corpus and returns its results.
+Report = Callable[[int], dict]
+
+BENCHMARKS: dict[str, Benchmark] = {}
+REPORTS: dict[str, Report] = {}
+
+
+def benchmark(name: str) -> Callable[[Benchmark], Benchmark]:
+    """
+    Registers a function as a benchmark.
+
+    :param name: The name of the benchmark in the results.
+    :return: A decorator that registers the function under `name`.
+    """
+    def register(function: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = function
+        return function
+
+    return register
+
+
+def report(name: str) -> Callable[[Report], Report]:
+    """
+    Registers a function as a report.
+
+    :param name: The name of the report in the results.
+    :return: A decorator that registers the function under `name`.
+    """
+    def register(function: Report) -> Report:
+        REPORTS[name] = function
+        return function
+
+    return register
+
+
+def measure(operation: Callable[[], Any], min_time: float = 0.2, repeat: int = 3) -> dict[str, float]:
+    """
+    Times an operation and measures the memory it allocates.
+
+    The operation is run in a loop for at least `min_time` seconds, `repeat`
+    times, and the fastest loop is reported to reduce noise from other
+    processes.
+
+    :param operation: The operation to time.
+    :param min_time: The least seconds each timing loop runs for.
+    :param repeat: The number of timing loops.
+    :return: The operations per second, the mean seconds per operation and the
+        peak bytes allocated by one operation.
+    """
+    operation()
+
+    best: float = float("inf")
+    for _ in range(repeat):
+        count: int = 0
+        start: float = time.perf_counter()
+        elapsed: float = 0.0
+        while elapsed < min_time:
+            operation()
+            count += 1
+            elapsed = time.perf_counter() - start
+        best = min(best, elapsed / count)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    operation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"ops_per_sec": 1 / best, "mean_seconds": best, "peak_memory_bytes": peak - baseline}
+
+
+class _DictTextNode:
+    """
+    The layout of a TextNode before it used `__slots__`, kept as a baseline for
+    the memory benchmark.
+    """
+
+    def __init__(self, text: str, text_type: TextType, url: str = None) -> None:
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class _DictHTMLNode:
+    """
+    The layout of a HTMLNode before it used `__slots__`, kept as a baseline for
+    the memory benchmark.
+    """
+
+    def __init__(
+        self, tag: str = None,
+        value: str = None,
+        children: list = None,
+        props: dict[str, str] = None
+    ) -> None:
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+def bytes_per_node(factory: Callable[[], Any], count: int) -> float:
+    """
+    Measures the average number of bytes allocated for each node created by a
+    factory. The factory should reuse its arguments so only the node itself is
+    measured.
+
+    :param factory: A callable that creates a single node.
+    :param count: The number of nodes to create.
+    :return: The average number of bytes allocated per node.
+    """
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    nodes: list = [factory() for _ in range(count)]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return (end - start - sys.getsizeof(nodes)) / count
+
+
+def bench_node_memory(count: int = 100_000) -> dict[str, dict[str, float]]:
+    """
+    Compares the bytes per node of the `__dict__` based and the slotted node
+    classes.
+
+    :param count: The number of nodes to create for each class.
+    :return: A mapping of node class to its bytes per node before and after.
+    """
+    text: str = "text"
+    url: str = "https://www.boot.dev"
+    children: list = [LeafNode(None, text)]
+
+    cases: dict[str, tuple[Callable[[], Any], Callable[[], Any]]] = {
+        "TextNode": (
+            lambda: _DictTextNode(text, TextType.LINK, url),
+            lambda: TextNode(text, TextType.LINK, url),
+        ),
+        "LeafNode": (
+            lambda: _DictHTMLNode("b", text),
+            lambda: LeafNode("b", text),
+        ),
+        "ParentNode": (
+            lambda: _DictHTMLNode("p", children=children),
+            lambda: ParentNode("p", children),
+        ),
+    }
+
+    return {
+        name: {
+            "dict": bytes_per_node(before, count),
+            "slots": bytes_per_node(after, count),
+        }
+        for name, (before, after) in cases.items()
+    }
+
+
+@report("node_memory")
+def report_node_memory(size: int) -> dict[str, dict[str, float]]:
+    return bench_node_memory(size * 100)
+
+
+def make_document(index: int, paragraphs: int = 20) -> str:
+    """
+    Creates a synthetic Markdown document that uses every inline element.
+
+    :param index: The number of the document, used to vary its contents.
+    :param paragraphs: The number of paragraphs in the document.
+    :return: The Markdown document.
+    """
+    lines: list[str] = [f"# Page {index}"]
+    lines.extend(make_paragraph(paragraph) for paragraph in range(paragraphs))
+
+    return "\n\n".join(lines)
+
+
+def make_site(directory: str, pages: int, paragraphs: int = 20) -> tuple[str, str]:
+    """
+    Writes a synthetic site of Markdown documents and a template.
+
+    :param directory: The directory to write the site to.
+    :param pages: The number of pages in the site.
+    :param paragraphs: The number of paragraphs in each page.
+    :return: The source directory and the template path.
+    """
+    source_dir: str = os.path.join(directory, "content")
+    template_path: str = os.path.join(directory, "template.html")
+
+    for index in range(pages):
+        section: str = os.path.join(source_dir, f"section{index % 10}")
+        os.makedirs(section, exist_ok=True)
+        with open(os.path.join(section, f"page{index}.md"), "w", encoding="utf-8") as file:
+            file.write(make_document(index, paragraphs))
+
+    with open(template_path, "w", encoding="utf-8") as file:
+        file.write("<html><head><title>{{ Title }}</title></head><body>{{ Content }}</body></html>")
+
+    return source_dir, template_path
+
+
+def make_paragraph(index: int) -> str:
+    """
+    Creates a synthetic paragraph of inline Markdown that uses every inline
+    element.
+
+    :param index: The number of the paragraph, used to vary its contents.
+    :return: The paragraph.
+    """
+    return (
+        f"Paragraph {index} has **bold text**, *italic text* and `inline code`, "
+        f"a [link to page {index}](/pages/{index}.html) and an "
+        f"![image {index}](/images/{index}.png) followed by some plain text."
+    )
+
+
+def make_text_nodes(size: int) -> list[TextNode]:
+    """
+    Creates the inline TextNodes of `size` synthetic paragraphs.
+
+    :param size: The number of paragraphs.
+    :return: A TextNode for every inline element of the paragraphs.
+    """
+    nodes: list[TextNode] = []
+
+    for index in range(size):
+        nodes.extend([
+            TextNode(f"Paragraph {index} has ", TextType.TEXT),
+            TextNode("bold text", TextType.BOLD),
+            TextNode(", ", TextType.TEXT),
+            TextNode("italic text", TextType.ITALIC),
+            TextNode(" and ", TextType.TEXT),
+            TextNode("inline code", TextType.CODE),
+            TextNode(", a ", TextType.TEXT),
+            TextNode(f"link to page {index}", TextType.LINK, f"/pages/{index}.html"),
+            TextNode(" and an ", TextType.TEXT),
+            TextNode(f"image {index}", TextType.IMAGE, f"/images/{index}.png"),
+            TextNode(" followed by some plain text.", TextType.TEXT),
+        ])
+
+    return nodes
+
+
+def make_wide_tree(size: int) -> ParentNode:
+    """
+    Creates a HTMLNode tree of `size` paragraphs in a single element.
+
+    :param size: The number of paragraphs.
+    :return: The root of the tree.
+    """
+    nodes: list[TextNode] = make_text_nodes(size)
+    per_paragraph: int = len(nodes) // max(size, 1)
+    paragraphs: list[HTMLNode] = [
+        ParentNode("p", [text_node_to_html_node(node) for node in nodes[index:index + per_paragraph]])
+        for index in range(0, len(nodes), per_paragraph)
+    ]
+
+    return ParentNode("div", paragraphs)
+
+
+def make_deep_tree(depth: int, leaves: int = 4) -> ParentNode:
+    """
+    Creates a HTMLNode tree of nested elements, such as nested lists.
+
+    :param depth: The number of nested elements.
+    :param leaves: The number of LeafNodes in every element.
+    :return: The root of the tree.
+    """
+    node: ParentNode = ParentNode("li", [LeafNode("b", "leaf") for _ in range(leaves)])
+
+    for level in range(depth - 1):
+        node = ParentNode("ul" if level % 2 else "li", [LeafNode(None, "text"), node], {"class": "nested"})
+
+    return node
+
+
+@benchmark("split_node_delimiter")
+def bench_split_node_delimiter(size: int) -> Callable[[], Any]:
+    nodes: list[TextNode] = [TextNode(make_paragraph(index), TextType.TEXT) for index in range(size)]
+
+    return lambda: split_node_delimiter(nodes, "**", TextType.BOLD)
+
+
+@benchmark("split_nodes_images")
+def bench_split_nodes_images(size: int) -> Callable[[], Any]:
+    nodes: list[TextNode] = [TextNode(make_paragraph(index), TextType.TEXT) for index in range(size)]
+
+    return lambda: split_nodes_images(nodes)
+
+
+@benchmark("split_nodes_link")
+def bench_split_nodes_link(size: int) -> Callable[[], Any]:
+    nodes: list[TextNode] = [TextNode(make_paragraph(index), TextType.TEXT) for index in range(size)]
+
+    return lambda: split_nodes_link(nodes)
+
+
+def make_repeated_fragments(size: int) -> list[str]:
+    """
+    Creates inline fragments of which most are repeated, like the boilerplate
+    sentences and link lines of a large site.
+
+    :param size: The number of fragments.
+    :return: The fragments, with only one in ten of them unique.
+    """
+    return [make_paragraph(index % max(size // 10, 1)) for index in range(size)]
+
+
+@benchmark("text_to_textnodes_repeated")
+def bench_text_to_textnodes_repeated(size: int) -> Callable[[], Any]:
+    fragments: list[str] = make_repeated_fragments(size)
+
+    return lambda: [text_to_textnodes(fragment) for fragment in fragments]
+
+
+@benchmark("inline_cache_repeated")
+def bench_inline_cache_repeated(size: int) -> Callable[[], Any]:
+    fragments: list[str] = make_repeated_fragments(size)
+
+    def parse_build() -> list[tuple[TextNode, ...]]:
+        cache: InlineCache = InlineCache()
+        return [cache.parse(fragment) for fragment in fragments]
+
+    return parse_build
+
+
+def make_documents(size: int) -> list[str]:
+    """
+    Creates synthetic Markdown documents with `size` paragraphs between them.
+
+    :param size: The total number of paragraphs.
+    :return: The documents, of 20 paragraphs each.
+    """
+    return [make_document(index) for index in range(max(size // 20, 1))]
+
+
+@benchmark("markdown_to_html_node")
+def bench_markdown_to_html_node(size: int) -> Callable[[], Any]:
+    documents: list[str] = make_documents(size)
+
+    return lambda: [markdown_to_html_node(document) for document in documents]
+
+
+@benchmark("ast_load_tree")
+def bench_ast_load_tree(size: int) -> Callable[[], Any]:
+    trees: list[bytes] = [dump_tree(markdown_to_html_node(document)) for document in make_documents(size)]
+
+    return lambda: [load_tree(tree) for tree in trees]
+
+
+@benchmark("text_node_to_html_node")
+def bench_text_node_to_html_node(size: int) -> Callable[[], Any]:
+    nodes: list[TextNode] = make_text_nodes(size)
+
+    return lambda: [text_node_to_html_node(node) for node in nodes]
+
+
+@benchmark("text_node_to_leaf_html")
+def bench_text_node_to_leaf_html(size: int) -> Callable[[], Any]:
+    nodes: list[TextNode] = make_text_nodes(size)
+
+    return lambda: "".join([text_node_to_html_node(node).to_html() for node in nodes])
+
+
+@benchmark("text_nodes_to_html")
+def bench_text_nodes_to_html(size: int) -> Callable[[], Any]:
+    nodes: list[TextNode] = make_text_nodes(size)
+
+    return lambda: text_nodes_to_html(nodes)
+
+
+def make_escape_corpus(size: int) -> list[str]:
+    """
+    Creates the text values of `size` synthetic paragraphs, of which a few
+    contain characters that must be escaped.
+
+    :param size: The number of paragraphs.
+    :return: The text of every inline element of the paragraphs.
+    """
+    values: list[str] = [node.text for node in make_text_nodes(size)]
+    values[::10] = [f"{value} & <more>" for value in values[::10]]
+
+    return values
+
+
+@benchmark("escape_value")
+def bench_escape_value(size: int) -> Callable[[], Any]:
+    values: list[str] = make_escape_corpus(size)
+
+    return lambda: [escape_value(value) for value in values]
+
+
+@benchmark("escape_html_stdlib")
+def bench_escape_html_stdlib(size: int) -> Callable[[], Any]:
+    values: list[str] = make_escape_corpus(size)
+
+    return lambda: [html.escape(value) for value in values]
+
+
+@benchmark("props_to_html")
+def bench_props_to_html(size: int) -> Callable[[], Any]:
+    nodes: list[HTMLNode] = [
+        LeafNode("a", "link", {"href": f"/pages/{index % 20}.html", "class": "internal", "rel": "nofollow"})
+        for index in range(size)
+    ]
+
+    return lambda: [node.props_to_html() for node in nodes]
+
+
+@benchmark("to_html_wide")
+def bench_to_html_wide(size: int) -> Callable[[], Any]:
+    return make_wide_tree(size).to_html
+
+
+def make_chrome(tag: str) -> ParentNode:
+    """
+    Creates a navigation bar or footer shared by every page of a site.
+
+    :param tag: The tag of the element.
+    :return: The root of the element.
+    """
+    links: list[HTMLNode] = [
+        ParentNode("li", [LeafNode("a", f"Section {index}", {"href": f"/section{index}/"})]) for index in range(20)
+    ]
+
+    return ParentNode(tag, [ParentNode("ul", links, {"class": "menu"})], {"class": tag})
+
+
+def make_pages_with_chrome(size: int, cache: RenderCache = None) -> list[ParentNode]:
+    """
+    Creates pages with a navigation bar and footer around unique content.
+
+    :param size: The number of pages.
+    :param cache: If given, the chrome is built once and interned in the cache
+        so every page shares it. Otherwise, every page builds its own copy.
+    :return: The roots of the pages.
+    """
+    if cache is not None:
+        nav, footer = cache.intern(make_chrome("nav")), cache.intern(make_chrome("footer"))
+
+    return [
+        ParentNode("body", [
+            nav if cache is not None else make_chrome("nav"),
+            ParentNode("p", [LeafNode(None, f"Page {index}")]),
+            footer if cache is not None else make_chrome("footer"),
+        ])
+        for index in range(size)
+    ]
+
+
+@benchmark("to_html_repeated_subtrees")
+def bench_to_html_repeated_subtrees(size: int) -> Callable[[], Any]:
+    pages: list[ParentNode] = make_pages_with_chrome(size)
+
+    return lambda: [page.to_html() for page in pages]
+
+
+@benchmark("render_cache_repeated_subtrees")
+def bench_render_cache_repeated_subtrees(size: int) -> Callable[[], Any]:
+    pages: list[ParentNode] = make_pages_with_chrome(size)
+
+    def render_build() -> list[str]:
+        cache: RenderCache = RenderCache()
+        return [cache.render(page) for page in pages]
+
+    return render_build
+
+
+@benchmark("render_cache_interned_subtrees")
+def bench_render_cache_interned_subtrees(size: int) -> Callable[[], Any]:
+    cache: RenderCache = RenderCache()
+    pages: list[ParentNode] = make_pages_with_chrome(size, cache)
+
+    return lambda: [cache.render(page) for page in pages]
+
+
+def iter_html_recursive(node: HTMLNode) -> Iterator[str]:
+    """
+    Renders a tree the way `ParentNode.iter_html` did before it used an
+    explicit stack: one nested generator per level. Kept as the baseline of
+    the rendering benchmarks.
+
+    :param node: The root of the tree.
+    :return: An iterator over the fragments of the rendered HTML.
+    """
+    if not isinstance(node, ParentNode):
+        yield node.to_html()
+        return
+
+    yield node.open_tag()
+    for child in node.children:
+        yield from iter_html_recursive(child)
+    yield node.close_tag()
+
+
+@benchmark("to_html_wide_recursive")
+def bench_to_html_wide_recursive(size: int) -> Callable[[], Any]:
+    tree: ParentNode = make_wide_tree(size)
+
+    return lambda: "".join(iter_html_recursive(tree))
+
+
+# Recursive rendering is limited by the interpreter's recursion limit, so the
+# two renderers are compared at a depth both can handle.
+@benchmark("to_html_deep")
+def bench_to_html_deep(size: int) -> Callable[[], Any]:
+    return make_deep_tree(min(size, 200)).to_html
+
+
+@benchmark("to_html_deep_recursive")
+def bench_to_html_deep_recursive(size: int) -> Callable[[], Any]:
+    tree: ParentNode = make_deep_tree(min(size, 200))
+
+    return lambda: "".join(iter_html_recursive(tree))
+
+
+@benchmark("to_html_very_deep")
+def bench_to_html_very_deep(size: int) -> Callable[[], Any]:
+    return make_deep_tree(size * 10).to_html
+
+
+# Inputs that make a naive bracket matcher backtrack or rescan, by the number
+# of repetitions of their pattern.
+ADVERSARIAL_INPUTS: dict[str, Callable[[int], str]] = {
+    "open_brackets": lambda count: "[" * count,
+    "unclosed_links": lambda count: "[a](" * count,
+    "unclosed_url": lambda count: "[a](" + "[a]" * count,
+    "unmatched_close": lambda count: "](" * count,
+    "bang_brackets": lambda count: "![" * count,
+    "long_alt_text": lambda count: "[" + "a" * count + "]x",
+    "alt_without_url": lambda count: "[a]" * count,
+    "nested_parens": lambda count: "[a](b(" * count + ")",
+}
+
+
+def find_links_with_patterns(text: str) -> list:
+    """
+    Finds the images and links of a text with the regular expressions the
+    scanner replaced. Kept as the baseline of the adversarial benchmarks.
+
+    :param text: The text to scan.
+    :return: The matches of both patterns.
+    """
+    return _IMAGE_PATTERN.findall(text) + _LINK_PATTERN.findall(text)
+
+
+def find_links_with_scanner(text: str) -> list:
+    """
+    Finds the images and links of a text with the linear-time scanner.
+
+    :param text: The text to scan.
+    :return: The images and links of the text.
+    """
+    return extract_markdown_images(text) + extract_markdown_links(text)
+
+
+@benchmark("links_adversarial")
+def bench_links_adversarial(size: int) -> Callable[[], Any]:
+    texts: list[str] = [make_input(size * 100) for make_input in ADVERSARIAL_INPUTS.values()]
+
+    return lambda: [find_links_with_scanner(text) for text in texts]
+
+
+@benchmark("links_adversarial_regex")
+def bench_links_adversarial_regex(size: int) -> Callable[[], Any]:
+    texts: list[str] = [make_input(size * 100) for make_input in ADVERSARIAL_INPUTS.values()]
+
+    return lambda: [find_links_with_patterns(text) for text in texts]
+
+
+@report("adversarial_scaling")
+def report_adversarial_scaling(size: int) -> dict[str, dict[str, float]]:
+    """
+    Times finding links in every adversarial input at 1x and 4x its length.
+    A linear-time finder takes about 4 times as long on the longer input.
+
+    :param size: Scales the length of the inputs.
+    :return: A mapping of input name to the growth in time of the scanner and
+        of the regular expressions.
+    """
+    results: dict[str, dict[str, float]] = {}
+
+    for name, make_input in ADVERSARIAL_INPUTS.items():
+        short, long = make_input(size * 50), make_input(size * 200)
+        results[name] = {}
+
+        for finder_name, finder in (("scanner", find_links_with_scanner), ("regex", find_links_with_patterns)):
+            short_time: float = measure(lambda: finder(short), 0.05, 1)["mean_seconds"]
+            long_time: float = measure(lambda: finder(long), 0.05, 1)["mean_seconds"]
+            results[name][f"{finder_name}_ms"] = long_time * 1000
+            results[name][f"{finder_name}_growth"] = long_time / short_time
+
+    return results
+
+
+@report("ast_cache_rebuild")
+def report_ast_cache_rebuild(size: int) -> dict[str, dict[str, float]]:
+    """
+    Times full builds of a synthetic site that parse every page, store the
+    parsed trees in an ASTCache, and load them from it.
+
+    :param size: The total number of paragraphs in the site.
+    :return: A mapping of each kind of build to its time in seconds, its
+        speedup over parsing, and the size of the stored trees.
+    """
+    pages: int = max(size // 20, 1)
+    results: dict[str, dict[str, float]] = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        source_dir, template_path = make_site(directory, pages)
+        output_dir: str = os.path.join(directory, "public")
+        ast_cache_dir: str = os.path.join(directory, "ast")
+
+        for name, cache_dir in [("parse", None), ("store", ast_cache_dir), ("load", ast_cache_dir)]:
+            start: float = time.perf_counter()
+            report: Any = build_site(source_dir, output_dir, template_path, ast_cache_dir=cache_dir)
+            seconds: float = time.perf_counter() - start
+
+            results[name] = {
+                "seconds": seconds,
+                "speedup": results["parse"]["seconds"] / seconds if results else 1.0,
+                "bytes": report.ast_cache["bytes"] if report.ast_cache else 0,
+            }
+
+    return results
+
+
+@report("gzip_build")
+def report_gzip_build(size: int) -> dict[str, dict[str, float]]:
+    """
+    Times full builds of a synthetic site with and without compressed copies
+    of the pages, in one and in two processes.
+
+    :param size: The total number of paragraphs in the site.
+    :return: A mapping of each kind of build to its time in seconds, and the
+        ratio and throughput of the compression.
+    """
+    pages: int = max(size // 20, 1)
+    results: dict[str, dict[str, float]] = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        source_dir, template_path = make_site(directory, pages)
+
+        for name, jobs, gzip_level in [("plain", 1, None), ("gzip", 1, 9), ("gzip_jobs2", 2, 9)]:
+            output_dir: str = os.path.join(directory, name)
+            start: float = time.perf_counter()
+            report: Any = build_site(source_dir, output_dir, template_path, jobs=jobs, gzip_level=gzip_level)
+            results[name] = {"seconds": time.perf_counter() - start}
+
+            if report.compression:
+                totals: list[dict[str, float]] = list(report.compression.values())
+                size_in: int = sum(page_class["bytes"] for page_class in totals)
+                results[name]["ratio"] = sum(page_class["compressed_bytes"] for page_class in totals) / size_in
+                results[name]["mb_per_second"] = size_in / sum(page_class["seconds"] for page_class in totals) / 1e6
+
+    return results
+
+
+@report("search_build")
+def report_search_build(size: int) -> dict[str, dict[str, float]]:
+    """
+    Times full builds of a synthetic site with and without a search index, and
+    an incremental build after one page changed.
+
+    :param size: The total number of paragraphs in the site.
+    :return: A mapping of each kind of build to its time in seconds and the
+        number of shards written.
+    """
+    pages: int = max(size // 20, 1)
+    results: dict[str, dict[str, float]] = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        source_dir, template_path = make_site(directory, pages)
+        manifest_path: str = os.path.join(directory, "manifest.json")
+
+        for name, search in [("plain", False), ("search", True), ("incremental", True)]:
+            if name == "incremental":
+                with open(os.path.join(source_dir, "section0", "page0.md"), "a", encoding="utf-8") as file:
+                    file.write("\n\nA newly added paragraph\n")
+
+            start: float = time.perf_counter()
+            report: Any = build_site(
+                source_dir, os.path.join(directory, "public" if search else "plain"), template_path,
+                incremental=name == "incremental", manifest_path=manifest_path, search=search
+            )
+            results[name] = {
+                "seconds": time.perf_counter() - start,
+                "shards_written": report.search["shards_written"] if report.search else 0,
+            }
+
+    return results
+
+
+@report("listings_build")
+def report_listings_build(size: int) -> dict[str, dict[str, float]]:
+    """
+    Times a full build of a synthetic blog whose pages have front matter, and
+    the generation of its listings, feed and sitemap alone, with the front
+    matter read from every file and reused from a MetadataCache.
+
+    :param size: The total number of paragraphs in the site.
+    :return: A mapping of each kind of run to its time in seconds and its
+        speedup over the full build.
+    """
+    pages: int = max(size // 20, 1)
+    results: dict[str, dict[str, float]] = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        source_dir, template_path = make_site(directory, pages)
+        for index, source in enumerate(find_sources(source_dir)):
+            path: str = os.path.join(source_dir, source)
+            with open(path, encoding="utf-8") as file:
+                markdown: str = file.read()
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(f"---\ntitle: Post {index}\ndate: 2024-01-{index % 28 + 1:02}\ntags: [t{index % 7}]\n---\n")
+                file.write(markdown)
+
+        with open(template_path, encoding="utf-8") as file:
+            template: str = file.read()
+        output_dir: str = os.path.join(directory, "public")
+        cache_path: str = os.path.join(directory, "metadata.json")
+
+        start: float = time.perf_counter()
+        build_site(source_dir, output_dir, template_path)
+        results["full_build"] = {"seconds": time.perf_counter() - start, "speedup": 1.0}
+
+        for name in ["listings_cold", "listings_warm"]:
+            start = time.perf_counter()
+            writer: OutputWriter = OutputWriter(output_dir)
+            write_listings(source_dir, template, writer, site_url="https://example.com", metadata_cache_path=cache_path)
+            writer.close()
+            seconds: float = time.perf_counter() - start
+            results[name] = {"seconds": seconds, "speedup": results["full_build"]["seconds"] / seconds}
+
+    return results
+
+
+def build_in_fresh_process(source_dir: str, output_dir: str, template_path: str, stream: bool) -> dict[str, float]:
+    """
+    Builds a site and measures the peak memory of the process. Meant to run in
+    a process of its own, so the peak is not that of an earlier build.
+
+    :param source_dir: The directory holding the Markdown files.
+    :param output_dir: The directory the HTML files are written to.
+    :param template_path: The HTML template of every page.
+    :param stream: Whether to build in stream mode.
+    :return: The time of the build in seconds and the peak resident memory of
+        the process in MiB, or 0 if it is not known.
+    """
+    start: float = time.perf_counter()
+    build_site(source_dir, output_dir, template_path, stream=stream)
+    seconds: float = time.perf_counter() - start
+
+    return {"seconds": seconds, "peak_rss_mb": (peak_rss() or 0) / (1024 * 1024)}
+
+
+@report("stream_build")
+def report_stream_build(size: int) -> dict[str, dict[str, float]]:
+    """
+    Times full builds of synthetic sites of a growing number of pages, with
+    and without stream mode, each in a fresh process so its peak memory can be
+    compared.
+
+    :param size: The total number of paragraphs in the largest site.
+    :return: A mapping of each mode and number of pages to the build time in
+        seconds, pages per second and peak resident memory in MiB.
+    """
+    largest: int = max(size // 20, 4)
+    results: dict[str, dict[str, float]] = {}
+    context = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for pages in [largest // 4, largest // 2, largest]:
+            source_dir, template_path = make_site(os.path.join(directory, str(pages)), pages)
+            for mode in ["build", "stream"]:
+                output_dir: str = os.path.join(directory, str(pages), f"public_{mode}")
+                with ProcessPoolExecutor(1, mp_context=context) as executor:
+                    result: dict[str, float] = executor.submit(
+                        build_in_fresh_process, source_dir, output_dir, template_path, mode == "stream"
+                    ).result()
+                result["pages_per_second"] = pages / result["seconds"]
+                results[f"{mode}_{pages}"] = result
+
+    return results
+
+
+@report("parallel_build")
+def bench_parallel_build(pages: int = 400, max_jobs: int = None) -> dict[int, dict[str, float]]:
+    """
+    Times full builds of a synthetic site with 1 to `max_jobs` processes.
+
+    :param pages: The number of pages in the site.
+    :param max_jobs: The largest number of processes to build with. By
+        default, the number of CPUs.
+    :return: A mapping of the number of jobs to the build time in seconds and
+        the speedup over a single job.
+    """
+    max_jobs = max_jobs or os.cpu_count() or 1
+    results: dict[int, dict[str, float]] = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        source_dir, template_path = make_site(directory, pages)
+
+        for jobs in range(1, max_jobs + 1):
+            output_dir: str = os.path.join(directory, f"public{jobs}")
+            start: float = time.perf_counter()
+            build_site(source_dir, output_dir, template_path, jobs=jobs)
+            seconds: float = time.perf_counter() - start
+
+            results[jobs] = {"seconds": seconds, "speedup": results[1]["seconds"] / seconds if results else 1.0}
+
+    return results
+
+
+def run(size: int, only: list[str] = None, min_time: float = 0.2) -> dict:
+    """
+    Runs the benchmarks and reports.
+
+    :param size: The size of the synthetic corpora.
+    :param only: If given, only the benchmarks and reports whose name contains
+        one of these strings are run.
+    :param min_time: The least seconds each timing loop runs for.
+    :return: The machine-readable results.
+    """
+    def selected(name: str) -> bool:
+        return not only or any(pattern in name for pattern in only)
+
+    results: dict = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "size": size,
+        "benchmarks": {},
+        "reports": {},
+    }
+
+    for name, setup in BENCHMARKS.items():
+        if selected(name):
+            results["benchmarks"][name] = measure(setup(size), min_time)
+
+    for name, function in REPORTS.items():
+        if selected(name):
+            results["reports"][name] = function(size)
+
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Finds the benchmarks that got slower than in an earlier run.
+
+    :param results: The results of this run.
+    :param baseline: The results of the earlier run.
+    :param threshold: The fraction of operations per second a benchmark may
+        lose before it counts as a regression.
+    :return: The names of the benchmarks that regressed.
+    """
+    regressions: list[str] = []
+
+    for name, result in results["benchmarks"].items():
+        previous: dict | None = baseline.get("benchmarks", {}).get(name)
+        if previous is None:
+            continue
+
+        ratio: float = result["ops_per_sec"] / previous["ops_per_sec"]
+        print(f"{name:<28}{ratio:>10.2f}x")
+        if ratio < 1 - threshold:
+            regressions.append(name)
+
+    return regressions
+
+
+def print_results(results: dict) -> None:
+    """
+    Prints the results as tables.
+
+    :param results: The results returned by `run`.
+    """
+    print(f"{'benchmark':<28}{'ops/sec':>12}{'ms/op':>10}{'peak KiB':>11}")
+    for name, result in results["benchmarks"].items():
+        print(
+            f"{name:<28}{result['ops_per_sec']:>12.1f}{result['mean_seconds'] * 1000:>10.3f}"
+            f"{result['peak_memory_bytes'] / 1024:>11.1f}"
+        )
+
+    for name, result in results["reports"].items():
+        print()
+        print(name)
+        for key, value in result.items():
+            print(f"  {key}: {value}")
+
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks the static site generator.")
+    parser.add_argument("--size", type=int, default=1000, help="size of the synthetic corpora (default: 1000)")
+    parser.add_argument("--only", action="append", metavar="NAME", help="only run benchmarks whose name contains NAME")
+    parser.add_argument("--min-time", type=float, default=0.2, help="least seconds per timing loop (default: 0.2)")
+    parser.add_argument("--json", metavar="PATH", help="write the results as JSON to PATH")
+    parser.add_argument("--compare", metavar="PATH", help="compare against the JSON results of an earlier run")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="slowdown that counts as a regression (default: 0.1)"
+    )
+    args: argparse.Namespace = parser.parse_args(argv)
+
+    results: dict = run(args.size, args.only, args.min_time)
+    print_results(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline: dict = json.load(file)
+
+        print()
+        regressions: list[str] = compare(results, baseline, args.threshold)
+        if regressions:
+            sys.exit(f"Regressed: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+This module contains functions that parse the block-level structure of a
+Markdown document: headings, paragraphs, lists, quotes and fenced code.
+
+The parser consumes an iterable of lines, such as an open file, and yields each
+block as soon as it is complete, so a document can be converted to HTMLNodes
+and rendered one block at a time without the whole document or its whole node
+tree being held in memory.
+"""
+import re
+from enum import Enum
+from typing import Callable, Iterable, Iterator
+from htmlnode import HTMLNode, LeafNode, ParentNode, Writer
+from inlinecache import InlineCache
+from markdown import text_to_textnodes
+from profiling import BuildProfile, get_profile
+from textnode import InlineNode, TextNode
+
+CODE_FENCE: str = "```"
+# Identifies the trees the parser produces. Changing how a document is parsed
+# requires a new version, so trees cached by an older parser are not reused.
+PARSER_VERSION: str = "1"
+
+_HEADING_PATTERN: re.Pattern = re.compile(r"(#{1,6}) ")
+
+
+class BlockType(Enum):
+    """
+    Holds the different types of blocks within a Markdown document.
+    """
+    PARAGRAPH: str = "paragraph"
+    HEADING: str = "heading"
+    CODE: str = "code"
+    QUOTE: str = "quote"
+    UNORDERED_LIST: str = "unordered_list"
+    ORDERED_LIST: str = "ordered_list"
+
+
+def iter_blocks(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Groups the lines of a Markdown document into blocks. Blocks are separated
+    by blank lines, a heading is always a block of its own, and a fenced code
+    block lasts until its closing fence (or the end of the document), blank
+    lines included.
+
+    :param lines: The lines of the document, with or without line endings.
+    :return: An iterator over the blocks, as strings without trailing newlines.
+    """
+    block: list[str] = []
+    fenced: bool = False
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+
+        if fenced:
+            block.append(line)
+            if line.startswith(CODE_FENCE):
+                fenced = False
+                yield "\n".join(block)
+                block = []
+            continue
+
+        if line.startswith(CODE_FENCE) or not line.strip() or _HEADING_PATTERN.match(line):
+            if block:
+                yield "\n".join(block)
+                block = []
+
+            if line.startswith(CODE_FENCE):
+                block.append(line)
+                fenced = True
+            elif line.strip():
+                yield line
+            continue
+
+        block.append(line)
+
+    if block:
+        yield "\n".join(block)
+
+
+def block_to_block_type(block: str) -> BlockType:
+    """
+    Finds the type of a block returned by `iter_blocks`.
+
+    :param block: The block of Markdown.
+    :return: The type of the block.
+    """
+    if block.startswith(CODE_FENCE):
+        return BlockType.CODE
+
+    if _HEADING_PATTERN.match(block):
+        return BlockType.HEADING
+
+    lines: list[str] = block.split("\n")
+
+    if all(line.startswith(">") for line in lines):
+        return BlockType.QUOTE
+
+    if all(line.startswith(("- ", "* ")) for line in lines):
+        return BlockType.UNORDERED_LIST
+
+    if all(line.startswith(f"{number}. ") for number, line in enumerate(lines, 1)):
+        return BlockType.ORDERED_LIST
+
+    return BlockType.PARAGRAPH
+
+
+def block_to_html_node(block: str, inline_cache: InlineCache = None) -> HTMLNode:
+    """
+    Converts a block of Markdown into HTMLNodes, parsing any inline Markdown
+    it contains.
+
+    :param block: The block of Markdown.
+    :param inline_cache: A cache of parsed inline Markdown, if any.
+    :return: The HTML element of the block.
+    """
+    lines: list[str] = block.split("\n")
+
+    match block_to_block_type(block):
+        case BlockType.CODE:
+            code_lines: list[str] = lines[1:-1] if len(lines) > 1 and lines[-1].startswith(CODE_FENCE) else lines[1:]
+            code: str = "".join(f"{line}\n" for line in code_lines)
+            return ParentNode("pre", [LeafNode("code", code)])
+        case BlockType.HEADING:
+            level: int = len(_HEADING_PATTERN.match(block).group(1))
+            return _inline_node(f"h{level}", block[level + 1:].strip(), inline_cache)
+        case BlockType.QUOTE:
+            return _inline_node("blockquote", _join_lines(line[1:] for line in lines), inline_cache)
+        case BlockType.UNORDERED_LIST:
+            return ParentNode("ul", [_inline_node("li", line[2:].strip(), inline_cache) for line in lines])
+        case BlockType.ORDERED_LIST:
+            return ParentNode(
+                "ol", [_inline_node("li", line.split(". ", 1)[1].strip(), inline_cache) for line in lines]
+            )
+        case _:
+            return _inline_node("p", _join_lines(lines), inline_cache)
+
+
+def iter_html_nodes(lines: Iterable[str], inline_cache: InlineCache = None) -> Iterator[HTMLNode]:
+    """
+    Converts a Markdown document into HTMLNodes one block at a time.
+
+    :param lines: The lines of the document, such as an open file.
+    :param inline_cache: A cache of parsed inline Markdown, if any.
+    :return: An iterator over the HTML element of every block.
+    """
+    for block in iter_blocks(lines):
+        yield block_to_html_node(block, inline_cache)
+
+
+def render_markdown(
+    lines: Iterable[str], writer: Writer, inline_cache: InlineCache = None, visit: Callable[[HTMLNode], object] = None
+) -> None:
+    """
+    Renders a Markdown document as a `div` element to a writer, one block at a
+    time. The output is the same as `markdown_to_html_node(...).to_html()`,
+    except that a document without blocks renders as an empty string.
+
+    :param lines: The lines of the document, such as an open file.
+    :param writer: The file-like object to write the HTML to.
+    :param inline_cache: A cache of parsed inline Markdown, if any.
+    :param visit: A function called with the element of every block before it
+        is written, if any.
+    """
+    opened: bool = False
+
+    for node in iter_html_nodes(lines, inline_cache):
+        if not opened:
+            writer.write("<div>")
+            opened = True
+        if visit is not None:
+            visit(node)
+        node.render_to(writer)
+
+    if opened:
+        writer.write("</div>")
+
+
+def markdown_to_html_node(markdown: str, inline_cache: InlineCache = None) -> ParentNode:
+    """
+    Converts a Markdown document into a tree of HTMLNodes.
+
+    :param markdown: The Markdown document.
+    :param inline_cache: A cache of parsed inline Markdown, if any.
+    :return: A `div` element holding an element for every block.
+    """
+    return ParentNode("div", list(iter_html_nodes(markdown.splitlines(), inline_cache)))
+
+
+def _join_lines(lines: Iterable[str]) -> str:
+    """
+    Joins the lines of a block into a single line of inline Markdown.
+
+    :param lines: The lines of the block.
+    :return: The stripped, non-blank lines separated by spaces.
+    """
+    return " ".join(line.strip() for line in lines if line.strip())
+
+
+def _inline_node(tag: str, text: str, inline_cache: InlineCache = None) -> InlineNode:
+    """
+    Creates a HTML element holding parsed inline Markdown.
+
+    :param tag: The tag of the element.
+    :param text: The inline Markdown.
+    :param inline_cache: A cache of parsed inline Markdown, if any.
+    :return: An InlineNode of the parsed TextNodes, which are rendered without
+        creating a LeafNode for each of them.
+    """
+    profile: BuildProfile | None = get_profile()
+    if profile is not None:
+        profile.start("inline")
+    try:
+        text_nodes: Iterable[TextNode] = text_to_textnodes(text) if inline_cache is None else inline_cache.parse(text)
+    finally:
+        if profile is not None:
+            profile.stop()
+
+    if profile is not None:
+        profile.count("text_nodes", len(text_nodes))
+
+    return InlineNode(tag, text_nodes)
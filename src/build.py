@@ -0,0 +1,911 @@
+"""
+This module contains functions that build a whole site: every Markdown file in
+a source directory is rendered into a HTML template and written to the same
+relative path (with a `.html` extension) in an output directory, alongside a
+copy of the site's static files.
+
+Incremental builds keep a `BuildManifest` of the content hash of every page's
+inputs, and only regenerate the pages whose hash changed since the last build.
+
+Pages are written through an `OutputWriter`, which leaves output files whose
+bytes did not change untouched and replaces the others atomically, and can
+write a gzip-compressed copy of every page next to it.
+
+Documents whose source did not change since an earlier build can be loaded from
+an on-disk `ASTCache` of parsed trees instead of being parsed again.
+
+Builds can check the internal links and images of every page against the pages
+and static files of the site (see `links`), and write a search index of the
+text of every page (see `search`). Listing pages, a feed and a sitemap are
+generated from the front matter of the pages alone (see `listings`).
+
+Very large sites can be built in stream mode, which streams every page from its
+source file to its output file one block at a time, so no document, tree or
+page is held in memory as a whole, and only compact summaries of the built pages
+are kept. The report of such a build holds its throughput and the peak memory of
+its process, which is the high-water mark since the process started.
+
+Pages can be generated in parallel in a pool of processes. The workers are only
+sent the paths of the pages to generate, and each page is written by exactly one
+worker, so the output is identical to a serial build.
+"""
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from astcache import ASTCache
+from htmlnode import EscapeMode, escape_mode, set_escape_mode
+from frontmatter import MetadataCache, split_front_matter
+from inlinecache import InlineCache
+from links import Link, check_links as check_site_links, find_files, record_links
+from listings import LISTING_DIR, generate_listings, listing_path
+from manifest import BuildManifest, content_digest
+from output import OutputWriter, compression_report, merge_compression
+from page import extract_title, read_title, render_page, stream_page
+from profiling import BuildProfile, get_profile, peak_rss, profiling
+from rendercache import RenderCache
+from search import SearchIndex
+
+# Part of every page's content hash, so changing it invalidates all pages.
+GENERATOR_VERSION: str = "3"
+
+
+class BuildReport:
+    """
+    Holds the results of a build.
+    """
+
+    __slots__ = (
+        "built", "unchanged", "skipped", "removed", "copied", "seconds", "render_cache", "inline_cache", "ast_cache",
+        "compression", "links", "search", "listings", "memory"
+    )
+
+    def __init__(self) -> None:
+        """
+        Instantiates an empty BuildReport.
+        """
+        self.built: list[str] = []
+        # The built pages whose output already held the same bytes.
+        self.unchanged: list[str] = []
+        self.skipped: list[str] = []
+        self.removed: list[str] = []
+        self.copied: list[str] = []
+        self.seconds: float = 0.0
+        self.render_cache: dict[str, int] | None = None
+        self.inline_cache: dict[str, int] | None = None
+        self.ast_cache: dict[str, int] | None = None
+        # The compression of every page class, as returned by `compression_report`.
+        self.compression: dict[str, dict[str, float]] | None = None
+        # The pages whose links were checked, and the broken links of every
+        # page that has any, if links were checked.
+        self.links: dict | None = None
+        # The number of pages in the search index and of shards written, if
+        # the build writes one.
+        self.search: dict[str, int] | None = None
+        # The number of posts and of listing pages, and the number of files
+        # whose front matter was reused and read, if listings were generated.
+        self.listings: dict[str, int] | None = None
+        # The peak resident memory of the build's processes in bytes (None if
+        # it is not known), and the pages and megabytes of Markdown built per
+        # second, if the build streamed its pages. The peak is the high-water
+        # mark since the process started, so in a daemon or development server
+        # it may come from an earlier build.
+        self.memory: dict | None = None
+
+    def summary(self) -> str:
+        """
+        Describes the build in a single line.
+
+        :return: The number of pages built, written, skipped and removed and
+            the time taken.
+        """
+        summary: str = (
+            f"Built {len(self.built)} pages, wrote {len(self.built) - len(self.unchanged)}, "
+            f"skipped {len(self.skipped)} unchanged, "
+            f"removed {len(self.removed)}, copied {len(self.copied)} static files in {self.seconds:.3f}s"
+        )
+        if self.render_cache is not None:
+            summary += f" (render cache: {self.render_cache['hits']} hits, {self.render_cache['misses']} misses)"
+        if self.inline_cache is not None:
+            summary += f" (inline cache: {self.inline_cache['hits']} hits, {self.inline_cache['misses']} misses)"
+        if self.ast_cache is not None:
+            summary += f" (parse cache: {self.ast_cache['hits']} hits, {self.ast_cache['misses']} misses)"
+        if self.compression:
+            pages: int = sum(totals["pages"] for totals in self.compression.values())
+            size: int = sum(totals["bytes"] for totals in self.compression.values())
+            compressed_size: int = sum(totals["compressed_bytes"] for totals in self.compression.values())
+            summary += f" (gzip: {pages} pages, ratio {compressed_size / max(size, 1):.2f})"
+        if self.links is not None:
+            broken: int = sum(len(links) for links in self.links["broken"].values())
+            checked: int = len(self.links["checked"])
+            summary += f" (links: {broken} broken in {len(self.links['broken'])} pages, {checked} pages checked)"
+        if self.search is not None:
+            summary += f" (search: {self.search['pages']} pages, {self.search['shards_written']} shards written)"
+        if self.listings is not None:
+            summary += f" (listings: {self.listings['posts']} posts on {self.listings['pages']} pages)"
+        if self.memory is not None:
+            memory: dict = self.memory
+            summary += f" (stream: {memory['pages_per_second']:.0f} pages/s, {memory['mb_per_second']:.1f} MB/s"
+            if memory["peak_rss"] is not None:
+                summary += f", process peak RSS {memory['peak_rss'] / (1024 * 1024):.1f} MiB"
+            summary += ")"
+
+        return summary
+
+    def compression_summary(self) -> str:
+        """
+        Describes the compression of every page class, one class per line.
+
+        :return: The pages, ratio and throughput of every page class, or an
+            empty string if no pages were compressed.
+        """
+        return "\n".join(
+            f"{name:<20}{totals['pages']:>6} pages  ratio {totals['ratio']:.2f}  {totals['mb_per_second']:.1f} MB/s"
+            for name, totals in (self.compression or {}).items()
+        )
+
+    def as_dict(self) -> dict:
+        """
+        Converts the report to a dict that can be serialised as JSON.
+
+        :return: The fields of the report.
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, fields: dict) -> "BuildReport":
+        """
+        Creates a report from the output of `as_dict`.
+
+        :param fields: The fields of the report.
+        :return: The report.
+        """
+        report: BuildReport = cls()
+        for name in cls.__slots__:
+            if name in fields:
+                setattr(report, name, fields[name])
+
+        return report
+
+    def __repr__(self) -> str:
+        """
+        Returns the string representation of the BuildReport.
+        """
+        return f"BuildReport({len(self.built)}, {len(self.skipped)}, {len(self.removed)}, {self.seconds:.3f})"
+
+
+def find_sources(source_dir: str) -> list[str]:
+    """
+    Lists the Markdown files in a directory and its subdirectories.
+
+    :param source_dir: The directory to search.
+    :return: The sorted paths of the Markdown files, relative to `source_dir`
+        and separated with "/".
+    """
+    sources: list[str] = []
+
+    for directory, _, files in os.walk(source_dir):
+        relative_dir: str = os.path.relpath(directory, source_dir)
+
+        for name in files:
+            if name.endswith(".md"):
+                path: str = name if relative_dir == "." else os.path.join(relative_dir, name)
+                sources.append(path.replace(os.sep, "/"))
+
+    return sorted(sources)
+
+
+def output_path_for(source: str) -> str:
+    """
+    Finds the output path of a page.
+
+    :param source: The relative path of the Markdown file.
+    :return: The relative path of the HTML file.
+    """
+    return f"{source[:-len('.md')]}.html"
+
+
+def page_title(source: str, markdown: str) -> str:
+    """
+    Finds the title of a page.
+
+    :param source: The relative path of the Markdown file.
+    :param markdown: The contents of the Markdown file.
+    :return: The title in the document's front matter or the text of its first
+        heading, or the name of the file if it has neither.
+    :raise: ValueError if the date in the front matter is not an ISO date.
+    """
+    metadata, body = split_front_matter(markdown)
+    title: str | None = metadata["title"] or extract_title(body)
+
+    return os.path.splitext(os.path.basename(source))[0] if title is None else title
+
+
+def template_digest(template_bytes: bytes, mode: EscapeMode = EscapeMode.ESCAPE, gzip: bool = False) -> str:
+    """
+    Hashes the inputs that every page of a build shares.
+
+    :param template_bytes: The contents of the HTML template.
+    :param mode: The escape mode the pages are rendered in.
+    :param gzip: Whether the pages have compressed copies. Only turning
+        compression on or off changes the digest, since the compression level
+        does not change what a page shows.
+    :return: The hex digest of the template, escape mode, compression and
+        generator version.
+    """
+    if not gzip:
+        return content_digest(GENERATOR_VERSION.encode(), mode.value.encode(), template_bytes)
+
+    return content_digest(GENERATOR_VERSION.encode(), mode.value.encode(), template_bytes, b"gzip")
+
+
+def page_digest(template_hash: str, source_bytes: bytes) -> str:
+    """
+    Hashes the inputs of a single page.
+
+    :param template_hash: The digest returned by `template_digest`.
+    :param source_bytes: The contents of the Markdown file.
+    :return: The hex digest recorded for the page in the build manifest.
+    """
+    return content_digest(template_hash.encode(), source_bytes)
+
+
+def remove_page(
+    output_dir: str, manifest: BuildManifest, source: str, writer: OutputWriter = None
+) -> str | None:
+    """
+    Removes the output of a page whose source file was deleted.
+
+    :param output_dir: The directory the HTML files are written to.
+    :param manifest: The build manifest the page is recorded in.
+    :param source: The relative path of the deleted Markdown file.
+    :param writer: The writer of the build's output files, if any.
+    :return: The relative path of the removed output file, if there was one.
+    """
+    output: str | None = manifest.remove(source)
+    if output is None:
+        return None
+
+    if writer is None:
+        writer = OutputWriter(output_dir)
+
+    return output if writer.remove(output) else None
+
+
+def copy_static(static_dir: str, output_dir: str) -> list[str]:
+    """
+    Copies the files of a static directory (stylesheets, images, ...) into the
+    output directory. Files whose copy has the same size and modification time
+    are skipped.
+
+    :param static_dir: The directory holding the static files.
+    :param output_dir: The directory to copy the files to.
+    :return: The relative paths of the copied files.
+    """
+    copied: list[str] = []
+
+    for directory, _, files in os.walk(static_dir):
+        relative_dir: str = os.path.relpath(directory, static_dir)
+
+        for name in files:
+            relative_path: str = name if relative_dir == "." else os.path.join(relative_dir, name)
+            if copy_static_file(static_dir, output_dir, relative_path):
+                copied.append(relative_path.replace(os.sep, "/"))
+
+    return sorted(copied)
+
+
+def copy_static_file(static_dir: str, output_dir: str, relative_path: str) -> bool:
+    """
+    Copies a single static file into the output directory, unless its copy is
+    already up to date.
+
+    :param static_dir: The directory holding the static files.
+    :param output_dir: The directory to copy the file to.
+    :param relative_path: The path of the file relative to `static_dir`.
+    :return: Whether the file was copied.
+    """
+    source_file: str = os.path.join(static_dir, relative_path)
+    output_file: str = os.path.join(output_dir, relative_path)
+
+    source_stat: os.stat_result = os.stat(source_file)
+    try:
+        output_stat: os.stat_result = os.stat(output_file)
+    except FileNotFoundError:
+        pass
+    else:
+        if output_stat.st_size == source_stat.st_size and output_stat.st_mtime_ns == source_stat.st_mtime_ns:
+            return False
+
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    shutil.copy2(source_file, output_file)
+
+    return True
+
+
+def write_page(
+    output_dir: str,
+    source: str,
+    markdown: str,
+    template: str,
+    render_cache: RenderCache = None,
+    inline_cache: InlineCache = None,
+    ast_cache: ASTCache = None,
+    writer: OutputWriter = None,
+    links: list[Link] = None,
+    terms: dict[str, list[int]] = None
+) -> bool:
+    """
+    Renders a Markdown document into the template and writes it to its output
+    path, unless the output already holds the same HTML.
+
+    :param output_dir: The directory the HTML files are written to.
+    :param source: The relative path of the Markdown file.
+    :param markdown: The contents of the Markdown file.
+    :param template: The HTML template of the page.
+    :param render_cache: A cache of rendered subtrees shared by the pages of
+        the build, if any.
+    :param inline_cache: A cache of parsed inline Markdown shared by the pages
+        of the build, if any.
+    :param ast_cache: An on-disk cache of parsed documents, if any.
+    :param writer: The writer of the build's output files. If None, the page
+        is written by a writer of its own.
+    :param links: A list to add the kind and URL of every link and image of
+        the page to, if any.
+    :param terms: A dict to add the positions of every term of the page's
+        text to, if any.
+    :return: Whether the output file was written.
+    """
+    profile: BuildProfile | None = get_profile()
+    if profile is not None:
+        profile.start("page")
+    seconds: float = 0.0
+    try:
+        default_title: str = os.path.splitext(os.path.basename(source))[0]
+        html: str = render_page(markdown, template, default_title, render_cache, inline_cache, ast_cache, links, terms)
+
+        if profile is not None:
+            profile.start("write")
+        try:
+            if writer is None:
+                writer = OutputWriter(output_dir)
+            written: bool = writer.write(output_path_for(source), html)
+        finally:
+            if profile is not None:
+                profile.stop()
+    finally:
+        if profile is not None:
+            seconds = profile.stop()
+
+    if profile is not None:
+        profile.record_page(source, seconds, len(markdown.encode("utf-8")), len(html.encode("utf-8")))
+
+    return written
+
+
+def stream_page_file(
+    source_dir: str,
+    source: str,
+    template: str,
+    writer: OutputWriter,
+    inline_cache: InlineCache = None,
+    links: list[Link] = None,
+    terms: dict[str, list[int]] = None
+) -> tuple[bool, str]:
+    """
+    Streams a Markdown file into the template and to its output path, unless
+    the output already holds the same HTML. Neither the document nor its page
+    is held in memory as a whole.
+
+    :param source_dir: The directory holding the Markdown files.
+    :param source: The relative path of the Markdown file.
+    :param template: The HTML template of the page.
+    :param writer: The writer of the build's output files.
+    :param inline_cache: A cache of parsed inline Markdown shared by the pages
+        of the build, if any.
+    :param links: A list to add the kind and URL of every link and image of
+        the page to, if any.
+    :param terms: A dict to add the positions of every term of the page's
+        text to, if any.
+    :return: Whether the output file was written, and the title of the page.
+    """
+    profile: BuildProfile | None = get_profile()
+    if profile is not None:
+        profile.start("page")
+    seconds: float = 0.0
+    path: str = os.path.join(source_dir, source)
+    output: str = output_path_for(source)
+    try:
+        default_title: str = os.path.splitext(os.path.basename(source))[0]
+        unchanged: int = len(writer.unchanged)
+        with writer.open(output) as file:
+            title: str = stream_page(path, template, file, default_title, inline_cache, links, terms)
+    finally:
+        if profile is not None:
+            seconds = profile.stop()
+
+    if profile is not None:
+        profile.record_page(
+            source, seconds, os.path.getsize(path), os.path.getsize(os.path.join(writer.output_dir, output))
+        )
+
+    return len(writer.unchanged) == unchanged, title
+
+
+# The template and caches of the build a worker process belongs to, set once
+# per worker.
+_worker_template: str = None
+_worker_render_cache: RenderCache = None
+_worker_inline_cache: InlineCache = None
+_worker_ast_cache: ASTCache = None
+_worker_profile: bool = False
+_worker_gzip_level: int = None
+_worker_check_links: bool = False
+_worker_search: bool = False
+_worker_stream: bool = False
+_worker_writer: OutputWriter = None
+
+def _init_worker(
+    template: str,
+    render_cache_size: int,
+    inline_cache_size: int,
+    mode: EscapeMode,
+    ast_cache_dir: str = None,
+    ast_cache_size: int = 0,
+    profile: bool = False,
+    gzip_level: int = None,
+    check_links: bool = False,
+    search: bool = False,
+    stream: bool = False
+) -> None:
+    """
+    Stores the template in a worker process so it is not sent with every page,
+    and gives the worker its own caches.
+
+    :param template: The HTML template of every page.
+    :param render_cache_size: The most subtrees the worker's render cache
+        holds, or 0 for no render cache.
+    :param inline_cache_size: The most fragments the worker's inline cache
+        holds, or 0 for no inline cache.
+    :param mode: The escape mode to render pages in.
+    :param ast_cache_dir: The directory of the on-disk cache of parsed
+        documents, or None for no such cache.
+    :param ast_cache_size: The most bytes of parsed documents kept in the
+        directory, or 0 for no such cache. Workers never evict: the parent
+        evicts down to this size after the pool has finished.
+    :param profile: Whether to profile every page.
+    :param gzip_level: The compression level of the pages' compressed copies,
+        or None to write no copies.
+    :param check_links: Whether to collect the links of every page.
+    :param search: Whether to collect the terms of every page.
+    :param stream: Whether to stream every page from its source file to its
+        output file.
+    """
+    global _worker_template, _worker_render_cache, _worker_inline_cache, _worker_ast_cache, _worker_profile
+    global _worker_gzip_level, _worker_check_links, _worker_search, _worker_stream
+    set_escape_mode(mode)
+    _worker_template = template
+    _worker_render_cache = RenderCache(render_cache_size) if render_cache_size > 0 else None
+    _worker_inline_cache = InlineCache(inline_cache_size) if inline_cache_size > 0 else None
+    # Every worker scans the directory once and cannot see the trees the
+    # others store, so none of them evicts; the parent evicts once the pool
+    # has finished.
+    _worker_ast_cache = ASTCache(ast_cache_dir, sys.maxsize) if ast_cache_dir and ast_cache_size > 0 else None
+    _worker_profile = profile
+    _worker_gzip_level = gzip_level
+    _worker_check_links = check_links
+    _worker_search = search
+    _worker_stream = stream
+
+def _write_page_in_worker(
+    job: tuple[str, str, str]
+) -> tuple[bool, dict[str, list], dict | None, list[Link] | None, dict[str, list[int]] | None]:
+    """
+    Reads and writes a single page in a worker process. The worker process
+    compresses the page itself, as pages are already compressed in parallel.
+
+    :param job: The source directory, output directory and relative path of
+        the Markdown file.
+    :return: Whether the output file was written, the compression statistics
+        of the page, the profile of the page as returned by
+        `BuildProfile.as_dict` if the build is profiled, the links of the page
+        if the build checks links, and the terms of the page if the build
+        writes a search index.
+    """
+    global _worker_writer
+    source_dir, output_dir, source = job
+
+    if _worker_writer is None or _worker_writer.output_dir != output_dir:
+        _worker_writer = OutputWriter(output_dir, _worker_gzip_level)
+
+    links: list[Link] | None = [] if _worker_check_links else None
+    terms: dict[str, list[int]] | None = {} if _worker_search else None
+    with profiling(BuildProfile(1) if _worker_profile else None) as profile:
+        if _worker_stream:
+            written: bool = stream_page_file(
+                source_dir, source, _worker_template, _worker_writer, _worker_inline_cache, links, terms
+            )[0]
+        else:
+            with open(os.path.join(source_dir, source), "rb") as file:
+                markdown: str = file.read().decode("utf-8")
+            written = write_page(
+                output_dir, source, markdown, _worker_template, _worker_render_cache, _worker_inline_cache,
+                _worker_ast_cache, _worker_writer, links, terms
+            )
+
+    profile_dict: dict | None = None if profile is None else profile.as_dict()
+
+    return written, _worker_writer.take_compression(), profile_dict, links, terms
+
+
+def write_listings(
+    source_dir: str,
+    template: str,
+    writer: OutputWriter,
+    sources: list[str] = None,
+    report: BuildReport = None,
+    site_url: str = None,
+    metadata_cache_path: str = None,
+    listing_dir: str = LISTING_DIR
+) -> dict[str, str]:
+    """
+    Writes the listing pages of a site, and its feed and sitemap if its URL is
+    known, from the front matter of its pages. Listing pages left by an earlier
+    build with more posts are removed, but never the pages of the site.
+
+    :param source_dir: The directory holding the Markdown files.
+    :param template: The HTML template of every page.
+    :param writer: The writer of the build's output files.
+    :param sources: The paths of the Markdown files relative to `source_dir`,
+        if they were already found.
+    :param report: A report to record the number of posts and listing pages
+        in, if any.
+    :param site_url: The URL the site is served at, if known.
+    :param metadata_cache_path: The file the front matter of every page is
+        kept in, or None to read the front matter of every file.
+    :param listing_dir: The directory of the listing pages, relative to the
+        output directory.
+    :return: A mapping of the path of every written file, relative to the
+        output directory, to its contents.
+    :raise: ValueError if the date in a page's front matter is not an ISO date,
+        or if a listing page would replace a page of the site.
+    """
+    profile: BuildProfile | None = get_profile()
+    if profile is not None:
+        profile.start("listings")
+
+    if sources is None:
+        sources = find_sources(source_dir)
+    cache: MetadataCache = (
+        MetadataCache(None) if metadata_cache_path is None else MetadataCache.load(metadata_cache_path)
+    )
+    metadata: dict[str, dict] = cache.scan_all(source_dir, sources)
+    cache.save()
+
+    pages: dict[str, dict] = {output_path_for(source): page_metadata for source, page_metadata in metadata.items()}
+    files: dict[str, str] = generate_listings(pages, template, site_url, listing_dir=listing_dir)
+    for path, content in files.items():
+        # Only the listing pages are pages, with compressed copies.
+        writer.write(path, content, compress=path.startswith(f"{listing_dir}/"))
+
+    listing_pages: int = sum(path.startswith(f"{listing_dir}/") for path in files)
+    number: int = listing_pages + 1
+    # The pages of the site that are at the paths of listing pages are skipped.
+    while listing_path(number, listing_dir) in pages or writer.remove(listing_path(number, listing_dir)):
+        number += 1
+
+    if report is not None:
+        report.listings = {
+            "posts": sum(1 for page_metadata in pages.values() if page_metadata["date"]),
+            "pages": listing_pages,
+            **cache.stats(),
+        }
+
+    if profile is not None:
+        profile.stop()
+
+    return files
+
+
+def build_site(
+    source_dir: str,
+    output_dir: str,
+    template_path: str,
+    incremental: bool = False,
+    manifest_path: str = None,
+    jobs: int = 1,
+    static_dir: str = None,
+    render_cache_size: int = 0,
+    inline_cache_size: int = 0,
+    raw_html: bool = False,
+    ast_cache_dir: str = None,
+    ast_cache_size: int = 64 * 1024 * 1024,
+    gzip_level: int = None,
+    check_links: bool = False,
+    search: bool = False,
+    listings: bool = False,
+    site_url: str = None,
+    metadata_cache_path: str = None,
+    listing_dir: str = LISTING_DIR,
+    stream: bool = False,
+    render_cache: RenderCache = None,
+    inline_cache: InlineCache = None,
+    profile: BuildProfile = None,
+    template_bytes: bytes = None
+) -> BuildReport:
+    """
+    Renders every Markdown file in `source_dir` into `output_dir`.
+
+    :param source_dir: The directory holding the Markdown files.
+    :param output_dir: The directory the HTML files are written to.
+    :param template_path: The HTML template of every page.
+    :param incremental: Whether to skip pages whose inputs have not changed
+        since the build recorded in the manifest. Full builds still remove the
+        outputs of the pages deleted since the manifest was saved.
+    :param manifest_path: The file the build manifest is kept in. If None, no
+        manifest is kept, incremental builds rebuild every page and the
+        outputs of deleted pages are not removed.
+    :param jobs: The number of processes to generate pages in. With one job,
+        pages are generated in the current process.
+    :param static_dir: A directory of files that are copied into the output
+        directory as they are. It is skipped if it does not exist.
+    :param render_cache_size: The most rendered subtrees to reuse across the
+        pages of a process, or 0 to render every page in full. Only pages
+        that share subtrees benefit from the cache, which pages rendered from
+        Markdown rarely do, so it is off by default. It is meant for callers
+        that build shared chrome with `rendercache.intern`, not as a speedup
+        of ordinary builds.
+    :param inline_cache_size: The most parsed inline fragments to reuse across
+        the pages of a process, or 0 to parse every fragment.
+    :param raw_html: Whether text and attribute values are trusted HTML that is
+        rendered as it is, instead of being escaped.
+    :param ast_cache_dir: A directory to keep the parsed trees of documents
+        in, so documents that did not change are not parsed again by later
+        builds. If None, every document is parsed.
+    :param ast_cache_size: The most bytes of parsed trees kept in
+        `ast_cache_dir`, or 0 to parse every document. Parallel builds evict
+        once all pages are written.
+    :param gzip_level: If given, a copy of every page compressed with gzip at
+        this level (0 to 9) is written next to it with a `.gz` suffix. Copies
+        are only compressed again when their page changed.
+    :param check_links: Whether to check the internal links and images of
+        every page against the pages and static files of the site. With an
+        incremental build, only the pages whose links changed, or that link to
+        a page or file that was added or removed, are checked again.
+    :param search: Whether to write a search index of the text of every page
+        to the `search` directory of `output_dir`. An incremental build only
+        rewrites the shards of the index that hold terms of changed pages.
+    :param listings: Whether to write paginated listings of the pages with a
+        date in their front matter, and a feed and sitemap if `site_url` is
+        given. Only the front matter of every page is read for them.
+    :param site_url: The URL the site is served at, for the feed and sitemap.
+    :param metadata_cache_path: A file to keep the front matter of every page
+        in, so the front matter of unchanged files is not read again by later
+        builds. If None, every file's front matter is read.
+    :param listing_dir: The directory the listing pages are written to,
+        relative to `output_dir`. The build fails before writing a listing page
+        at the path of one of the site's pages.
+    :param stream: Whether to stream every page from its source file to its
+        output file one block at a time, so the memory of the build does not
+        grow with the size of its pages. Pages are hashed in chunks, and the
+        render and parse caches, which hold whole trees, are not used. The
+        report holds the throughput of the build and the peak memory of its
+        process since it started.
+    :param render_cache: A render cache to use instead of a new one, such as
+        one kept across builds. Only used when building with one job.
+    :param inline_cache: An inline cache to use instead of a new one, such as
+        one kept across builds. Only used when building with one job.
+    :param profile: A profile to collect the timings and counters of the
+        build in, including those of pages generated in worker processes. By
+        default, the build reports to the active profile, if any.
+    :param template_bytes: The contents of `template_path`, if the caller has
+        already read them, such as a daemon that keeps its templates.
+    :return: The report of the build.
+    :raise: ValueError if `jobs` is less than one or `gzip_level` is not
+        between 0 and 9.
+    """
+    if jobs < 1:
+        raise ValueError(f"The number of jobs must be at least 1, not {jobs}.")
+    if gzip_level is not None and not 0 <= gzip_level <= 9:
+        raise ValueError(f"The compression level must be between 0 and 9, not {gzip_level}.")
+
+    mode: EscapeMode = EscapeMode.RAW if raw_html else EscapeMode.ESCAPE
+    if profile is None:
+        profile = get_profile()
+
+    with escape_mode(mode), profiling(profile):
+        start: float = time.perf_counter()
+        report: BuildReport = BuildReport()
+
+        if template_bytes is None:
+            with open(template_path, "rb") as file:
+                template_bytes = file.read()
+        template: str = template_bytes.decode("utf-8")
+        template_hash: str = template_digest(template_bytes, mode, gzip_level is not None)
+
+        # The manifest is loaded by full builds too, so the outputs of pages
+        # deleted since any earlier build are still known and removed.
+        if manifest_path is not None:
+            manifest: BuildManifest = BuildManifest.load(manifest_path)
+        else:
+            manifest = BuildManifest(manifest_path)
+
+        if stream:
+            render_cache = None
+            render_cache_size = 0
+            ast_cache_dir = None
+        if jobs > 1:
+            render_cache = inline_cache = None
+        if render_cache is None and jobs == 1 and render_cache_size > 0:
+            render_cache = RenderCache(render_cache_size)
+        if inline_cache is None and jobs == 1 and inline_cache_size > 0:
+            inline_cache = InlineCache(inline_cache_size)
+        if ast_cache_dir is not None and jobs == 1 and ast_cache_size > 0:
+            ast_cache: ASTCache | None = ASTCache(ast_cache_dir, ast_cache_size)
+        else:
+            ast_cache = None
+
+        sources: list[str] = find_sources(source_dir)
+        # Serial builds compress pages in threads while the next page renders.
+        compress_threads: int = min(4, os.cpu_count() or 1) if jobs == 1 else 0
+        writer: OutputWriter = OutputWriter(output_dir, gzip_level, compress_threads)
+        writer.prepare([output_path_for(source) for source in sources])
+        # The manifest entries of the built pages from before they were built,
+        # so links that did not change are not checked again.
+        previous_pages: dict[str, dict | None] = {}
+        if search:
+            search_index: SearchIndex | None = SearchIndex.load(output_dir) if incremental else SearchIndex(output_dir)
+        else:
+            search_index = None
+        # The titles of the pages built in worker processes, for the search index.
+        titles: dict[str, str] = {}
+        # The bytes of Markdown of the built pages, if they are streamed.
+        source_size: int = 0
+
+        for source in sources:
+            source_path: str = os.path.join(source_dir, source)
+            if profile is not None:
+                profile.start("read")
+            if stream:
+                # Hashed in chunks, as `page_digest` hashes the whole file.
+                digest: str = content_digest(template_hash.encode(), path=source_path)
+            else:
+                with open(source_path, "rb") as file:
+                    source_bytes: bytes = file.read()
+                digest = page_digest(template_hash, source_bytes)
+            if profile is not None:
+                profile.stop()
+
+            output: str = output_path_for(source)
+            output_file: str = os.path.join(output_dir, output)
+
+            if (
+                incremental and manifest.is_current(source, digest, output) and os.path.exists(output_file)
+                and (not check_links or manifest.links(source) is not None)
+                and (search_index is None or search_index.has(output))
+            ):
+                report.skipped.append(source)
+                continue
+
+            links: list[Link] | None = [] if check_links and jobs == 1 else None
+            terms: dict[str, list[int]] | None = {} if search_index is not None and jobs == 1 else None
+            if stream:
+                source_size += os.path.getsize(source_path)
+                if jobs == 1:
+                    written, title = stream_page_file(source_dir, source, template, writer, inline_cache, links, terms)
+                    if not written:
+                        report.unchanged.append(source)
+                elif search_index is not None:
+                    # The page is streamed by a worker, which does not return its title.
+                    title = read_title(source_path, os.path.splitext(os.path.basename(source))[0])
+            else:
+                markdown: str = source_bytes.decode("utf-8")
+                if jobs == 1 and not write_page(
+                    output_dir, source, markdown, template, render_cache, inline_cache, ast_cache, writer, links, terms
+                ):
+                    report.unchanged.append(source)
+                if search_index is not None:
+                    title = page_title(source, markdown)
+            if terms is not None:
+                search_index.update(output, title, terms)
+            elif search_index is not None:
+                titles[source] = title
+
+            if check_links:
+                previous_pages[source] = manifest.pages.get(source) if incremental else None
+            manifest.record(source, digest, output)
+            if links is not None:
+                record_links(manifest, source, links, previous_pages[source])
+            report.built.append(source)
+
+        if jobs > 1 and report.built:
+            pages: list[tuple[str, str, str]] = [(source_dir, output_dir, source) for source in report.built]
+            workers: int = min(jobs, len(pages))
+            chunk_size: int = max(1, len(pages) // (workers * 4))
+
+            initargs: tuple = (
+                template, render_cache_size, inline_cache_size, mode, ast_cache_dir, ast_cache_size,
+                profile is not None, gzip_level, check_links, search, stream
+            )
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as executor:
+                results = executor.map(_write_page_in_worker, pages, chunksize=chunk_size)
+                for (_, _, source), (written, compression, page_profile, links, terms) in zip(pages, results):
+                    if not written:
+                        report.unchanged.append(source)
+                    if links is not None:
+                        record_links(manifest, source, links, previous_pages[source])
+                    if terms is not None:
+                        search_index.update(output_path_for(source), titles[source], terms)
+                    merge_compression(writer.compression, compression)
+                    if profile is not None:
+                        profile.merge(BuildProfile.from_dict(page_profile))
+            if ast_cache_dir is not None and ast_cache_size > 0:
+                ASTCache(ast_cache_dir, ast_cache_size)
+
+        if search_index is not None:
+            if profile is not None:
+                profile.start("search")
+            for url in sorted(search_index.urls() - {output_path_for(source) for source in sources}):
+                search_index.remove(url)
+            search_index.save(writer)
+            report.search = search_index.stats()
+            if profile is not None:
+                profile.stop()
+
+        if listings:
+            listing_files: dict[str, str] = write_listings(
+                source_dir, template, writer, sources, report, site_url, metadata_cache_path, listing_dir
+            )
+        else:
+            listing_files = {}
+
+        writer.close()
+        if gzip_level is not None:
+            report.compression = compression_report(writer.compression)
+
+        for source in sorted(set(manifest.pages) - set(sources)):
+            removed: str | None = remove_page(output_dir, manifest, source, writer)
+            if removed is not None:
+                report.removed.append(removed)
+
+        if static_dir is not None and os.path.isdir(static_dir):
+            if profile is not None:
+                profile.start("static")
+            report.copied = copy_static(static_dir, output_dir)
+            if profile is not None:
+                profile.stop()
+
+        if check_links:
+            if profile is not None:
+                profile.start("links")
+            targets: set[str] = {entry["output"] for entry in manifest.pages.values()}
+            targets.update(listing_files)
+            if static_dir is not None:
+                targets.update(find_files(static_dir))
+            broken_links, checked = check_site_links(manifest, targets)
+            report.links = {"checked": checked, "broken": broken_links}
+            if profile is not None:
+                profile.stop()
+
+        if manifest_path is not None:
+            manifest.save()
+
+        if render_cache is not None:
+            report.render_cache = render_cache.stats()
+
+        if inline_cache is not None:
+            report.inline_cache = inline_cache.stats()
+
+        if ast_cache is not None:
+            report.ast_cache = ast_cache.stats()
+
+        report.seconds = time.perf_counter() - start
+        if stream:
+            report.memory = {
+                "peak_rss": peak_rss(children=jobs > 1),
+                "pages_per_second": len(report.built) / max(report.seconds, 1e-9),
+                "mb_per_second": source_size / (1024 * 1024) / max(report.seconds, 1e-9),
+            }
+
+        return report
@@ -0,0 +1,53 @@
+"""
+This module contains the client of the build daemon.
+
+The client only imports the standard library, so asking a running daemon for a
+build does not pay for importing the generator. Requests and responses are
+single lines of JSON sent over the daemon's Unix socket.
+"""
+import json
+import socket
+
+# The most bytes of a single request or response line.
+MAX_MESSAGE_BYTES: int = 16 * 1024 * 1024
+
+
+class DaemonError(Exception):
+    """
+    Raised when the daemon could not handle a request.
+    """
+
+
+def send_request(socket_path: str, request: dict, timeout: float = None) -> dict | None:
+    """
+    Sends a request to the build daemon and waits for its response.
+
+    :param socket_path: The path of the daemon's Unix socket.
+    :param request: The request, with a "command" and its arguments.
+    :param timeout: The most seconds to wait for the response, or None to wait
+        until the daemon answers.
+    :return: The response of the daemon, or None if no daemon is listening on
+        the socket.
+    :raise: DaemonError if the daemon failed to handle the request.
+    """
+    connection: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.settimeout(timeout)
+
+    with connection:
+        try:
+            connection.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            return None
+
+        connection.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with connection.makefile("rb") as stream:
+            line: bytes = stream.readline(MAX_MESSAGE_BYTES)
+
+    if not line:
+        raise DaemonError("The daemon closed the connection without responding.")
+
+    response: dict = json.loads(line)
+    if not response.get("ok"):
+        raise DaemonError(response.get("error", "The daemon failed to handle the request."))
+
+    return response
@@ -0,0 +1,226 @@
+"""
+This module contains the build daemon of the static site generator.
+
+Building a small site takes less time than starting the interpreter and
+importing the generator. `BuildDaemon` keeps one warm process listening on a
+local Unix socket and builds sites on request, reusing its templates and its
+render and inline caches across requests. A template is read again once its
+modification time or size changes. Parallel builds render in worker processes
+with caches of their own, so only single-job builds reuse the daemon's caches.
+Requests are handled one at a time, and every response carries the report and
+timing of its build.
+
+Requests and responses are single lines of JSON (see `client.send_request`):
+
+- `{"command": "build", "source": ..., "output": ..., "template": ..., ...}`
+  builds a site with `build_site` and responds with its report.
+- `{"command": "ping"}` responds with the statistics of the daemon.
+- `{"command": "shutdown"}` stops the daemon once it has responded.
+"""
+import json
+import os
+import socketserver
+import threading
+import time
+from build import BuildReport, build_site
+from client import MAX_MESSAGE_BYTES, send_request
+from inlinecache import InlineCache
+from rendercache import RenderCache
+
+# The options of a build request that are passed on to `build_site`.
+BUILD_OPTIONS: tuple[str, ...] = (
+    "incremental", "manifest_path", "jobs", "static_dir", "raw_html", "ast_cache_dir", "ast_cache_size",
+    "gzip_level", "check_links", "search", "listings", "site_url", "metadata_cache_path", "listing_dir",
+    "stream"
+)
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Reads a request from a client connection and writes the daemon's response.
+    """
+
+    server: "DaemonServer"
+
+    def handle(self) -> None:
+        """
+        Handles a single request. Errors are sent to the client instead of
+        stopping the daemon.
+        """
+        line: bytes = self.rfile.readline(MAX_MESSAGE_BYTES)
+        if not line:
+            return
+
+        try:
+            response: dict = self.server.daemon.handle(json.loads(line))
+        except Exception as error:
+            response = {"ok": False, "error": f"{type(error).__name__}: {error}"}
+
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """
+    A Unix socket server that hands its requests to a BuildDaemon.
+    """
+
+    def __init__(self, socket_path: str, daemon: "BuildDaemon") -> None:
+        """
+        Instantiates a DaemonServer listening on a socket.
+
+        :param socket_path: The path of the Unix socket.
+        :param daemon: The daemon that handles the requests.
+        """
+        self.daemon: BuildDaemon = daemon
+        super().__init__(socket_path, DaemonRequestHandler)
+
+
+class BuildDaemon:
+    """
+    Builds sites on request in a long-lived process, keeping its caches warm.
+    """
+
+    __slots__ = ("socket_path", "render_cache", "inline_cache", "requests", "started", "_server", "_templates")
+
+    def __init__(self, socket_path: str, render_cache_size: int = 0, inline_cache_size: int = 4096) -> None:
+        """
+        Instantiates a BuildDaemon.
+
+        :param socket_path: The path of the Unix socket to listen on.
+        :param render_cache_size: The most rendered subtrees kept across
+            builds, or 0 for no render cache.
+        :param inline_cache_size: The most parsed inline fragments kept across
+            builds, or 0 for no inline cache.
+        """
+        self.socket_path: str = socket_path
+        self.render_cache: RenderCache | None = RenderCache(render_cache_size) if render_cache_size > 0 else None
+        self.inline_cache: InlineCache | None = InlineCache(inline_cache_size) if inline_cache_size > 0 else None
+        self.requests: int = 0
+        self.started: float = time.monotonic()
+        self._server: DaemonServer | None = None
+        # The modification time, size and contents of every template, by path.
+        self._templates: dict[str, tuple[int, int, bytes]] = {}
+
+    def handle(self, request: dict) -> dict:
+        """
+        Handles a request from a client.
+
+        :param request: The request, with a "command" and its arguments.
+        :return: The response to send to the client.
+        :raise: ValueError if the command is unknown.
+        """
+        self.requests += 1
+        command: str | None = request.get("command")
+
+        if command == "build":
+            return self.build(request)
+        if command == "ping":
+            return {"ok": True, **self.stats()}
+        if command == "shutdown":
+            if self._server is not None:
+                threading.Thread(target=self._server.shutdown, daemon=True).start()
+            return {"ok": True}
+
+        raise ValueError(f"Unknown command: {command!r}")
+
+    def build(self, request: dict) -> dict:
+        """
+        Builds a site with the daemon's caches.
+
+        :param request: The "source", "output" and "template" paths, and any
+            of the `BUILD_OPTIONS`.
+        :return: The response with the report of the build, its summary and
+            the seconds the daemon spent on the request.
+        """
+        start: float = time.perf_counter()
+        options: dict = {name: request[name] for name in BUILD_OPTIONS if name in request}
+
+        report: BuildReport = build_site(
+            request["source"], request["output"], request["template"],
+            render_cache=self.render_cache, inline_cache=self.inline_cache,
+            template_bytes=self.read_template(request["template"]), **options
+        )
+
+        return {
+            "ok": True,
+            "report": report.as_dict(),
+            "summary": report.summary(),
+            "seconds": time.perf_counter() - start,
+        }
+
+    def read_template(self, path: str) -> bytes:
+        """
+        Reads a template, reusing the contents read by an earlier request while
+        the modification time and size of the file are unchanged.
+
+        :param path: The path of the template.
+        :return: The contents of the template.
+        :raise: OSError if the template cannot be read.
+        """
+        status: os.stat_result = os.stat(path)
+        cached: tuple[int, int, bytes] | None = self._templates.get(path)
+        if cached is not None and cached[:2] == (status.st_mtime_ns, status.st_size):
+            return cached[2]
+
+        with open(path, "rb") as file:
+            template_bytes: bytes = file.read()
+        self._templates[path] = (status.st_mtime_ns, status.st_size, template_bytes)
+
+        return template_bytes
+
+    def stats(self) -> dict:
+        """
+        Reports the state of the daemon.
+
+        :return: The process id, number of requests, uptime, number of kept
+            templates and cache statistics of the daemon.
+        """
+        return {
+            "pid": os.getpid(),
+            "requests": self.requests,
+            "uptime": time.monotonic() - self.started,
+            "templates": len(self._templates),
+            "render_cache": None if self.render_cache is None else self.render_cache.stats(),
+            "inline_cache": None if self.inline_cache is None else self.inline_cache.stats(),
+        }
+
+    def make_server(self) -> DaemonServer:
+        """
+        Creates the server of the daemon, replacing a socket file that was left
+        behind by a daemon that is no longer running.
+
+        :return: The server, listening on the daemon's socket.
+        :raise: RuntimeError if another daemon is listening on the socket.
+        """
+        if os.path.exists(self.socket_path):
+            try:
+                running: bool = send_request(self.socket_path, {"command": "ping"}, timeout=1.0) is not None
+            except (OSError, ValueError):
+                running = False
+            if running:
+                raise RuntimeError(f"A daemon is already listening on {self.socket_path}.")
+            os.remove(self.socket_path)
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+        # Only the user running the daemon may ask it to read and write files,
+        # so the socket is created without access for anyone else.
+        umask: int = os.umask(0o177)
+        try:
+            self._server = DaemonServer(self.socket_path, self)
+        finally:
+            os.umask(umask)
+
+        return self._server
+
+    def serve_forever(self) -> None:
+        """
+        Handles requests until the daemon is shut down or interrupted, and
+        removes its socket afterwards.
+        """
+        with self.make_server() as server:
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                os.remove(self.socket_path)
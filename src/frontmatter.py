@@ -0,0 +1,254 @@
+"""
+This module contains the front matter of Markdown documents, and a scanner that
+reads only the front matter of many files.
+
+Front matter is an optional header at the very start of a document, between two
+`---` lines, with a `key: value` field on every line:
+
+    ---
+    title: Hello, world
+    date: 2024-05-01
+    tags: [python, static sites]
+    ---
+
+Only the `title`, `date` (an ISO date) and `tags` (a list separated with
+commas, optionally in brackets) fields are used, and other fields are ignored.
+The header is not part of the rendered page. A document whose opening fence is
+never closed has no front matter.
+
+Listing pages, feeds and sitemaps only need the front matter of every page, not
+its body. A `MetadataCache` reads every file only up to its closing fence, and
+remembers the result by the file's modification time and size, so files that
+did not change are not even opened by later scans.
+"""
+import datetime
+import itertools
+import json
+import os
+from typing import Iterable, Iterator
+
+FENCE: str = "---"
+# Changed when the format of the cache file changes, so older caches are ignored.
+FORMAT_VERSION: int = 1
+
+
+def empty_metadata() -> dict:
+    """
+    Creates the metadata of a document without front matter.
+
+    :return: The metadata, with no title or date and no tags.
+    """
+    return {"title": None, "date": None, "tags": []}
+
+
+def split_front_matter_lines(lines: Iterable[str]) -> tuple[dict, Iterator[str]]:
+    """
+    Reads the front matter from the lines of a document. Lines are only read up
+    to the closing fence.
+
+    :param lines: The lines of the document, such as an open file.
+    :return: The title, date and tags of the document, and an iterator of its
+        remaining lines.
+    :raise: ValueError if the date is not an ISO date.
+    """
+    iterator: Iterator[str] = iter(lines)
+    first: str | None = next(iterator, None)
+
+    if first is None:
+        return empty_metadata(), iterator
+    if first.rstrip("\r\n") != FENCE:
+        return empty_metadata(), itertools.chain((first,), iterator)
+
+    header: list[str] = []
+    for line in iterator:
+        if line.rstrip("\r\n") == FENCE:
+            return parse_fields(header), iterator
+        header.append(line)
+
+    return empty_metadata(), itertools.chain((first,), header)
+
+
+def split_front_matter(markdown: str) -> tuple[dict, str]:
+    """
+    Separates the front matter of a document from its body.
+
+    :param markdown: The Markdown document.
+    :return: The title, date and tags of the document, and its body.
+    :raise: ValueError if the date is not an ISO date.
+    """
+    if not markdown.startswith(FENCE):
+        return empty_metadata(), markdown
+
+    metadata, lines = split_front_matter_lines(markdown.splitlines(keepends=True))
+
+    return metadata, "".join(lines)
+
+
+def parse_fields(lines: Iterable[str]) -> dict:
+    """
+    Parses the fields of a front matter header.
+
+    :param lines: The lines between the fences.
+    :return: The title, date and tags of the document.
+    :raise: ValueError if the date is not an ISO date.
+    """
+    metadata: dict = empty_metadata()
+
+    for line in lines:
+        key, separator, value = line.partition(":")
+        key = key.strip().lower()
+        value = value.strip()
+        if not separator or key not in metadata:
+            continue
+
+        if key == "tags":
+            if value.startswith("[") and value.endswith("]"):
+                value = value[1:-1]
+            metadata["tags"] = [tag for tag in (_unquote(tag.strip()) for tag in value.split(",")) if tag]
+        elif key == "date":
+            value = _unquote(value)
+            try:
+                metadata["date"] = datetime.date.fromisoformat(value).isoformat() if value else None
+            except ValueError:
+                raise ValueError(f"The date {value!r} is not an ISO date such as 2024-05-01.") from None
+        else:
+            metadata["title"] = _unquote(value) or None
+
+    return metadata
+
+
+def read_front_matter(path: str) -> dict:
+    """
+    Reads the front matter of a file, without reading the rest of it.
+
+    :param path: The path of the Markdown file.
+    :return: The title, date and tags of the document.
+    :raise: ValueError if the date is not an ISO date.
+    """
+    with open(path, encoding="utf-8") as file:
+        return split_front_matter_lines(file)[0]
+
+
+class MetadataCache:
+    """
+    Keeps the front matter of the files of a site, by the modification time
+    and size of every file.
+    """
+
+    __slots__ = ("path", "entries", "hits", "misses")
+
+    def __init__(self, path: str, entries: dict[str, list] = None) -> None:
+        """
+        Instantiates a MetadataCache.
+
+        :param path: The file the cache is saved to, or None to keep it in
+            memory only.
+        :param entries: A mapping of every source path to its modification
+            time in nanoseconds, size and metadata.
+        """
+        self.path: str | None = path
+        self.entries: dict[str, list] = {} if entries is None else entries
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @classmethod
+    def load(cls, path: str) -> "MetadataCache":
+        """
+        Loads a cache from disk.
+
+        :param path: The file the cache is saved to.
+        :return: The cache, or an empty cache if the file is missing or cannot
+            be read.
+        """
+        try:
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return cls(path)
+
+        if (
+            not isinstance(data, dict) or data.get("version") != FORMAT_VERSION
+            or not isinstance(data.get("pages"), dict)
+        ):
+            return cls(path)
+
+        return cls(path, data["pages"])
+
+    def scan(self, source_dir: str, source: str) -> dict:
+        """
+        Finds the front matter of a file, reading it only if it changed since
+        it was last scanned.
+
+        :param source_dir: The directory holding the Markdown files.
+        :param source: The path of the file, relative to `source_dir`.
+        :return: The title, date and tags of the document.
+        :raise: ValueError if the date is not an ISO date.
+        """
+        path: str = os.path.join(source_dir, source)
+        stat: os.stat_result = os.stat(path)
+
+        entry: list | None = self.entries.get(source)
+        if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            self.hits += 1
+            return entry[2]
+
+        self.misses += 1
+        metadata: dict = read_front_matter(path)
+        self.entries[source] = [stat.st_mtime_ns, stat.st_size, metadata]
+
+        return metadata
+
+    def scan_all(self, source_dir: str, sources: list[str]) -> dict[str, dict]:
+        """
+        Finds the front matter of every file of a site, and forgets the files
+        that no longer exist.
+
+        :param source_dir: The directory holding the Markdown files.
+        :param sources: The paths of the files, relative to `source_dir`.
+        :return: A mapping of every source path to its title, date and tags.
+        :raise: ValueError if a date is not an ISO date.
+        """
+        metadata: dict[str, dict] = {source: self.scan(source_dir, source) for source in sources}
+
+        for source in set(self.entries) - set(metadata):
+            del self.entries[source]
+
+        return metadata
+
+    def save(self) -> None:
+        """
+        Writes the cache to its file, creating the directory if needed.
+        """
+        if self.path is None:
+            return
+
+        directory: str = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temporary_path: str = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump({"version": FORMAT_VERSION, "pages": self.entries}, file, separators=(",", ":"))
+
+        os.replace(temporary_path, self.path)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Reports how many files were read.
+
+        :return: The number of files whose metadata was reused and read.
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def _unquote(value: str) -> str:
+    """
+    Removes the quotes around a value, if it has any.
+
+    :param value: The value.
+    :return: The value without quotes.
+    """
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+
+    return value
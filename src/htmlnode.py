@@ -5,13 +5,50 @@ dependent on whether they contain more HTML elements within them.
 HTMLNode is an abstract class that has two children classes: LeafNode (for 
 elements that do not have nested elements), and ParentNode (elements containing
 nested elements).
+
+Nodes can be rendered either to a single string with `to_html`, or as a stream
+of fragments with `iter_html`/`render_to` so large documents can be written to
+a file without building the whole string in memory.
+
+Text and attribute values are escaped as they are rendered, unless the escape
+mode is set to `EscapeMode.RAW` for content that is trusted to be HTML.
 """
+from contextlib import contextmanager
+from enum import Enum
+from functools import lru_cache
+from typing import Iterable, Iterator, Protocol
+
+
+class EscapeMode(Enum):
+    """
+    Holds the ways text and attribute values can be rendered.
+    """
+    ESCAPE: str = "escape"
+    RAW: str = "raw"
+
+
+# The escape mode of every node rendered in this process.
+_escape_mode: EscapeMode = EscapeMode.ESCAPE
+_RAW: EscapeMode = EscapeMode.RAW
+
+
+class Writer(Protocol):
+    """
+    Anything with a `write` method that accepts strings, such as a text file or
+    an `io.StringIO`.
+    """
+
+    def write(self, text: str) -> int | None:
+        ...
+
 
 class HTMLNode:
     """
     Represents elements (with their contents) in a HTML document tree to render
     itself to HTML.
     """
+
+    __slots__ = ("tag", "value", "children", "props")
     
     def __init__(
         self, tag: str = None,
@@ -38,7 +75,26 @@ class HTMLNode:
 
         :return: A string that holds the HTML to render the element.
         """
+        return "".join(self.iter_html())
+
+    def iter_html(self) -> Iterator[str]:
+        """
+        Renders the HTML elements as a sequence of string fragments that
+        together make up the output of `to_html`.
+
+        :return: An iterator over the fragments of the rendered HTML.
+        """
         raise NotImplementedError()
+
+    def render_to(self, writer: Writer) -> None:
+        """
+        Writes the rendered HTML to a writer fragment by fragment.
+
+        :param writer: The file-like object to write the HTML to.
+        """
+        write = writer.write
+        for fragment in self.iter_html():
+            write(fragment)
     
     def props_to_html(self) -> str:
         """
@@ -49,14 +105,17 @@ class HTMLNode:
         if self.props is None:
             return ""
 
-        attributes = ""
-        for k, v in self.props.items():
-            if attributes:
-                attributes += " "
-            
-            attributes += f"{k}=\"{v}\""
-            
-        return attributes
+        # The string is looked up by the current items of the props, so a
+        # mutated props dict never gets the string of its old contents.
+        items: tuple[tuple[str, str], ...] = tuple(self.props.items())
+        for key, value in items:
+            if type(key) is not str or type(value) is not str:
+                # Looked up as the strings they render as, since values such
+                # as 1, 1.0 and True are equal but render differently.
+                items = tuple([(str(key), str(value)) for key, value in items])
+                break
+
+        return _cached_attributes(items, _escape_mode)
     
     def __repr__(self) -> str:
         """
@@ -72,6 +131,8 @@ class LeafNode(HTMLNode):
     Represents elements with no other HTML tags within it; a HTMLNode without
     any children.
     """
+
+    __slots__ = ()
     
     def __init__(self, tag: str, value: str, props: dict[str, str] = None) -> None:
         """
@@ -94,11 +155,20 @@ class LeafNode(HTMLNode):
             raise ValueError("Elements without children must have a value")
         
         if self.tag is None:
-            return self.value
+            return escape_value(self.value)
         
         tag_attr = "" if self.props is None else f" {self.props_to_html()}"
         
-        return f"<{self.tag}{tag_attr}>{self.value}</{self.tag}>"
+        return f"<{self.tag}{tag_attr}>{escape_value(self.value)}</{self.tag}>"
+
+    def iter_html(self) -> Iterator[str]:
+        """
+        Yields the HTML of the LeafNode as a single fragment.
+
+        :return: An iterator over the rendered HTML.
+        :raise ValueError: When there is no value, there is a ValueError.
+        """
+        yield self.to_html()
     
     def __repr__(self) -> str:
         """
@@ -113,6 +183,8 @@ class ParentNode(HTMLNode):
     """
     Represents elements that contain nested elements.
     """
+
+    __slots__ = ()
     
     def __init__(self, tag: str, children: list[HTMLNode], props: dict[str, str] = None) -> None:
         """
@@ -126,24 +198,62 @@ class ParentNode(HTMLNode):
         
     def to_html(self) -> str:
         """
-        Converts a the ParentNode (along with its children) into HTML.
-        The resulting string will be a single line (not pretty printed).
+        Converts a the ParentNode (along with its children) into HTML. The HTML
+        is a single line (not pretty printed).
+
+        :return: A string that holds the HTML to render the element.
+        """
+        return "".join(self.iter_html())
 
-        :return: The string holding the rendered HTML.
+    def iter_html(self) -> Iterator[str]:
+        """
+        Converts a the ParentNode (along with its children) into HTML
+        fragments. Joined together, the fragments form a single line (not
+        pretty printed).
+
+        The tree is walked with an explicit stack instead of recursion, so
+        trees of any depth can be rendered.
+
+        :return: An iterator over the fragments of the rendered HTML.
+        """
+        yield self.open_tag()
+        stack: list[tuple[ParentNode, Iterator[HTMLNode]]] = [(self, iter(self.children))]
+
+        while stack:
+            node, children = stack[-1]
+
+            for child in children:
+                if isinstance(child, ParentNode):
+                    yield child.open_tag()
+                    stack.append((child, iter(child.children)))
+                    break
+
+                yield child.to_html()
+            else:
+                stack.pop()
+                yield node.close_tag()
+
+    def open_tag(self) -> str:
+        """
+        Renders the opening tag of the ParentNode, with its attributes.
+
+        :return: The opening tag.
+        :raise ValueError: When the node has no tag or no children.
         """
         if self.tag is None:
             raise ValueError("This node has no tag!")
         elif not self.children:
             raise ValueError("The ParentNode must have children.")
-        
-        html: str = f"<{self.tag}{'' if self.props is None else f' {self.props_to_html()}'}>"
-        
-        for child in self.children:
-            html += child.to_html()
 
-        html += f"</{self.tag}>"
-        
-        return html
+        return f"<{self.tag}{'' if self.props is None else f' {self.props_to_html()}'}>"
+
+    def close_tag(self) -> str:
+        """
+        Renders the closing tag of the ParentNode.
+
+        :return: The closing tag.
+        """
+        return f"</{self.tag}>"
     
     def __repr__(self) -> str:
         """
@@ -152,3 +262,102 @@ class ParentNode(HTMLNode):
         :return: ParentNode string representation.
         """
         return f"ParentNode({self.tag}, {self.children}, {self.props})"
+
+
+def get_escape_mode() -> EscapeMode:
+    """
+    Finds how text and attribute values are currently rendered.
+
+    :return: The escape mode of this process.
+    """
+    return _escape_mode
+
+
+def set_escape_mode(mode: EscapeMode) -> EscapeMode:
+    """
+    Changes how text and attribute values are rendered in this process.
+
+    :param mode: `EscapeMode.ESCAPE` to escape values (the default), or
+        `EscapeMode.RAW` to render values that are trusted to be HTML as they
+        are.
+    :return: The previous escape mode.
+    """
+    global _escape_mode
+    previous: EscapeMode = _escape_mode
+    _escape_mode = EscapeMode(mode)
+
+    return previous
+
+
+@contextmanager
+def escape_mode(mode: EscapeMode) -> Iterator[None]:
+    """
+    Renders with a different escape mode until the context exits.
+
+    :param mode: The escape mode to render with.
+    """
+    previous: EscapeMode = set_escape_mode(mode)
+    try:
+        yield
+    finally:
+        set_escape_mode(previous)
+
+
+def escape_html(text: str) -> str:
+    """
+    Escapes the characters of a string that are special in HTML text and
+    attribute values, the same as `html.escape(text, quote=True)`. Strings
+    without special characters are returned as they are.
+
+    :param text: The string to escape.
+    :return: The escaped string.
+    """
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    if "\"" in text:
+        text = text.replace("\"", "&quot;")
+    if "'" in text:
+        text = text.replace("'", "&#x27;")
+
+    return text
+
+
+def escape_value(value: object) -> str:
+    """
+    Renders a text or attribute value in the current escape mode.
+
+    :param value: The value to render.
+    :return: The value as a string, escaped unless the mode is RAW.
+    """
+    text: str = value if type(value) is str else str(value)
+    if _escape_mode is _RAW:
+        return text
+
+    return escape_html(text)
+
+
+def _format_attributes(items: Iterable[tuple[str, str]]) -> str:
+    """
+    Creates a string of tag attributes in the current escape mode.
+
+    :param items: The key-value pairs of the attributes.
+    :return: The attributes separated by spaces.
+    """
+    return " ".join([f"{k}=\"{escape_value(v)}\"" for k, v in items])
+
+
+@lru_cache(maxsize=4096)
+def _cached_attributes(items: tuple[tuple[str, str], ...], mode: EscapeMode) -> str:
+    """
+    Creates a string of tag attributes once for every distinct set of
+    attributes, as many nodes share the same attributes.
+
+    :param items: The key-value pairs of the attributes.
+    :param mode: The current escape mode, which the string depends on.
+    :return: The attributes separated by spaces.
+    """
+    return _format_attributes(items)
@@ -0,0 +1,113 @@
+"""
+This module contains a cache of parsed inline Markdown.
+
+Across a site the same inline fragments recur many times: boilerplate
+sentences, repeated link lines and list items. The InlineCache maps the raw
+text of a fragment to the TextNodes it parses into, so every distinct fragment
+is only parsed once while it stays in the cache. Parsed results are tuples of
+FrozenTextNodes, so callers cannot corrupt the entries they are given.
+
+The cache is opt-in and bounded: it holds at most `max_entries` fragments and
+evicts the least recently used fragment first.
+"""
+from collections import OrderedDict
+from markdown import text_to_textnodes
+from textnode import FrozenTextNode
+
+
+class InlineCache:
+    """
+    Parses inline Markdown, reusing the TextNodes of text that was parsed
+    before.
+    """
+
+    __slots__ = ("_max_entries", "hits", "misses", "evictions", "_entries")
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        """
+        Instantiates an empty InlineCache.
+
+        :param max_entries: The most fragments whose TextNodes are kept.
+        :raise: ValueError if `max_entries` is less than one.
+        """
+        self._max_entries: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._entries: OrderedDict[str, tuple[FrozenTextNode, ...]] = OrderedDict()
+        self.max_entries = max_entries
+
+    @property
+    def max_entries(self) -> int:
+        """
+        The most fragments whose TextNodes are kept.
+        """
+        return self._max_entries
+
+    @max_entries.setter
+    def max_entries(self, max_entries: int) -> None:
+        """
+        Changes the capacity of the cache, evicting the least recently used
+        fragments if it shrinks below the number of cached fragments.
+
+        :param max_entries: The new capacity.
+        :raise: ValueError if `max_entries` is less than one.
+        """
+        if max_entries < 1:
+            raise ValueError(f"The cache must hold at least 1 entry, not {max_entries}.")
+
+        self._max_entries = max_entries
+        self._evict()
+
+    def parse(self, text: str) -> tuple[FrozenTextNode, ...]:
+        """
+        Parses a string of inline Markdown, the same as `text_to_textnodes`.
+
+        :param text: The raw inline Markdown to parse.
+        :return: The parsed TextNodes, which must not be changed.
+        :raise: ValueError in the cases where a delimiter is not closed.
+        """
+        nodes: tuple[FrozenTextNode, ...] | None = self._entries.get(text)
+        if nodes is not None:
+            self.hits += 1
+            self._entries.move_to_end(text)
+            return nodes
+
+        self.misses += 1
+        nodes = tuple(FrozenTextNode.freeze(node) for node in text_to_textnodes(text))
+
+        self._entries[text] = nodes
+        self._evict()
+
+        return nodes
+
+    def stats(self) -> dict[str, int]:
+        """
+        Reports how well the cache is working.
+
+        :return: The hits, misses, evictions, current number of entries and
+            capacity.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "max_entries": self._max_entries,
+        }
+
+    def clear(self) -> None:
+        """
+        Empties the cache and resets its counters.
+        """
+        self.hits = self.misses = self.evictions = 0
+        self._entries.clear()
+
+    def _evict(self) -> None:
+        """
+        Evicts the least recently used fragments until the cache is within its
+        capacity.
+        """
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
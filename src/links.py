@@ -0,0 +1,203 @@
+"""
+This module contains the link index of a site and the check for broken links.
+
+The LINK and IMAGE TextNodes of a page are the only record of what it points
+to. While a page is rendered, `extract_links` collects the kind and URL of each
+of them, and the build records them for the page in its manifest. The recorded
+links form an index of source page to target URL (anchor included), which
+outlives the build, so pages skipped by an incremental build keep their links
+without being parsed again.
+
+Internal links and images are checked against the set of paths of the site's
+generated pages and static files, with a set lookup for every link instead of
+a crawl of the output directory. A link such as `/about` is found if `about`,
+`about.html` or `about/index.html` exists, like most static hosts serve it.
+External URLs and anchors within the same page are not checked.
+
+The results are recorded in the manifest as well. A page is only checked again
+when its links changed or when a path it links to was added or removed.
+"""
+import os
+import posixpath
+import re
+from urllib.parse import unquote
+from htmlnode import HTMLNode, ParentNode
+from manifest import BuildManifest
+from textnode import InlineNode, TextType
+
+# A link is its kind ("link" or "image") and its URL.
+Link = list[str]
+
+_SCHEME_PATTERN: re.Pattern = re.compile(r"[A-Za-z][A-Za-z0-9+.-]*:")
+
+_LINK_KINDS: dict[TextType, str] = {TextType.LINK: "link", TextType.IMAGE: "image"}
+
+
+def extract_links(node: HTMLNode) -> list[Link]:
+    """
+    Collects the links and images of a tree of HTMLNodes.
+
+    :param node: The root of the tree, such as the content of a page.
+    :return: The kind and URL of every link and image, in document order.
+    """
+    links: list[Link] = []
+    stack: list[HTMLNode] = [node]
+
+    while stack:
+        current: HTMLNode = stack.pop()
+
+        if isinstance(current, InlineNode):
+            for text_node in current.text_nodes:
+                kind: str | None = _LINK_KINDS.get(text_node.text_type)
+                if kind is not None:
+                    links.append([kind, text_node.url])
+        elif isinstance(current, ParentNode):
+            stack.extend(reversed(current.children))
+
+    return links
+
+
+def resolve_link(url: str, output: str) -> str | None:
+    """
+    Finds the path within the site that a link points to.
+
+    :param url: The URL of the link.
+    :param output: The path of the page the link is on, relative to the
+        output directory.
+    :return: The path of the target relative to the output directory, ending
+        with "/" if it is a directory, or None if the link is external or
+        points within the same page. Paths outside the site start with "../".
+    """
+    if not url or url.startswith(("#", "?", "//")) or _SCHEME_PATTERN.match(url):
+        return None
+
+    path: str = unquote(url.partition("#")[0].partition("?")[0])
+    if not path:
+        return None
+
+    joined: str = path.lstrip("/") if path.startswith("/") else posixpath.join(posixpath.dirname(output), path)
+    if not joined:
+        return ""
+
+    normalized: str = posixpath.normpath(joined)
+    if normalized == ".":
+        return ""
+
+    return f"{normalized}/" if joined.endswith("/") else normalized
+
+
+def link_candidates(path: str) -> tuple[str, ...]:
+    """
+    Lists the files that a static host could serve for a path.
+
+    :param path: A path returned by `resolve_link`.
+    :return: The paths of the files, any of which makes the link valid.
+    """
+    if not path or path.endswith("/"):
+        return (f"{path}index.html",)
+
+    if posixpath.splitext(path)[1]:
+        return (path,)
+
+    return path, f"{path}.html", f"{path}/index.html"
+
+
+def find_broken_links(output: str, links: list[Link], targets: set[str]) -> list[Link]:
+    """
+    Checks the internal links of a page.
+
+    :param output: The path of the page, relative to the output directory.
+    :param links: The kind and URL of every link of the page.
+    :param targets: The paths of every page and static file of the site.
+    :return: The links whose targets do not exist.
+    """
+    broken: list[Link] = []
+
+    for link in links:
+        path: str | None = resolve_link(link[1], output)
+        if path is not None and not any(candidate in targets for candidate in link_candidates(path)):
+            broken.append(link)
+
+    return broken
+
+
+def record_links(manifest: BuildManifest, source: str, links: list[Link], previous: dict | None) -> None:
+    """
+    Records the links of a page that was just built, keeping the results of
+    its last check if its links did not change.
+
+    :param manifest: The manifest the page was recorded in.
+    :param source: The path of the page's source file.
+    :param links: The kind and URL of every link of the page.
+    :param previous: The manifest entry of the page before it was built, if
+        any.
+    """
+    unchanged: bool = previous is not None and previous.get("links") == links
+
+    manifest.record_links(source, links, previous.get("broken") if unchanged else None)
+
+
+def check_links(manifest: BuildManifest, targets: set[str]) -> tuple[dict[str, list[Link]], list[str]]:
+    """
+    Checks the links of the pages whose links changed, or that link to a path
+    that was added or removed since the last check, and records the results
+    and the paths in the manifest. Pages without recorded links are skipped.
+
+    :param manifest: The manifest the pages and their links are recorded in.
+    :param targets: The paths of every page and static file of the site.
+    :return: The broken links of every page that has any, and the sorted
+        sources of the pages that were checked.
+    """
+    changed_targets: set[str] = targets.symmetric_difference(manifest.targets)
+    broken_links: dict[str, list[Link]] = {}
+    checked: list[str] = []
+
+    for source, entry in manifest.pages.items():
+        links: list[Link] | None = entry.get("links")
+        if links is None:
+            continue
+
+        if "broken" not in entry or (changed_targets and _links_to(entry["output"], links, changed_targets)):
+            manifest.record_links(source, links, find_broken_links(entry["output"], links, targets))
+            checked.append(source)
+
+        if entry["broken"]:
+            broken_links[source] = entry["broken"]
+
+    manifest.targets = sorted(targets)
+
+    return broken_links, sorted(checked)
+
+
+def find_files(directory: str) -> list[str]:
+    """
+    Lists the files in a directory and its subdirectories.
+
+    :param directory: The directory to list. It may not exist.
+    :return: The paths of the files, relative to `directory` and separated
+        with "/".
+    """
+    files: list[str] = []
+
+    for current, _, names in os.walk(directory):
+        relative_dir: str = os.path.relpath(current, directory).replace(os.sep, "/")
+        files.extend(name if relative_dir == "." else f"{relative_dir}/{name}" for name in names)
+
+    return files
+
+
+def _links_to(output: str, links: list[Link], paths: set[str]) -> bool:
+    """
+    Checks whether any link of a page could point to one of some paths.
+
+    :param output: The path of the page, relative to the output directory.
+    :param links: The kind and URL of every link of the page.
+    :param paths: The paths to look for.
+    :return: Whether a link could point to one of the paths.
+    """
+    for _, url in links:
+        path: str | None = resolve_link(url, output)
+        if path is not None and any(candidate in paths for candidate in link_candidates(path)):
+            return True
+
+    return False
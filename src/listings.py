@@ -0,0 +1,255 @@
+"""
+This module contains the pages of a site that list other pages: paginated
+listings of posts, an RSS feed and a sitemap.
+
+They are generated from the front matter of every page alone (see
+`frontmatter`), without parsing or rendering the body of any page. Posts are
+the pages whose front matter has a date, newest first. A post without a title
+in its front matter is listed under the name of its file.
+
+The listing pages are rendered into the site's template and written to the
+`posts` directory of the output directory (`posts/index.html`, then
+`posts/2.html` and so on), or to another listing directory. A listing page
+never replaces a page of the site: sites whose own pages are at those paths
+must choose another directory. The feed (`feed.xml`) and the sitemap
+(`sitemap.xml`) need absolute URLs, so they are only written when the URL of
+the site is known.
+"""
+import datetime
+import email.utils
+import posixpath
+from xml.sax.saxutils import escape
+from htmlnode import HTMLNode, LeafNode, ParentNode, escape_value
+from page import CONTENT_PLACEHOLDER, TITLE_PLACEHOLDER
+
+LISTING_DIR: str = "posts"
+LISTING_TITLE: str = "Posts"
+POSTS_PER_PAGE: int = 20
+FEED_PATH: str = "feed.xml"
+# The number of newest posts in the feed.
+FEED_SIZE: int = 20
+SITEMAP_PATH: str = "sitemap.xml"
+
+
+def sort_posts(pages: dict[str, dict]) -> list[tuple[str, dict]]:
+    """
+    Finds the posts of a site.
+
+    :param pages: A mapping of the path of every page, relative to the output
+        directory, to its title, date and tags.
+    :return: The path and metadata of every page with a date, newest first and
+        then by path.
+    """
+    posts: list[tuple[str, dict]] = sorted((url, metadata) for url, metadata in pages.items() if metadata["date"])
+    posts.sort(key=lambda post: post[1]["date"], reverse=True)
+
+    return posts
+
+
+def listing_path(number: int, listing_dir: str = LISTING_DIR) -> str:
+    """
+    Finds the path of a listing page.
+
+    :param number: The number of the page, starting at 1.
+    :param listing_dir: The directory of the listing pages, relative to the
+        output directory.
+    :return: The path of the page, relative to the output directory.
+    """
+    return f"{listing_dir}/index.html" if number == 1 else f"{listing_dir}/{number}.html"
+
+
+def post_title(url: str, metadata: dict) -> str:
+    """
+    Finds the title a post is listed under.
+
+    :param url: The path of the post, relative to the output directory.
+    :param metadata: The title, date and tags of the post.
+    :return: The title of the post, or the name of its file if it has none.
+    """
+    return metadata["title"] or posixpath.splitext(posixpath.basename(url))[0]
+
+
+def render_listing(
+    posts: list[tuple[str, dict]], number: int, page_count: int, template: str, listing_dir: str = LISTING_DIR
+) -> str:
+    """
+    Renders a listing page into the site's template.
+
+    :param posts: The path and metadata of the posts on the page.
+    :param number: The number of the page, starting at 1.
+    :param page_count: The number of listing pages.
+    :param template: The HTML template with Title and Content placeholders.
+    :param listing_dir: The directory of the listing pages, relative to the
+        output directory.
+    :return: The HTML of the page.
+    """
+    title: str = LISTING_TITLE if number == 1 else f"{LISTING_TITLE}, page {number}"
+    items: list[HTMLNode] = []
+
+    for url, metadata in posts:
+        children: list[HTMLNode] = [
+            LeafNode("a", post_title(url, metadata), {"href": posixpath.relpath(url, listing_dir)}),
+            LeafNode(None, " "),
+            LeafNode("time", metadata["date"], {"datetime": metadata["date"]}),
+        ]
+        if metadata["tags"]:
+            children.append(LeafNode(None, " "))
+            children.append(LeafNode("span", ", ".join(metadata["tags"]), {"class": "tags"}))
+        items.append(ParentNode("li", children))
+
+    content: list[HTMLNode] = [LeafNode("h1", title)]
+    if items:
+        content.append(ParentNode("ul", items))
+
+    links: list[HTMLNode] = []
+    if number > 1:
+        links.append(LeafNode("a", "Newer posts", {"href": posixpath.basename(listing_path(number - 1))}))
+    if number < page_count:
+        if links:
+            links.append(LeafNode(None, " "))
+        links.append(LeafNode("a", "Older posts", {"href": posixpath.basename(listing_path(number + 1))}))
+    if links:
+        content.append(ParentNode("nav", links))
+
+    return template.replace(TITLE_PLACEHOLDER, escape_value(title)).replace(
+        CONTENT_PLACEHOLDER, ParentNode("div", content).to_html()
+    )
+
+
+def absolute_url(site_url: str, url: str) -> str:
+    """
+    Finds the absolute URL of a page. Index pages are addressed by their
+    directory.
+
+    :param site_url: The URL of the site's root directory.
+    :param url: The path of the page, relative to the output directory.
+    :return: The URL of the page.
+    """
+    if url == "index.html" or url.endswith("/index.html"):
+        url = url[:-len("index.html")]
+
+    return f"{site_url.rstrip('/')}/{url}"
+
+
+def render_sitemap(site_url: str, pages: dict[str, dict]) -> str:
+    """
+    Renders the sitemap of a site.
+
+    :param site_url: The URL of the site's root directory.
+    :param pages: A mapping of the path of every page, relative to the output
+        directory, to its title, date and tags.
+    :return: The XML of the sitemap, listing every page by path with the date
+        of those that have one.
+    """
+    lines: list[str] = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+    ]
+
+    for url, metadata in sorted(pages.items()):
+        lastmod: str = f"<lastmod>{metadata['date']}</lastmod>" if metadata["date"] else ""
+        lines.append(f"<url><loc>{escape(absolute_url(site_url, url))}</loc>{lastmod}</url>")
+
+    lines.append("</urlset>")
+
+    return "\n".join(lines) + "\n"
+
+
+def render_feed(
+    site_url: str, posts: list[tuple[str, dict]], title: str = LISTING_TITLE, listing_dir: str = LISTING_DIR
+) -> str:
+    """
+    Renders the RSS feed of the newest posts of a site.
+
+    :param site_url: The URL of the site's root directory.
+    :param posts: The path and metadata of every post, newest first.
+    :param title: The title of the feed.
+    :param listing_dir: The directory of the listing pages the feed links to.
+    :return: The XML of the feed.
+    """
+    lines: list[str] = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<rss version="2.0"><channel>',
+        f"<title>{escape(title)}</title>",
+        f"<link>{escape(absolute_url(site_url, listing_path(1, listing_dir)))}</link>",
+        f"<description>{escape(title)}</description>",
+    ]
+    if posts:
+        lines.append(f"<pubDate>{_rfc822_date(posts[0][1]['date'])}</pubDate>")
+
+    for url, metadata in posts[:FEED_SIZE]:
+        link: str = escape(absolute_url(site_url, url))
+        categories: str = "".join(f"<category>{escape(tag)}</category>" for tag in metadata["tags"])
+        lines.append(
+            f"<item><title>{escape(post_title(url, metadata))}</title><link>{link}</link>"
+            f'<guid isPermaLink="true">{link}</guid>'
+            f"<pubDate>{_rfc822_date(metadata['date'])}</pubDate>{categories}</item>"
+        )
+
+    lines.append("</channel></rss>")
+
+    return "\n".join(lines) + "\n"
+
+
+def generate_listings(
+    pages: dict[str, dict],
+    template: str,
+    site_url: str = None,
+    per_page: int = POSTS_PER_PAGE,
+    listing_dir: str = LISTING_DIR
+) -> dict[str, str]:
+    """
+    Generates the listing pages, and the feed and sitemap if the URL of the
+    site is known.
+
+    :param pages: A mapping of the path of every page, relative to the output
+        directory, to its title, date and tags.
+    :param template: The HTML template with Title and Content placeholders.
+    :param site_url: The URL of the site's root directory, if known.
+    :param per_page: The most posts on a listing page.
+    :param listing_dir: The directory of the listing pages, relative to the
+        output directory.
+    :return: A mapping of the path of every generated file, relative to the
+        output directory, to its contents.
+    :raise: ValueError if `per_page` is less than one, or if a generated file
+        would replace a page of the site.
+    """
+    if per_page < 1:
+        raise ValueError(f"The number of posts per page must be at least 1, not {per_page}.")
+
+    posts: list[tuple[str, dict]] = sort_posts(pages)
+    page_count: int = max(1, -(-len(posts) // per_page))
+    files: dict[str, str] = {}
+
+    for number in range(1, page_count + 1):
+        start: int = (number - 1) * per_page
+        files[listing_path(number, listing_dir)] = render_listing(
+            posts[start:start + per_page], number, page_count, template, listing_dir
+        )
+
+    if site_url:
+        files[FEED_PATH] = render_feed(site_url, posts, listing_dir=listing_dir)
+        # The sitemap lists the listing pages too, without a date.
+        listings: dict[str, dict] = {path: {"date": None} for path in files if path != FEED_PATH}
+        files[SITEMAP_PATH] = render_sitemap(site_url, {**pages, **listings})
+
+    collisions: list[str] = sorted(set(files) & set(pages))
+    if collisions:
+        raise ValueError(
+            f"The listings would replace the pages {', '.join(collisions)}. Move those pages or write the "
+            f"listings to another directory than {listing_dir!r}."
+        )
+
+    return files
+
+
+def _rfc822_date(date: str) -> str:
+    """
+    Formats an ISO date for a feed.
+
+    :param date: The ISO date, such as 2024-05-01.
+    :return: The date at midnight UTC in the format of RFC 822.
+    """
+    return email.utils.format_datetime(
+        datetime.datetime.combine(datetime.date.fromisoformat(date), datetime.time(), datetime.timezone.utc)
+    )
@@ -1,7 +1,326 @@
-from textnode import TextNode, TextType
+"""
+The command line entry point of the static site generator.
+
+Running `python3 src/main.py` builds the Markdown files in `content/` into HTML
+pages in `public/` using `template.html`. `python3 src/main.py serve --watch`
+serves the site locally and rebuilds pages as they are edited.
+
+`python3 src/main.py daemon` keeps a warm build process running, and
+`python3 src/main.py client` builds through it, or in-process when no daemon is
+running. `python3 src/main.py listings` only regenerates the listing pages,
+feed and sitemap from the front matter of the pages. Commands only import the
+modules they use, so the client starts quickly.
+"""
+import argparse
+import os
+import sys
+import time
+
+COMMANDS: tuple[str, ...] = ("build", "serve", "daemon", "client", "listings")
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    """
+    Parses the command line arguments. When no command is given, the site is
+    built.
+
+    :param argv: The arguments to parse. By default, `sys.argv` is used.
+    :return: The parsed arguments.
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] not in COMMANDS + ("-h", "--help"):
+        argv.insert(0, "build")
+
+    site = argparse.ArgumentParser(add_help=False)
+    site.add_argument("--source", default="content", help="directory of Markdown files (default: content)")
+    site.add_argument("--output", default="public", help="directory to write HTML to (default: public)")
+    site.add_argument("--template", default="template.html", help="HTML template (default: template.html)")
+    site.add_argument("--static", default="static", help="directory of files to copy as they are (default: static)")
+
+    listing = argparse.ArgumentParser(add_help=False)
+    listing.add_argument(
+        "--site-url", metavar="URL", help="URL the site is served at, to write feed.xml and sitemap.xml"
+    )
+    listing.add_argument(
+        "--listing-dir", default="posts", metavar="DIR",
+        help="directory of OUTPUT to write the listing pages to, which must not hold pages of the site (default: posts)"
+    )
+
+    cache = argparse.ArgumentParser(add_help=False)
+    cache.add_argument("--cache-dir", default=".cache", help="directory for build caches (default: .cache)")
+
+    socket = argparse.ArgumentParser(add_help=False)
+    socket.add_argument("--socket", metavar="PATH", help="Unix socket of the daemon (default: CACHE_DIR/daemon.sock)")
+
+    # The caches of an in-process build. The daemon keeps its own caches, sized
+    # by the daemon command, so the client does not take these.
+    caches = argparse.ArgumentParser(add_help=False)
+    caches.add_argument(
+        "--render-cache", type=int, default=0, metavar="N",
+        help="most rendered subtrees to reuse across pages, 0 to disable (default: 0). Pages rendered from Markdown "
+        "rarely share subtrees, so this seldom speeds up a build: it is meant for code that builds pages "
+        "with the Python API and shares chrome interned with rendercache.intern"
+    )
+    caches.add_argument(
+        "--inline-cache", type=int, default=0, metavar="N",
+        help="most parsed inline fragments to reuse across pages, 0 to disable (default: 0)"
+    )
+
+    options = argparse.ArgumentParser(add_help=False)
+    options.add_argument(
+        "--incremental", action="store_true", help="only rebuild pages whose inputs changed since the last build"
+    )
+    options.add_argument(
+        "--jobs", type=int, default=1, metavar="N", help="number of processes to generate pages in (default: 1)"
+    )
+    options.add_argument(
+        "--ast-cache", type=int, default=64, metavar="MB",
+        help="most megabytes of parsed documents kept in CACHE_DIR/ast, 0 to disable (default: 64)"
+    )
+    options.add_argument(
+        "--gzip", type=int, nargs="?", const=9, metavar="LEVEL",
+        help="also write a gzip-compressed copy of every page, at LEVEL 0-9 (default: 9)"
+    )
+    options.add_argument(
+        "--check-links", action="store_true",
+        help="check internal links and images, and exit with status 1 if any are broken"
+    )
+    options.add_argument(
+        "--search", action="store_true", help="write a search index of the text of every page to OUTPUT/search"
+    )
+    options.add_argument(
+        "--listings", action="store_true",
+        help="write paginated listings of the pages with a date in their front matter to OUTPUT/LISTING_DIR"
+    )
+    options.add_argument(
+        "--stream", action="store_true",
+        help="stream every page from source to output so memory stays flat, and report throughput and the peak memory "
+        "of the process since it started"
+    )
+    options.add_argument(
+        "--profile", metavar="PATH", help="write the timings of every build stage to PATH (builds in-process)"
+    )
+    options.add_argument(
+        "--profile-format", choices=("json", "folded"), default="json",
+        help="write the profile as JSON or as folded stacks for flame graphs (default: json)"
+    )
+    options.add_argument(
+        "--raw-html", action="store_true", help="render text as trusted HTML instead of escaping it"
+    )
+
+    parser = argparse.ArgumentParser(description="Generates a static site from Markdown files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser(
+        "build", parents=[site, cache, listing, caches, options], help="build the site (the default command)"
+    )
+
+    serve = commands.add_parser("serve", parents=[site, cache], help="serve the site locally")
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8000, help="port to listen on (default: 8000)")
+    serve.add_argument("--watch", action="store_true", help="rebuild pages and reload the browser on changes")
+    serve.add_argument(
+        "--poll-interval", type=float, default=0.05, metavar="SECONDS",
+        help="seconds between checks for changed files (default: 0.05)"
+    )
+
+    daemon = commands.add_parser("daemon", parents=[cache, socket], help="keep a warm build process running")
+    daemon.add_argument(
+        "--render-cache", type=int, default=0, metavar="N",
+        help="most rendered subtrees kept across builds, 0 to disable (default: 0). Like the build option, this is "
+        "for chrome interned with rendercache.intern, not a speedup for pages rendered from Markdown"
+    )
+    daemon.add_argument(
+        "--inline-cache", type=int, default=4096, metavar="N",
+        help="most parsed inline fragments kept across builds, 0 to disable (default: 4096)"
+    )
+
+    client = commands.add_parser(
+        "client", parents=[site, cache, socket, listing, options],
+        help="build the site through the daemon, or in-process if no daemon is running",
+        epilog="The caches are sized by the daemon command; in-process builds use the default cache sizes."
+    )
+    client.set_defaults(render_cache=0, inline_cache=0)
+
+    commands.add_parser(
+        "listings", parents=[site, cache, listing],
+        help="only write the listing pages, feed and sitemap, from the front matter of the pages"
+    )
+
+    args: argparse.Namespace = parser.parse_args(argv)
+    command_parser: argparse.ArgumentParser | None = {"build": build, "client": client, "daemon": daemon}.get(
+        args.command
+    )
+    if args.command in ("build", "client") and args.jobs < 1:
+        command_parser.error("--jobs must be at least 1")
+    if command_parser is not None and args.inline_cache < 0:
+        command_parser.error("--inline-cache must not be negative")
+    if args.command in ("build", "client") and args.ast_cache < 0:
+        command_parser.error("--ast-cache must not be negative")
+    if args.command in ("build", "client") and args.gzip is not None and not 0 <= args.gzip <= 9:
+        command_parser.error("--gzip must be between 0 and 9")
+    if args.command in ("daemon", "client") and args.socket is None:
+        args.socket = os.path.join(args.cache_dir, "daemon.sock")
+
+    return args
+
+
+def build(args: argparse.Namespace) -> None:
+    """
+    Builds the site in this process and prints the report.
+
+    :param args: The parsed arguments of the build or client command.
+    """
+    from build import build_site
+    from profiling import BuildProfile
+
+    profile: BuildProfile | None = None if args.profile is None else BuildProfile()
+    report = build_site(
+        args.source,
+        args.output,
+        args.template,
+        incremental=args.incremental,
+        manifest_path=os.path.join(args.cache_dir, "manifest.json"),
+        jobs=args.jobs,
+        static_dir=args.static,
+        render_cache_size=args.render_cache,
+        inline_cache_size=args.inline_cache,
+        raw_html=args.raw_html,
+        ast_cache_dir=os.path.join(args.cache_dir, "ast"),
+        ast_cache_size=args.ast_cache * 1024 * 1024,
+        gzip_level=args.gzip,
+        check_links=args.check_links,
+        search=args.search,
+        listings=args.listings,
+        site_url=args.site_url,
+        metadata_cache_path=os.path.join(args.cache_dir, "metadata.json"),
+        listing_dir=args.listing_dir,
+        stream=args.stream,
+        profile=profile,
+    )
+    print(report.summary())
+    if report.compression:
+        print(report.compression_summary())
+
+    if profile is not None:
+        profile.save(args.profile, args.profile_format)
+        print(profile.summary())
+
+    report_broken_links(report.links)
+
+
+def build_with_daemon(args: argparse.Namespace) -> bool:
+    """
+    Asks the daemon to build the site and prints the report.
+
+    :param args: The parsed arguments of the client command.
+    :return: Whether a daemon built the site. If not, nothing is printed.
+    :raise: DaemonError if the daemon failed to build the site.
+    """
+    from client import send_request
+
+    response: dict | None = send_request(args.socket, {
+        "command": "build",
+        "source": os.path.abspath(args.source),
+        "output": os.path.abspath(args.output),
+        "template": os.path.abspath(args.template),
+        "incremental": args.incremental,
+        "manifest_path": os.path.abspath(os.path.join(args.cache_dir, "manifest.json")),
+        "jobs": args.jobs,
+        "static_dir": os.path.abspath(args.static),
+        "raw_html": args.raw_html,
+        "ast_cache_dir": os.path.abspath(os.path.join(args.cache_dir, "ast")),
+        "ast_cache_size": args.ast_cache * 1024 * 1024,
+        "gzip_level": args.gzip,
+        "check_links": args.check_links,
+        "search": args.search,
+        "listings": args.listings,
+        "site_url": args.site_url,
+        "listing_dir": args.listing_dir,
+        "metadata_cache_path": os.path.abspath(os.path.join(args.cache_dir, "metadata.json")),
+        "stream": args.stream,
+    })
+    if response is None:
+        return False
+
+    print(f"{response['summary']} (daemon: {response['seconds']:.3f}s)")
+    report_broken_links(response["report"].get("links"))
+
+    return True
+
+
+def listings(args: argparse.Namespace) -> None:
+    """
+    Writes the listing pages, feed and sitemap of the site without building
+    its pages, and prints what was written.
+
+    :param args: The parsed arguments of the listings command.
+    """
+    from build import BuildReport, write_listings
+    from output import OutputWriter
+
+    start: float = time.perf_counter()
+    with open(args.template, "rb") as file:
+        template: str = file.read().decode("utf-8")
+
+    report: BuildReport = BuildReport()
+    writer: OutputWriter = OutputWriter(args.output)
+    write_listings(
+        args.source, template, writer, report=report, site_url=args.site_url,
+        metadata_cache_path=os.path.join(args.cache_dir, "metadata.json"), listing_dir=args.listing_dir
+    )
+    writer.close()
+
+    print(
+        f"Listed {report.listings['posts']} posts on {report.listings['pages']} pages, "
+        f"wrote {len(writer.written)} files in {time.perf_counter() - start:.3f}s "
+        f"(front matter: {report.listings['hits']} cached, {report.listings['misses']} read)"
+    )
+
+
+def report_broken_links(links: dict | None) -> None:
+    """
+    Prints the broken links found by a build, one per line.
+
+    :param links: The `links` of the build's report, or None if links were not
+        checked.
+    :raise: SystemExit with status 1 if any link is broken.
+    """
+    if not links or not links["broken"]:
+        return
+
+    for source, broken in sorted(links["broken"].items()):
+        for kind, url in broken:
+            print(f"Broken {kind} in {source}: {url}")
+
+    raise SystemExit(1)
+
+
+def main(argv: list[str] = None) -> None:
+    args: argparse.Namespace = parse_args(argv)
+
+    if args.command == "serve":
+        from server import DevServer
+
+        server = DevServer(
+            args.source, args.output, args.template, static_dir=args.static,
+            manifest_path=os.path.join(args.cache_dir, "manifest.json"), poll_interval=args.poll_interval
+        )
+        server.serve_forever(args.host, args.port, watch=args.watch)
+    elif args.command == "daemon":
+        from daemon import BuildDaemon
+
+        daemon = BuildDaemon(args.socket, args.render_cache, args.inline_cache)
+        print(f"Listening on {args.socket}")
+        daemon.serve_forever()
+    elif args.command == "listings":
+        listings(args)
+    elif args.command == "client":
+        # Profiles are only collected in this process.
+        if args.profile is not None or not build_with_daemon(args):
+            build(args)
+    else:
+        build(args)
 
-def main():
-    print(TextNode("This is a text node", TextType.BOLD, "https://www.boot.dev"))
-    
 if __name__ == "__main__":
     main()
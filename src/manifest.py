@@ -0,0 +1,164 @@
+"""
+This module contains the build manifest used for incremental builds.
+
+The manifest is a JSON file that maps every source Markdown file to a content
+hash of everything its page depends on (the source, the template and the
+generator version) and to the output file it produced. A page only needs to be
+regenerated when its hash no longer matches the one recorded in the manifest.
+
+Builds that check links also record the links and images of every page, the
+ones found to be broken, and the paths that links could point to, so later
+builds only need to recheck the pages affected by their changes (see `links`).
+"""
+import hashlib
+import json
+import os
+
+# The bytes read at a time when hashing a file.
+_CHUNK_SIZE: int = 1024 * 1024
+
+
+def content_digest(*parts: bytes, path: str = None) -> str:
+    """
+    Hashes the inputs of a page.
+
+    :param parts: The contents that the page depends on.
+    :param path: A file whose contents are hashed after the parts, as if they
+        were the last part. The file is read in chunks, so it is never held in
+        memory as a whole.
+    :return: The hex digest of the contents.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+
+    if path is not None:
+        with open(path, "rb") as file:
+            digest.update(os.fstat(file.fileno()).st_size.to_bytes(8, "little"))
+            for chunk in iter(lambda: file.read(_CHUNK_SIZE), b""):
+                digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    Records the content hash and output path of every page in a build.
+    """
+
+    __slots__ = ("path", "pages", "targets")
+
+    def __init__(self, path: str, pages: dict[str, dict] = None, targets: list[str] = None) -> None:
+        """
+        Instantiates a BuildManifest.
+
+        :param path: The file the manifest is saved to.
+        :param pages: A mapping of source path to its "hash" and "output", and
+            its "links" and "broken" links if they were checked.
+        :param targets: The paths that links could point to when links were
+            last checked.
+        """
+        self.path = path
+        self.pages = {} if pages is None else pages
+        self.targets = [] if targets is None else targets
+
+    @classmethod
+    def load(cls, path: str) -> "BuildManifest":
+        """
+        Loads a manifest from disk. A missing or unreadable manifest is treated
+        as empty, which causes every page to be rebuilt.
+
+        :param path: The file the manifest is saved to.
+        :return: The loaded manifest.
+        """
+        try:
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return cls(path)
+
+        if not isinstance(data, dict) or not isinstance(data.get("pages"), dict):
+            return cls(path)
+
+        targets: list[str] = data.get("targets")
+
+        return cls(path, data["pages"], targets if isinstance(targets, list) else None)
+
+    def is_current(self, source: str, digest: str, output: str) -> bool:
+        """
+        Checks whether a page was last built from the same inputs to the same
+        output path.
+
+        :param source: The path of the source file.
+        :param digest: The content hash of the page's inputs.
+        :param output: The path of the page's output file.
+        :return: Whether the recorded build of the page is still up to date.
+        """
+        entry: dict[str, str] | None = self.pages.get(source)
+
+        return entry is not None and entry.get("hash") == digest and entry.get("output") == output
+
+    def record(self, source: str, digest: str, output: str) -> None:
+        """
+        Records a page that was built. Its links are forgotten until they are
+        recorded again.
+
+        :param source: The path of the source file.
+        :param digest: The content hash of the page's inputs.
+        :param output: The path of the page's output file.
+        """
+        self.pages[source] = {"hash": digest, "output": output}
+
+    def links(self, source: str) -> list[list[str]] | None:
+        """
+        Finds the recorded links of a page.
+
+        :param source: The path of the source file.
+        :return: The kind ("link" or "image") and URL of every link of the
+            page, or None if they were not recorded.
+        """
+        entry: dict | None = self.pages.get(source)
+
+        return None if entry is None else entry.get("links")
+
+    def record_links(self, source: str, links: list[list[str]], broken: list[list[str]] = None) -> None:
+        """
+        Records the links of a recorded page.
+
+        :param source: The path of the source file.
+        :param links: The kind and URL of every link of the page.
+        :param broken: The links that were found to be broken, or None if the
+            links were not checked yet.
+        """
+        entry: dict = self.pages[source]
+        entry["links"] = links
+        if broken is None:
+            entry.pop("broken", None)
+        else:
+            entry["broken"] = broken
+
+    def remove(self, source: str) -> str | None:
+        """
+        Forgets a page whose source file no longer exists.
+
+        :param source: The path of the source file.
+        :return: The output path that was recorded for the page, if any.
+        """
+        entry: dict[str, str] | None = self.pages.pop(source, None)
+
+        return None if entry is None else entry.get("output")
+
+    def save(self) -> None:
+        """
+        Writes the manifest to disk, replacing the previous one atomically.
+        """
+        directory: str = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temporary_path: str = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump({"pages": self.pages, "targets": self.targets}, file, indent=1, sort_keys=True)
+
+        os.replace(temporary_path, self.path)
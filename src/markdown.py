@@ -4,6 +4,21 @@ This module contains functions that parses markdown files.
 import re
 from textnode import TextNode, TextType
 
+# The inline delimiters in the order of precedence they are resolved in.
+INLINE_DELIMITERS: tuple[tuple[str, TextType], ...] = (
+    ("**", TextType.BOLD),
+    ("*", TextType.ITALIC),
+    ("`", TextType.CODE),
+)
+
+# The syntax of images and links. They are found with `_find_bracket_spans`,
+# which gives the same matches as these patterns in guaranteed linear time.
+_IMAGE_PATTERN: re.Pattern = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+_LINK_PATTERN: re.Pattern = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+# The start index, end index, alt text and URL of an image or link.
+MarkdownSpan = tuple[int, int, str, str]
+
 def split_node_delimiter(old_nodes: list[TextNode], delimiter: str, text_type: TextType) -> list[TextNode]:
     """
     Takes in a list of TextNodes and parses their values against a delimiter if
@@ -57,30 +72,14 @@ def split_nodes_images(old_nodes: list[TextNode]) -> list[TextNode]:
         if node.text_type != TextType.TEXT:
             new_nodes.append(node)
             continue
-        
-        md_images: list[tuple[str, str]] = extract_markdown_images(node.text)
 
-        if len(md_images) == 0:
+        spans: list[MarkdownSpan] = extract_markdown_image_spans(node.text)
+
+        if len(spans) == 0:
             new_nodes.append(node)
             continue
 
-        text_to_parse: str = node.text
-
-        for image in md_images:
-            alt_text: str = image[0]
-            image_link: str = image[1]
-            
-            sections: list[str] = text_to_parse.split(f"![{alt_text}]({image_link})", 1)
-
-            if sections[0]:
-                new_nodes.append(TextNode(sections[0], node.text_type))
-                
-            new_nodes.append(TextNode(alt_text, TextType.IMAGE, image_link))
-            
-            text_to_parse = sections[1]
-            
-        if sections[1]:
-            new_nodes.append(TextNode(sections[1], node.text_type))
+        _split_on_spans(node.text, spans, TextType.IMAGE, new_nodes)
             
     return new_nodes
 
@@ -101,31 +100,35 @@ def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
         if node.text_type != TextType.TEXT:
             new_nodes.append(node)
             continue
-        
-        links: list[tuple[str, str]] = extract_markdown_links(node.text)
 
-        if len(links) == 0:
+        spans: list[MarkdownSpan] = extract_markdown_link_spans(node.text)
+
+        if len(spans) == 0:
             new_nodes.append(node)
             continue
 
-        text_to_parse: str = node.text
-
-        for link in links:
-            alt_text: str = link[0]
-            url: str = link[1]
+        _split_on_spans(node.text, spans, TextType.LINK, new_nodes)
             
-            sections: list[str] = text_to_parse.split(f"[{alt_text}]({url})", 1)
+    return new_nodes
+
+def split_nodes_images_and_links(old_nodes: list[TextNode]) -> list[TextNode]:
+    """
+    Takes in a list of TextNodes (of TextType.TEXT) and extracts both images and
+    links. The result is the same as calling `split_nodes_images` followed by
+    `split_nodes_link`, and text without images is only scanned once.
+
+    :param old_nodes: The TextNodes to parse.
+    :return: The list of parsed TextNodes
+    """
+    if old_nodes is None:
+        return []
+
+    new_nodes: list[TextNode] = []
+
+    for node in old_nodes:
+        if node.text_type != TextType.TEXT or not _scan_images_and_links(node.text, new_nodes):
+            new_nodes.append(node)
 
-            if sections[0]:
-                new_nodes.append(TextNode(sections[0], node.text_type))
-                
-            new_nodes.append(TextNode(alt_text, TextType.LINK, url))
-            
-            text_to_parse = sections[1]
-            
-        if sections[1]:
-            new_nodes.append(TextNode(sections[1], node.text_type))
-            
     return new_nodes
 
 def extract_markdown_images(raw_md: str) -> list[tuple[str, str]]:
@@ -135,7 +138,7 @@ def extract_markdown_images(raw_md: str) -> list[tuple[str, str]]:
     :param raw_md: The Markdown text to parse.
     :return: A list of tuples containing the alt text and image source.
     """
-    return re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", raw_md)
+    return [(alt_text, url) for _, _, alt_text, url in _find_bracket_spans(raw_md, images=True)]
 
 def extract_markdown_links(raw_md: str) -> list[tuple[str, str]]:
     """
@@ -144,4 +147,236 @@ def extract_markdown_links(raw_md: str) -> list[tuple[str, str]]:
     :param raw_md: The raw Markdown text to parse.
     :return: A list of tuples holding the alt text and link.
     """
-    return re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", raw_md)
+    return [(alt_text, url) for _, _, alt_text, url in _find_bracket_spans(raw_md, images=False)]
+
+def extract_markdown_image_spans(raw_md: str) -> list[MarkdownSpan]:
+    """
+    Takes in a string of raw markdown and finds the position of every image.
+
+    :param raw_md: The Markdown text to parse.
+    :return: A list of tuples holding the start and end index of each image in
+        `raw_md`, along with its alt text and image source.
+    """
+    return _find_bracket_spans(raw_md, images=True)
+
+def extract_markdown_link_spans(raw_md: str) -> list[MarkdownSpan]:
+    """
+    Takes in a string representing Markdown and finds the position of every
+    link.
+
+    :param raw_md: The raw Markdown text to parse.
+    :return: A list of tuples holding the start and end index of each link in
+        `raw_md`, along with its alt text and link.
+    """
+    return _find_bracket_spans(raw_md, images=False)
+
+def _split_on_spans(text: str, spans: list[MarkdownSpan], text_type: TextType, new_nodes: list[TextNode]) -> None:
+    """
+    Slices text around the spans of images or links.
+
+    :param text: The text the spans were found in.
+    :param spans: The spans of the images or links, in order.
+    :param text_type: The type of the TextNodes created for the spans.
+    :param new_nodes: The list the parsed TextNodes are appended to.
+    """
+    position: int = 0
+
+    for start, end, alt_text, url in spans:
+        if start > position:
+            new_nodes.append(TextNode(text[position:start], TextType.TEXT))
+
+        new_nodes.append(TextNode(alt_text, text_type, url))
+        position = end
+
+    if position < len(text):
+        new_nodes.append(TextNode(text[position:], TextType.TEXT))
+
+def text_to_textnodes(text: str) -> list[TextNode]:
+    """
+    Parses a string of inline Markdown into TextNodes in a single left-to-right
+    scan.
+
+    The output is identical to splitting a `TextType.TEXT` node on each of the
+    `INLINE_DELIMITERS` in turn with `split_node_delimiter`, followed by
+    `split_nodes_images` and `split_nodes_link`. Instead of rebuilding the node
+    list once per pass, the text between two delimiters of one kind is only
+    handed on to the next kind of delimiter, so every character is looked at a
+    constant number of times.
+
+    :param text: The raw inline Markdown to parse.
+    :return: The list of parsed TextNodes.
+    :raise: ValueError in the cases where a delimiter is not closed.
+    """
+    if text is None:
+        return []
+
+    nodes: list[TextNode] = []
+    _scan_delimited(text, 0, len(text), 0, nodes)
+
+    return nodes
+
+def _scan_delimited(text: str, start: int, end: int, level: int, nodes: list[TextNode]) -> None:
+    """
+    Scans `text[start:end]` for the delimiter at `level` of `INLINE_DELIMITERS`,
+    passing the plain text around each delimited run to the next level.
+
+    :param text: The full text being parsed.
+    :param start: The index to start scanning from.
+    :param end: The index to stop scanning at (exclusive).
+    :param level: The index of the delimiter in `INLINE_DELIMITERS`.
+    :param nodes: The list the parsed TextNodes are appended to.
+    :raise: ValueError in the cases where the delimiter is not closed.
+    """
+    if level == len(INLINE_DELIMITERS):
+        segment: str = text[start:end]
+        if not _scan_images_and_links(segment, nodes):
+            nodes.append(TextNode(segment, TextType.TEXT))
+        return
+
+    delimiter, text_type = INLINE_DELIMITERS[level]
+    width: int = len(delimiter)
+    position: int = start
+
+    while True:
+        opening: int = text.find(delimiter, position, end)
+        if opening == -1:
+            break
+
+        closing: int = text.find(delimiter, opening + width, end)
+        if closing == -1:
+            raise ValueError(f"Invalid markdown: '{delimiter}' is unclosed.")
+
+        if opening > position:
+            _scan_delimited(text, position, opening, level + 1, nodes)
+
+        if closing > opening + width:
+            nodes.append(TextNode(text[opening + width:closing], text_type))
+
+        position = closing + width
+
+    if position < end:
+        _scan_delimited(text, position, end, level + 1, nodes)
+
+def _scan_images_and_links(text: str, nodes: list[TextNode]) -> bool:
+    """
+    Splits plain text into TEXT, IMAGE and LINK TextNodes. Images are found
+    first and links are only looked for in the text between them, the same as
+    `split_nodes_images` followed by `split_nodes_link`, since a link's URL
+    may hold what would otherwise be an image. Text without "![" cannot hold
+    an image, so it is scanned once for links alone.
+
+    :param text: Text that contains no inline delimiters.
+    :param nodes: The list the parsed TextNodes are appended to.
+    :return: Whether the text contained any images or links. When it did not,
+        nothing is appended to `nodes`.
+    """
+    if "![" not in text:
+        return _scan_links(text, 0, len(text), nodes)
+
+    images: list[MarkdownSpan] = _find_bracket_spans(text, images=True)
+    if not images:
+        return _scan_links(text, 0, len(text), nodes)
+
+    position: int = 0
+    for start, end, alt_text, url in images:
+        if start > position and not _scan_links(text, position, start, nodes):
+            nodes.append(TextNode(text[position:start], TextType.TEXT))
+
+        nodes.append(TextNode(alt_text, TextType.IMAGE, url))
+        position = end
+
+    if position < len(text) and not _scan_links(text, position, len(text), nodes):
+        nodes.append(TextNode(text[position:], TextType.TEXT))
+
+    return True
+
+def _scan_links(text: str, start: int, end: int, nodes: list[TextNode]) -> bool:
+    """
+    Splits a slice of plain text into TEXT and LINK TextNodes.
+
+    :param text: Text that contains no inline delimiters.
+    :param start: The index the slice starts at.
+    :param end: The index the slice ends at.
+    :param nodes: The list the parsed TextNodes are appended to.
+    :return: Whether the slice contained any links. When it did not, nothing
+        is appended to `nodes`.
+    """
+    segment: str = text if start == 0 and end == len(text) else text[start:end]
+    spans: list[MarkdownSpan] = _find_bracket_spans(segment, images=False)
+    if not spans:
+        return False
+
+    _split_on_spans(segment, spans, TextType.LINK, nodes)
+
+    return True
+
+def _find_bracket_spans(text: str, images: bool) -> list[MarkdownSpan]:
+    """
+    Finds the images or links of a text in a single left-to-right scan, with
+    the same results as finding every match of `_IMAGE_PATTERN` or
+    `_LINK_PATTERN`.
+
+    The next index of each of "[", "]", "(" and ")" is cached once it is found,
+    and is only searched for again when the scan has moved past it. Each search
+    for a character starts where the last one for it ended, so every
+    character of the text is looked at a constant number of times whatever
+    the input, such as thousands of unmatched "[" or "](": the scan takes
+    linear time and never backtracks.
+
+    :param text: The text to scan.
+    :param images: Whether to find images instead of links (that are not
+        images).
+    :return: A list of tuples holding the start and end index of each image or
+        link, along with its alt text and URL.
+    """
+    spans: list[MarkdownSpan] = []
+    length: int = len(text)
+    find = text.find
+
+    next_open: int = find("[")
+    if next_open == -1:
+        return spans
+    next_close: int = -1
+    next_paren_open: int = -1
+    next_paren_close: int = -1
+
+    while next_open != length:
+        opening: int = next_open
+        next_open = find("[", opening + 1)
+        if next_open == -1:
+            next_open = length
+
+        # The alt text ends at the first "]" and may not contain a "[".
+        if next_close <= opening:
+            next_close = find("]", opening + 1)
+            if next_close == -1:
+                break
+        closing: int = next_close
+        if next_open < closing or text[closing + 1:closing + 2] != "(":
+            continue
+
+        # The URL ends at the first ")" and may not contain a "(".
+        if next_paren_close <= closing + 1:
+            next_paren_close = find(")", closing + 2)
+            if next_paren_close == -1:
+                break
+        if next_paren_open <= closing + 1:
+            next_paren_open = find("(", closing + 2)
+            if next_paren_open == -1:
+                next_paren_open = length
+        url_end: int = next_paren_close
+        if next_paren_open < url_end:
+            continue
+
+        is_image: bool = opening > 0 and text[opening - 1] == "!"
+        if is_image != images:
+            continue
+
+        spans.append((opening - is_image, url_end + 1, text[opening + 1:closing], text[closing + 2:url_end]))
+
+        if next_open <= url_end:
+            next_open = find("[", url_end + 1)
+            if next_open == -1:
+                break
+
+    return spans
@@ -0,0 +1,437 @@
+"""
+This module contains the writer of a build's output files.
+
+Rewriting a file with the bytes it already holds still changes its modification
+time, which makes tools such as rsync and CDN uploaders transfer it again. The
+OutputWriter compares every output with the file it replaces and leaves
+identical files untouched. Changed files are written to a temporary file next to
+their destination and renamed over it, so a reader, such as the development
+server, never sees a partly written page.
+
+The writer can also write a gzip-compressed copy of every page next to it (with
+a `.gz` suffix), for hosts that serve precompressed pages. Other outputs, such
+as the search index, the feed and the sitemap, are written with
+`compress=False` and have no copy. A copy is removed once its file is written
+without compression, whether or not the file changed. The copy is
+compressed from the bytes in memory, in a pool of threads since zlib does not
+hold the GIL while it compresses, and is only compressed again when its file
+changed. The time and ratio of the compression are kept per page class, which
+is the top-level directory of a page. Only a few files wait to be compressed at
+a time, so a build never holds more than a few pages in memory.
+
+Files can also be streamed to the writer with `open`, so a page is never held
+in memory as a whole. A streamed file is written to a temporary file that is
+compared with the file it replaces when it is closed.
+"""
+import filecmp
+import gzip
+import os
+import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator, TextIO
+
+GZIP_SUFFIX: str = ".gz"
+# The page class of the pages at the root of the output directory.
+ROOT_CLASS: str = "."
+# The most files waiting for each compression thread.
+PENDING_PER_THREAD: int = 4
+# The bytes read at a time when compressing a file from disk.
+_CHUNK_SIZE: int = 1024 * 1024
+
+
+class OutputWriter:
+    """
+    Writes the files of an output directory, skipping files whose contents did
+    not change.
+    """
+
+    __slots__ = (
+        "output_dir", "written", "unchanged", "removed", "compress_level", "compression", "_executor", "_pending",
+        "_max_pending", "_directories"
+    )
+
+    def __init__(self, output_dir: str, compress_level: int = None, compress_threads: int = 0) -> None:
+        """
+        Instantiates an OutputWriter.
+
+        :param output_dir: The directory the files are written to.
+        :param compress_level: The gzip compression level (0 to 9) of the
+            compressed copies of the files, or None to write no copies.
+        :param compress_threads: The number of threads to compress files in,
+            or 0 to compress them while they are written.
+        :raise: ValueError if the compression level is not between 0 and 9.
+        """
+        if compress_level is not None and not 0 <= compress_level <= 9:
+            raise ValueError(f"The compression level must be between 0 and 9, not {compress_level}.")
+
+        self.output_dir: str = output_dir
+        self.written: list[str] = []
+        self.unchanged: list[str] = []
+        self.removed: list[str] = []
+        self.compress_level: int | None = compress_level
+        # The pages, bytes, compressed bytes and seconds of compression of
+        # every page class.
+        self.compression: dict[str, list] = {}
+        self._executor: ThreadPoolExecutor | None = (
+            ThreadPoolExecutor(compress_threads) if compress_level is not None and compress_threads > 0 else None
+        )
+        self._pending: list[Future] = []
+        self._max_pending: int = max(1, compress_threads) * PENDING_PER_THREAD
+        # The directories known to exist, so each is only created once.
+        self._directories: set[str] = set()
+
+    def prepare(self, relative_paths: list[str]) -> None:
+        """
+        Creates the directories of many files at once, before they are written.
+
+        :param relative_paths: The paths of the files, relative to the output
+            directory and separated with "/".
+        """
+        for directory in sorted({os.path.dirname(path) for path in relative_paths}):
+            self._make_directory(os.path.join(self.output_dir, directory))
+
+    def write(self, relative_path: str, content: str | bytes, compress: bool = True) -> bool:
+        """
+        Writes a file, unless it already holds the same bytes, along with its
+        compressed copy if the writer compresses files. A compressed copy left
+        by an earlier build is removed when the file is not compressed.
+
+        :param relative_path: The path of the file, relative to the output
+            directory and separated with "/".
+        :param content: The contents of the file. Strings are encoded as UTF-8.
+        :param compress: Whether the file is a page that has a compressed copy
+            when the writer compresses files.
+        :return: Whether the file was written.
+        """
+        data: bytes = content.encode("utf-8") if isinstance(content, str) else content
+        path: str = os.path.join(self.output_dir, relative_path)
+        compressed: bool = compress and self.compress_level is not None
+
+        if _has_contents(path, data):
+            self.unchanged.append(relative_path)
+            if not compressed:
+                _remove_file(path + GZIP_SUFFIX)
+            elif not os.path.exists(path + GZIP_SUFFIX):
+                self._compress(relative_path, data)
+            return False
+
+        self._make_directory(os.path.dirname(path))
+        _replace_file(path, data)
+        self.written.append(relative_path)
+
+        if compressed:
+            self._compress(relative_path, data)
+        else:
+            _remove_file(path + GZIP_SUFFIX)
+
+        return True
+
+    @contextmanager
+    def open(self, relative_path: str) -> Iterator[TextIO]:
+        """
+        Streams a file, which is written like `write` writes it once the
+        stream is closed. The file is left as it was if an error is raised
+        while it is streamed.
+
+        :param relative_path: The path of the file, relative to the output
+            directory and separated with "/".
+        :return: A context manager over the file to write the contents to,
+            which are encoded as UTF-8.
+        """
+        path: str = os.path.join(self.output_dir, relative_path)
+        self._make_directory(os.path.dirname(path))
+        temporary: str = _temporary_path(path)
+
+        try:
+            with open(temporary, "w", encoding="utf-8", newline="") as file:
+                yield file
+
+            if os.path.exists(path) and filecmp.cmp(temporary, path, shallow=False):
+                os.remove(temporary)
+                self.unchanged.append(relative_path)
+                if self.compress_level is None:
+                    _remove_file(path + GZIP_SUFFIX)
+                elif not os.path.exists(path + GZIP_SUFFIX):
+                    self._record(*self._compress_file(relative_path))
+                return
+
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+        self.written.append(relative_path)
+        if self.compress_level is not None:
+            self._record(*self._compress_file(relative_path))
+        else:
+            _remove_file(path + GZIP_SUFFIX)
+
+    def remove(self, relative_path: str) -> bool:
+        """
+        Removes a stale file, such as the page of a deleted source.
+
+        :param relative_path: The path of the file, relative to the output
+            directory and separated with "/".
+        :return: Whether the file existed.
+        """
+        path: str = os.path.join(self.output_dir, relative_path)
+        _remove_file(path + GZIP_SUFFIX)
+
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+
+        self.removed.append(relative_path)
+
+        return True
+
+    def stats(self) -> dict[str, int]:
+        """
+        Reports what the writer did.
+
+        :return: The number of files written, left unchanged and removed.
+        """
+        return {"written": len(self.written), "unchanged": len(self.unchanged), "removed": len(self.removed)}
+
+    def take_compression(self) -> dict[str, list]:
+        """
+        Hands over the compression statistics collected so far, such as those
+        of a worker process, and starts collecting new ones.
+
+        :return: The pages, bytes, compressed bytes and seconds of compression
+            of every page class.
+        """
+        self.finish()
+        compression: dict[str, list] = self.compression
+        self.compression = {}
+
+        return compression
+
+    def finish(self) -> None:
+        """
+        Waits until every compressed copy has been written.
+
+        :raise: OSError if a compressed copy could not be written.
+        """
+        pending: list[Future] = self._pending
+        self._pending = []
+
+        for future in pending:
+            self._record(*future.result())
+
+    def close(self) -> None:
+        """
+        Waits until every compressed copy has been written, and stops the
+        threads that compress them.
+
+        :raise: OSError if a compressed copy could not be written.
+        """
+        try:
+            self.finish()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+
+    def _compress(self, relative_path: str, data: bytes) -> None:
+        """
+        Writes the compressed copy of a file, in a thread if the writer has any.
+
+        :param relative_path: The path of the file.
+        :param data: The contents of the file.
+        """
+        if self._executor is None:
+            self._record(*self._write_compressed(relative_path, data))
+            return
+
+        self._pending.append(self._executor.submit(self._write_compressed, relative_path, data))
+        if len(self._pending) > self._max_pending:
+            # Wait for the oldest files, so the contents of every page of a
+            # large build are not held in memory at once.
+            done: list[Future] = self._pending[:-self._max_pending]
+            self._pending = self._pending[-self._max_pending:]
+            for future in done:
+                self._record(*future.result())
+
+    def _write_compressed(self, relative_path: str, data: bytes) -> tuple[str, int, int, float]:
+        """
+        Compresses a file and writes its compressed copy. The copy is always
+        the same for the same contents, so unchanged pages compress to the
+        same bytes.
+
+        :param relative_path: The path of the file.
+        :param data: The contents of the file.
+        :return: The path, size, compressed size and seconds of compression.
+        """
+        start: float = time.perf_counter()
+        compressed: bytes = gzip.compress(data, self.compress_level, mtime=0)
+        seconds: float = time.perf_counter() - start
+
+        _replace_file(os.path.join(self.output_dir, relative_path + GZIP_SUFFIX), compressed)
+
+        return relative_path, len(data), len(compressed), seconds
+
+    def _compress_file(self, relative_path: str) -> tuple[str, int, int, float]:
+        """
+        Compresses a file from disk, in chunks, and writes its compressed copy.
+        The copy holds the same data as one written by `_write_compressed`.
+
+        :param relative_path: The path of the file.
+        :return: The path, size, compressed size and seconds of compression.
+        """
+        path: str = os.path.join(self.output_dir, relative_path)
+        temporary: str = _temporary_path(path + GZIP_SUFFIX)
+        start: float = time.perf_counter()
+
+        # The gzip format of zlib, which `gzip.compress` also writes when the
+        # modification time is 0.
+        compressor = zlib.compressobj(self.compress_level, zlib.DEFLATED, 31)
+        try:
+            with open(path, "rb") as source, open(temporary, "wb") as target:
+                for chunk in iter(lambda: source.read(_CHUNK_SIZE), b""):
+                    target.write(compressor.compress(chunk))
+                target.write(compressor.flush())
+                size: int = source.tell()
+            os.replace(temporary, path + GZIP_SUFFIX)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+        return relative_path, size, os.stat(path + GZIP_SUFFIX).st_size, time.perf_counter() - start
+
+    def _record(self, relative_path: str, size: int, compressed_size: int, seconds: float) -> None:
+        """
+        Adds a compressed file to the statistics of its page class.
+
+        :param relative_path: The path of the file.
+        :param size: The size of the file.
+        :param compressed_size: The size of its compressed copy.
+        :param seconds: The seconds spent compressing it.
+        """
+        merge_compression(self.compression, {page_class(relative_path): [1, size, compressed_size, seconds]})
+
+    def _make_directory(self, directory: str) -> None:
+        """
+        Creates a directory and its parents, unless it is known to exist.
+
+        :param directory: The path of the directory.
+        """
+        if directory not in self._directories:
+            os.makedirs(directory, exist_ok=True)
+            self._directories.add(directory)
+
+
+def page_class(relative_path: str) -> str:
+    """
+    Finds the class of a page, which is the top-level directory it is in.
+
+    :param relative_path: The path of the page, separated with "/".
+    :return: The top-level directory, or `ROOT_CLASS` for pages at the root.
+    """
+    directory, separator, _ = relative_path.partition("/")
+
+    return directory if separator else ROOT_CLASS
+
+
+def merge_compression(totals: dict[str, list], compression: dict[str, list]) -> None:
+    """
+    Adds compression statistics to others, such as those of a worker process.
+
+    :param totals: The pages, bytes, compressed bytes and seconds of every page
+        class, which are added to.
+    :param compression: The statistics to add, in the same form.
+    """
+    for name, values in compression.items():
+        total: list | None = totals.get(name)
+        if total is None:
+            totals[name] = list(values)
+        else:
+            for index, value in enumerate(values):
+                total[index] += value
+
+
+def compression_report(compression: dict[str, list]) -> dict[str, dict[str, float]]:
+    """
+    Describes how well the pages of every class compressed.
+
+    :param compression: The pages, bytes, compressed bytes and seconds of
+        compression of every page class.
+    :return: A mapping of every page class to its number of pages, bytes,
+        compressed bytes, seconds of compression, ratio of compressed to
+        uncompressed bytes, and throughput in megabytes per second.
+    """
+    return {
+        name: {
+            "pages": pages,
+            "bytes": size,
+            "compressed_bytes": compressed_size,
+            "seconds": seconds,
+            "ratio": compressed_size / size if size else 1.0,
+            "mb_per_second": size / seconds / 1_000_000 if seconds else 0.0,
+        }
+        for name, (pages, size, compressed_size, seconds) in sorted(compression.items())
+    }
+
+
+def _replace_file(path: str, data: bytes) -> None:
+    """
+    Writes a file through a temporary file that is renamed over it.
+
+    :param path: The path of the file, whose directory exists.
+    :param data: The contents of the file.
+    """
+    temporary: str = _temporary_path(path)
+    try:
+        with open(temporary, "wb") as file:
+            file.write(data)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+def _remove_file(path: str) -> None:
+    """
+    Removes a file, if it exists.
+
+    :param path: The path of the file.
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _temporary_path(path: str) -> str:
+    """
+    Finds the path of the temporary file that a file is written to before it
+    is renamed over it.
+
+    :param path: The path of the file.
+    :return: The path of a hidden file in the same directory, unique to this
+        process.
+    """
+    return os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{os.getpid()}.tmp")
+
+
+def _has_contents(path: str, data: bytes) -> bool:
+    """
+    Checks whether a file holds exactly the given bytes. The file is only read
+    when its size matches.
+
+    :param path: The path of the file.
+    :param data: The expected contents.
+    :return: Whether the file exists and holds `data`.
+    """
+    try:
+        if os.stat(path).st_size != len(data):
+            return False
+        with open(path, "rb") as file:
+            return file.read() == data
+    except OSError:
+        return False
@@ -0,0 +1,296 @@
+"""
+This module contains functions that turn a Markdown document into a HTML page.
+
+A document is converted into HTMLNodes block by block (see `blocks`), and the
+result is placed into a HTML template that contains the `{{ Title }}` and
+`{{ Content }}` placeholders. A page can either be rendered to a string, or
+streamed from the lines of its source to a writer one block at a time.
+
+The front matter of a document (see `frontmatter`) is not rendered, and its
+title takes precedence over the document's first heading.
+"""
+import io
+import itertools
+from typing import Callable, Iterable, Iterator
+from astcache import ASTCache
+from blocks import iter_html_nodes, markdown_to_html_node, render_markdown
+from frontmatter import split_front_matter, split_front_matter_lines
+from htmlnode import HTMLNode, ParentNode, Writer, escape_value
+from inlinecache import InlineCache
+from links import Link, extract_links
+from profiling import BuildProfile, get_profile
+from rendercache import RenderCache
+from search import add_terms, extract_terms
+
+TITLE_PLACEHOLDER: str = "{{ Title }}"
+CONTENT_PLACEHOLDER: str = "{{ Content }}"
+# The most characters of a streamed document kept while looking for its title.
+TITLE_BUFFER_SIZE: int = 64 * 1024
+
+
+def extract_title(markdown: str | Iterable[str]) -> str | None:
+    """
+    Finds the title of a Markdown document, which is its first `# ` heading.
+
+    :param markdown: The Markdown document, or an iterable of its lines. Lines
+        are only read up to the heading.
+    :return: The text of the heading, or None if there is no heading.
+    """
+    for line in markdown.splitlines() if isinstance(markdown, str) else markdown:
+        if line.startswith("# "):
+            return line[2:].strip()
+
+    return None
+
+
+def render_page(
+    markdown: str,
+    template: str,
+    default_title: str = "",
+    render_cache: RenderCache = None,
+    inline_cache: InlineCache = None,
+    ast_cache: ASTCache = None,
+    links: list[Link] = None,
+    terms: dict[str, list[int]] = None
+) -> str:
+    """
+    Renders a Markdown document into a HTML template.
+
+    :param markdown: The Markdown document.
+    :param template: The HTML template with Title and Content placeholders.
+    :param default_title: The title used when the document has no title in
+        its front matter and no heading.
+    :param render_cache: A cache of rendered subtrees shared by the pages of a
+        build. If None, the page is rendered with `to_html`.
+    :param inline_cache: A cache of parsed inline Markdown shared by the pages
+        of a build, if any.
+    :param ast_cache: An on-disk cache of parsed documents, if any.
+    :param links: A list to add the kind and URL of every link and image of
+        the document to, if any.
+    :param terms: A dict to add the positions of every term of the document's
+        text to, if any.
+    :return: The HTML of the page.
+    :raise: ValueError if the date in the front matter is not an ISO date.
+    """
+    profile: BuildProfile | None = get_profile()
+    if profile is not None:
+        profile.start("parse")
+    try:
+        metadata, markdown = split_front_matter(markdown)
+
+        if ast_cache is None:
+            content: ParentNode = markdown_to_html_node(markdown, inline_cache)
+        else:
+            content = ast_cache.parse(markdown, inline_cache)
+        title: str | None = metadata["title"] or extract_title(markdown)
+        if links is not None:
+            links.extend(extract_links(content))
+        if terms is not None:
+            terms.update(extract_terms(content))
+    finally:
+        if profile is not None:
+            profile.stop()
+
+    if profile is not None:
+        profile.count("blocks", len(content.children))
+        profile.start("render")
+    try:
+        if not content.children:
+            html: str = ""
+        elif render_cache is None:
+            html = content.to_html()
+        else:
+            html = render_cache.render(content)
+    finally:
+        if profile is not None:
+            profile.stop()
+
+    return template.replace(TITLE_PLACEHOLDER, escape_value(default_title if title is None else title)).replace(
+        CONTENT_PLACEHOLDER, html
+    )
+
+
+def render_page_to(
+    lines: Iterable[str],
+    template: str,
+    writer: Writer,
+    title: str,
+    inline_cache: InlineCache = None,
+    links: list[Link] = None,
+    terms: dict[str, list[int]] = None
+) -> None:
+    """
+    Streams a Markdown document into a HTML template, one block at a time. The
+    output is the same as `render_page` with a title found by `extract_title`,
+    or in the document's front matter.
+
+    :param lines: The lines of the document, such as an open file.
+    :param template: The HTML template with Title and Content placeholders.
+    :param writer: The file-like object to write the page to.
+    :param title: The title of the page.
+    :param inline_cache: A cache of parsed inline Markdown, if any.
+    :param links: A list to add the kind and URL of every link and image of
+        the document to, if any.
+    :param terms: A dict to add the positions of every term of the document's
+        text to, if any.
+    :raise: ValueError if the date in the front matter is not an ISO date.
+    """
+    _render_body_to(split_front_matter_lines(lines)[1], template, writer, title, inline_cache, links, terms)
+
+
+def _render_body_to(
+    lines: Iterable[str],
+    template: str,
+    writer: Writer,
+    title: str,
+    inline_cache: InlineCache = None,
+    links: list[Link] = None,
+    terms: dict[str, list[int]] = None
+) -> None:
+    """
+    Streams the body of a Markdown document, without its front matter, into a
+    HTML template.
+
+    :param lines: The lines of the document after its front matter.
+    :param template: The HTML template with Title and Content placeholders.
+    :param writer: The file-like object to write the page to.
+    :param title: The title of the page.
+    :param inline_cache: A cache of parsed inline Markdown, if any.
+    :param links: A list to add the links of the document to, if any.
+    :param terms: A dict to add the terms of the document to, if any.
+    """
+    parts: list[str] = template.replace(TITLE_PLACEHOLDER, escape_value(title)).split(CONTENT_PLACEHOLDER)
+    visit: Callable[[HTMLNode], object] | None = _block_visitor(links, terms)
+
+    writer.write(parts[0])
+    if len(parts) == 1:
+        if visit is not None:
+            for node in iter_html_nodes(lines, inline_cache):
+                visit(node)
+        return
+
+    if len(parts) == 2:
+        render_markdown(lines, writer, inline_cache, visit)
+    else:
+        # The content is needed more than once, so it cannot be streamed.
+        buffer: io.StringIO = io.StringIO()
+        render_markdown(lines, buffer, inline_cache, visit)
+        for part in parts[1:-1]:
+            writer.write(buffer.getvalue())
+            writer.write(part)
+        writer.write(buffer.getvalue())
+
+    writer.write(parts[-1])
+
+
+def read_title(path: str, default_title: str = "") -> str:
+    """
+    Finds the title of a Markdown file, reading it only up to its front matter
+    or first heading.
+
+    :param path: The path of the Markdown file.
+    :param default_title: The title used when the document has no title in
+        its front matter and no heading.
+    :return: The title of the page.
+    :raise: ValueError if the date in the front matter is not an ISO date.
+    """
+    with open(path, encoding="utf-8") as file:
+        metadata, lines = split_front_matter_lines(file)
+        title: str | None = metadata["title"] or extract_title(lines)
+
+    return default_title if title is None else title
+
+
+def stream_page(
+    path: str,
+    template: str,
+    writer: Writer,
+    default_title: str = "",
+    inline_cache: InlineCache = None,
+    links: list[Link] = None,
+    terms: dict[str, list[int]] = None
+) -> None:
+    """
+    Streams a Markdown file into a HTML template, one block at a time, so
+    neither the document nor its page is ever held in memory as a whole. The
+    file is read once, unless its title is neither in its front matter nor in
+    its first `TITLE_BUFFER_SIZE` characters. The output is the same as
+    `render_page` of the file's contents.
+
+    :param path: The path of the Markdown file.
+    :param template: The HTML template with Title and Content placeholders.
+    :param writer: The file-like object to write the page to.
+    :param default_title: The title used when the document has no title in
+        its front matter and no heading.
+    :param inline_cache: A cache of parsed inline Markdown, if any.
+    :param links: A list to add the kind and URL of every link and image of
+        the document to, if any.
+    :param terms: A dict to add the positions of every term of the document's
+        text to, if any.
+    :return: The title of the page.
+    :raise: ValueError if the date in the front matter is not an ISO date.
+    """
+    with open(path, encoding="utf-8") as file:
+        metadata, lines = split_front_matter_lines(file)
+        title: str | None = metadata["title"]
+        if not title:
+            lines, title = _find_title(path, lines)
+
+        _render_body_to(lines, template, writer, default_title if title is None else title, inline_cache, links, terms)
+
+    return default_title if title is None else title
+
+
+def _find_title(path: str, lines: Iterator[str]) -> tuple[Iterator[str], str | None]:
+    """
+    Finds the first heading of a document that is being read, keeping the
+    lines before it so they can still be rendered. The heading usually opens
+    the document; if it is not within the first `TITLE_BUFFER_SIZE`
+    characters, the file is searched for it with a handle of its own instead of being held in
+    memory.
+
+    :param path: The path of the Markdown file.
+    :param lines: The lines of the document after its front matter.
+    :return: An iterator of the same lines, and the text of the heading, or
+        None if there is no heading.
+    """
+    head: list[str] = []
+    size: int = 0
+    title: str | None = None
+
+    for line in lines:
+        head.append(line)
+        if line.startswith("# "):
+            title = line[2:].strip()
+            break
+        size += len(line)
+        if size > TITLE_BUFFER_SIZE:
+            with open(path, encoding="utf-8") as file:
+                title = extract_title(split_front_matter_lines(file)[1])
+            break
+
+    return itertools.chain(head, lines), title
+
+
+def _block_visitor(links: list[Link] | None, terms: dict[str, list[int]] | None) -> Callable[[HTMLNode], object] | None:
+    """
+    Creates a function that collects the links and terms of the blocks of a
+    document as they are rendered.
+
+    :param links: A list to add the links of every block to, if any.
+    :param terms: A dict to add the terms of every block to, if any.
+    :return: The function, or None if nothing is collected.
+    """
+    if links is None and terms is None:
+        return None
+
+    position: int = 0
+
+    def visit(node: HTMLNode) -> None:
+        nonlocal position
+        if links is not None:
+            links.extend(extract_links(node))
+        if terms is not None:
+            position = add_terms(node, terms, position)
+
+    return visit
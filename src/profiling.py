@@ -0,0 +1,306 @@
+"""
+This module contains the instrumentation of the build pipeline.
+
+A BuildProfile collects the time spent in each stage of a build (reading
+sources, parsing blocks and inline Markdown, rendering and writing pages),
+counters of the pages, blocks and TextNodes processed, the bytes read and
+written, and the slowest pages.
+
+Profiling is off by default. The pipeline only checks `get_profile()` at the
+start of a stage, which costs a function call per page and block while no
+profile is active. A profile is activated with the `profiling` context manager:
+
+    with profiling(BuildProfile()) as profile:
+        build_site(...)
+    print(profile.as_dict())
+
+Stages nest, and the time of every stack of stages that are open at once is
+kept, so a profile can be written as JSON or as folded stacks (see `folded`)
+for flame graph tools such as `flamegraph.pl` or speedscope.
+
+The peak resident memory of a build's processes is read from the operating
+system with `peak_rss`, where the `resource` module is available.
+"""
+import heapq
+import json
+import sys
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class BuildProfile:
+    """
+    Collects the timings and counters of a build.
+    """
+
+    __slots__ = ("stages", "counters", "bytes_in", "bytes_out", "max_pages", "_pages", "_stacks", "_open")
+
+    def __init__(self, max_pages: int = 10) -> None:
+        """
+        Instantiates an empty BuildProfile.
+
+        :param max_pages: The number of slowest pages to keep.
+        """
+        self.stages: dict[str, list[float]] = {}
+        self.counters: dict[str, int] = {}
+        self.bytes_in: int = 0
+        self.bytes_out: int = 0
+        self.max_pages: int = max_pages
+        # A min-heap of the slowest pages as (seconds, source).
+        self._pages: list[tuple[float, str]] = []
+        # The seconds spent in each stack of stages, excluding nested stages.
+        self._stacks: dict[str, float] = {}
+        # The open stages as [stack, start time, seconds spent in nested stages].
+        self._open: list[list] = []
+
+    def start(self, stage: str) -> None:
+        """
+        Starts timing a stage. Stages started before it is stopped are nested
+        in it.
+
+        :param stage: The name of the stage.
+        """
+        stack: str = f"{self._open[-1][0]};{stage}" if self._open else stage
+        self._open.append([stack, time.perf_counter(), 0.0])
+
+    def stop(self) -> float:
+        """
+        Stops timing the most recently started stage.
+
+        :return: The seconds spent in the stage, including nested stages.
+        :raise: IndexError if no stage is open.
+        """
+        stack, start, nested = self._open.pop()
+        seconds: float = time.perf_counter() - start
+
+        stage: str = stack.rpartition(";")[2]
+        totals: list[float] | None = self.stages.get(stage)
+        if totals is None:
+            self.stages[stage] = [seconds, 1]
+        else:
+            totals[0] += seconds
+            totals[1] += 1
+
+        self._stacks[stack] = self._stacks.get(stack, 0.0) + seconds - nested
+        if self._open:
+            self._open[-1][2] += seconds
+
+        return seconds
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        """
+        Adds to a counter.
+
+        :param counter: The name of the counter.
+        :param amount: The amount to add.
+        """
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def record_page(self, source: str, seconds: float, bytes_in: int, bytes_out: int) -> None:
+        """
+        Records a generated page.
+
+        :param source: The relative path of the Markdown file.
+        :param seconds: The seconds spent generating the page.
+        :param bytes_in: The size of the Markdown file.
+        :param bytes_out: The size of the HTML file.
+        """
+        self.count("pages")
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self._keep_page(source, seconds)
+
+    def slowest_pages(self) -> list[tuple[str, float]]:
+        """
+        Lists the slowest pages.
+
+        :return: The relative path and seconds of up to `max_pages` pages,
+            slowest first.
+        """
+        return [(source, seconds) for seconds, source in sorted(self._pages, reverse=True)]
+
+    def merge(self, other: "BuildProfile") -> None:
+        """
+        Adds the timings and counters of another profile, such as one collected
+        in a worker process.
+
+        :param other: The profile to add.
+        """
+        for stage, (seconds, calls) in other.stages.items():
+            totals: list[float] = self.stages.setdefault(stage, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += calls
+
+        for counter, amount in other.counters.items():
+            self.count(counter, amount)
+
+        for stack, seconds in other._stacks.items():
+            self._stacks[stack] = self._stacks.get(stack, 0.0) + seconds
+
+        for seconds, source in other._pages:
+            self._keep_page(source, seconds)
+
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+
+    def _keep_page(self, source: str, seconds: float) -> None:
+        """
+        Keeps a page if it is one of the `max_pages` slowest pages.
+
+        :param source: The relative path of the Markdown file.
+        :param seconds: The seconds spent generating the page.
+        """
+        if len(self._pages) < self.max_pages:
+            heapq.heappush(self._pages, (seconds, source))
+        elif self._pages and seconds > self._pages[0][0]:
+            heapq.heapreplace(self._pages, (seconds, source))
+
+    def as_dict(self) -> dict:
+        """
+        Converts the profile to a dict that can be serialised as JSON.
+
+        :return: The seconds and calls of every stage, the counters, the bytes
+            read and written, the slowest pages and the seconds of every stack
+            of stages.
+        """
+        return {
+            "stages": {stage: {"seconds": seconds, "calls": calls} for stage, (seconds, calls) in self.stages.items()},
+            "counters": dict(self.counters),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "slowest_pages": [{"source": source, "seconds": seconds} for source, seconds in self.slowest_pages()],
+            "stacks": dict(self._stacks),
+        }
+
+    @classmethod
+    def from_dict(cls, fields: dict, max_pages: int = 10) -> "BuildProfile":
+        """
+        Creates a profile from the output of `as_dict`.
+
+        :param fields: The fields of the profile.
+        :param max_pages: The number of slowest pages to keep.
+        :return: The profile.
+        """
+        profile: BuildProfile = cls(max_pages)
+        profile.stages = {stage: [totals["seconds"], totals["calls"]] for stage, totals in fields["stages"].items()}
+        profile.counters = dict(fields["counters"])
+        profile.bytes_in = fields["bytes_in"]
+        profile.bytes_out = fields["bytes_out"]
+        for page in fields["slowest_pages"]:
+            profile._keep_page(page["source"], page["seconds"])
+        profile._stacks = dict(fields["stacks"])
+
+        return profile
+
+    def folded(self) -> str:
+        """
+        Formats the profile as folded stacks, the input of flame graph tools.
+
+        :return: A line for every stack of stages, with the stages separated by
+            ";" and followed by the microseconds spent in the innermost stage.
+        """
+        return "".join(
+            f"{stack} {round(seconds * 1_000_000)}\n" for stack, seconds in sorted(self._stacks.items())
+        )
+
+    def save(self, path: str, format: str = "json") -> None:
+        """
+        Writes the profile to a file.
+
+        :param path: The file to write the profile to.
+        :param format: "json" for the output of `as_dict`, or "folded" for the
+            output of `folded`.
+        :raise: ValueError if the format is unknown.
+        """
+        if format == "json":
+            text: str = json.dumps(self.as_dict(), indent=2)
+        elif format == "folded":
+            text = self.folded()
+        else:
+            raise ValueError(f"Unknown profile format: {format!r}")
+
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def summary(self) -> str:
+        """
+        Describes the profile in a few lines.
+
+        :return: The time of every stage, slowest first, and the counters.
+        """
+        lines: list[str] = [
+            f"{stage:<16}{seconds:>10.3f}s {calls:>8} calls"
+            for stage, (seconds, calls) in sorted(self.stages.items(), key=lambda item: -item[1][0])
+        ]
+        counters: str = ", ".join(f"{amount} {counter}" for counter, amount in sorted(self.counters.items()))
+        lines.append(f"{counters}, {self.bytes_in} bytes in, {self.bytes_out} bytes out")
+
+        return "\n".join(lines)
+
+
+# The profile the pipeline reports to, if profiling is on.
+_profile: BuildProfile | None = None
+
+
+def get_profile() -> BuildProfile | None:
+    """
+    Finds the active profile.
+
+    :return: The profile, or None if profiling is off.
+    """
+    return _profile
+
+
+def set_profile(profile: BuildProfile | None) -> BuildProfile | None:
+    """
+    Activates a profile, or turns profiling off.
+
+    :param profile: The profile to activate, or None.
+    :return: The previously active profile.
+    """
+    global _profile
+    previous: BuildProfile | None = _profile
+    _profile = profile
+
+    return previous
+
+
+@contextmanager
+def profiling(profile: BuildProfile | None) -> Iterator[BuildProfile | None]:
+    """
+    Activates a profile for the code in a with block.
+
+    :param profile: The profile to activate, or None to turn profiling off.
+    :return: The profile.
+    """
+    previous: BuildProfile | None = set_profile(profile)
+    try:
+        yield profile
+    finally:
+        set_profile(previous)
+
+
+def peak_rss(children: bool = False) -> int | None:
+    """
+    Finds the most memory the process has held at once since it started.
+
+    :param children: Whether to also include the terminated child processes
+        of the process, such as the workers of a parallel build.
+    :return: The peak resident set size in bytes, or None if the operating
+        system does not report it.
+    """
+    if resource is None:
+        return None
+
+    peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if children:
+        peak = max(peak, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+    # Linux reports kilobytes, and macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
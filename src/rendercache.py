@@ -0,0 +1,283 @@
+"""
+This module contains a cache of rendered HTMLNode subtrees.
+
+Pages often contain identical subtrees, such as navigation bars, footers and
+repeated callout boxes, that are built as separate ParentNodes on every page.
+The RenderCache identifies subtrees by their structure instead of their
+identity: every distinct ParentNode subtree is hash-consed to a small integer
+id, so the key of a parent only holds the ids of its children and is cheap to
+hash. The HTML of each id is rendered once and the same string is reused for
+every identical subtree, until it is evicted to keep the cache bounded.
+
+The cache only pays for itself when pages share subtrees, such as chrome built
+into every page or nodes interned with `intern`. Documents rendered from
+Markdown rarely do, so builds only use a render cache when it is given a size.
+
+Builders can also hash-cons the nodes themselves with `intern`, which returns
+one canonical node for every identical subtree. Canonical nodes are recognised
+by identity when they are rendered, so shared chrome is not even traversed
+again, as long as canonical nodes are not mutated.
+"""
+from collections import OrderedDict
+from typing import Iterator
+from htmlnode import HTMLNode, ParentNode, get_escape_mode
+
+# The structural key of a ParentNode: its type, tag and rendered attributes,
+# followed by the HTML of its LeafNode children and the ids of its ParentNode
+# children, and the escape mode the HTML was rendered in. The attributes are
+# keyed as they render, so props that cannot be hashed still have a key, and
+# values that are equal but render differently (1 and True) are told apart.
+NodeKey = tuple
+
+
+class RenderCache:
+    """
+    Renders HTMLNode trees, reusing the HTML of structurally identical
+    ParentNode subtrees.
+    """
+
+    __slots__ = ("max_entries", "hits", "misses", "evictions", "_ids", "_keys", "_entries", "_next_id", "_canonical", "_interned")
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        """
+        Instantiates an empty RenderCache.
+
+        :param max_entries: The most subtrees whose HTML is kept. The least
+            recently used subtree is evicted first.
+        :raise: ValueError if `max_entries` is less than one.
+        """
+        if max_entries < 1:
+            raise ValueError(f"The cache must hold at least 1 entry, not {max_entries}.")
+
+        self.max_entries: int = max_entries
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._ids: dict[NodeKey, int] = {}
+        self._keys: dict[int, NodeKey] = {}
+        self._entries: OrderedDict[int, str] = OrderedDict()
+        self._next_id: int = 0
+        self._canonical: dict[int, ParentNode] = {}
+        self._interned: dict[int, tuple[int, NodeKey]] = {}
+
+    def render(self, node: HTMLNode) -> str:
+        """
+        Renders a tree to HTML, the same as `node.to_html()`.
+
+        :param node: The root of the tree.
+        :return: The rendered HTML.
+        """
+        if not isinstance(node, ParentNode):
+            return node.to_html()
+
+        ids: dict[int, tuple[int, NodeKey]] = {}
+        self._key(node, ids)
+
+        return self._render(node, ids)
+
+    def intern(self, node: HTMLNode) -> HTMLNode:
+        """
+        Finds the canonical node of a subtree, so identical subtrees can be
+        shared by reference. The canonical node is rendered into the cache,
+        and must not be mutated while it is in the cache.
+
+        :param node: The root of the subtree.
+        :return: The canonical node with the same structure as `node`, which
+            is `node` itself the first time its structure is seen.
+        """
+        if not isinstance(node, ParentNode):
+            return node
+
+        ids: dict[int, tuple[int, NodeKey]] = {}
+        node_id: int = self._key(node, ids)
+
+        canonical: ParentNode | None = self._canonical.get(node_id)
+        if canonical is None:
+            self._render(node, ids)
+            # Rendering may evict other canonical nodes, but never this one.
+            canonical = self._canonical[node_id] = node
+            self._interned[id(node)] = ids[id(node)]
+
+        return canonical
+
+    def stats(self) -> dict[str, int]:
+        """
+        Reports how well the cache is working.
+
+        :return: The hits, misses, evictions and current number of entries.
+        """
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": len(self._entries)}
+
+    def clear(self) -> None:
+        """
+        Empties the cache and resets its counters.
+        """
+        self.hits = self.misses = self.evictions = 0
+        self._ids.clear()
+        self._keys.clear()
+        self._entries.clear()
+        self._canonical.clear()
+        self._interned.clear()
+
+    def _key(self, root: ParentNode, ids: dict[int, tuple[int, NodeKey]]) -> int:
+        """
+        Hash-conses a tree: finds the id that is shared by every subtree with
+        the same structure as each ParentNode of the tree. A LeafNode is keyed
+        by its own HTML, which is cheap to render and exactly determines its
+        output.
+
+        The tree is walked with an explicit stack instead of recursion, so
+        trees of any depth can be keyed. Keys that are not cached yet are
+        given new ids, which are only registered once their HTML is stored.
+
+        :param root: The root of the tree.
+        :param ids: The id and key of the ParentNodes of the tree, by node
+            identity.
+        :return: The id of the tree.
+        """
+        node_id: int | None = self._interned_id(root, ids)
+        if node_id is not None:
+            return node_id
+
+        new_ids: dict[NodeKey, int] = {}
+        stack: list[tuple[ParentNode, Iterator[HTMLNode], list[str | int]]] = [(root, iter(root.children or ()), [])]
+
+        while stack:
+            node, children, child_keys = stack[-1]
+
+            for child in children:
+                if not isinstance(child, ParentNode):
+                    child_keys.append(child.to_html())
+                    continue
+
+                child_id: int | None = self._interned_id(child, ids)
+                if child_id is None:
+                    stack.append((child, iter(child.children or ()), []))
+                    break
+                child_keys.append(child_id)
+            else:
+                stack.pop()
+                key: NodeKey = (
+                    type(node), node.tag, None if node.props is None else node.props_to_html(), tuple(child_keys),
+                    get_escape_mode()
+                )
+
+                node_id = self._ids.get(key)
+                if node_id is None:
+                    node_id = new_ids.get(key)
+                if node_id is None:
+                    node_id = new_ids[key] = self._next_id
+                    self._next_id += 1
+
+                ids[id(node)] = (node_id, key)
+                if stack:
+                    stack[-1][2].append(node_id)
+
+        return node_id
+
+    def _interned_id(self, node: ParentNode, ids: dict[int, tuple[int, NodeKey]]) -> int | None:
+        """
+        Finds the id of an interned node without walking its subtree.
+
+        :param node: The node to find the id of.
+        :param ids: The id and key of the ParentNodes of the tree, by node
+            identity, which the node is added to if it is interned.
+        :return: The id of the node, or None if it is not interned in the
+            current escape mode.
+        """
+        interned: tuple[int, NodeKey] | None = self._interned.get(id(node))
+        if interned is None or interned[1][4] is not get_escape_mode():
+            return None
+
+        ids[id(node)] = interned
+
+        return interned[0]
+
+    def _render(self, root: ParentNode, ids: dict[int, tuple[int, NodeKey]]) -> str:
+        """
+        Renders a tree whose keys were found by `_key`, reusing the HTML of
+        its subtrees where they are cached. The tree is walked with an
+        explicit stack instead of recursion.
+
+        :param root: The root of the tree.
+        :param ids: The id and key of the ParentNodes of the tree, by node
+            identity.
+        :return: The rendered HTML.
+        """
+        html: str | None = self._cached(root, ids)
+        if html is not None:
+            return html
+
+        stack: list[tuple[ParentNode, Iterator[tuple[HTMLNode, str | int]], list[str]]] = [
+            (root, zip(root.children, ids[id(root)][1][3]), [root.open_tag()])
+        ]
+
+        while stack:
+            node, children, parts = stack[-1]
+
+            for child, child_key in children:
+                if not isinstance(child_key, int):
+                    parts.append(child_key)
+                    continue
+
+                child_html: str | None = self._cached(child, ids)
+                if child_html is None:
+                    stack.append((child, zip(child.children, ids[id(child)][1][3]), [child.open_tag()]))
+                    break
+                parts.append(child_html)
+            else:
+                stack.pop()
+                parts.append(node.close_tag())
+                html = "".join(parts)
+                self._store(*ids[id(node)], html)
+                if stack:
+                    stack[-1][2].append(html)
+
+        return html
+
+    def _cached(self, node: ParentNode, ids: dict[int, tuple[int, NodeKey]]) -> str | None:
+        """
+        Finds the cached HTML of a subtree, and counts the hit or miss.
+
+        :param node: The root of the subtree.
+        :param ids: The id and key of the ParentNodes of the tree, by node
+            identity.
+        :return: The HTML of the subtree, or None if it is not cached.
+        """
+        node_id: int = ids[id(node)][0]
+
+        html: str | None = self._entries.get(node_id)
+        if html is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(node_id)
+
+        return html
+
+    def _store(self, node_id: int, key: NodeKey, html: str) -> None:
+        """
+        Keeps the HTML of a subtree, evicting the least recently used subtree
+        if the cache is full.
+
+        :param node_id: The id of the subtree.
+        :param key: The structural key of the subtree.
+        :param html: The rendered HTML of the subtree.
+        """
+        self._entries[node_id] = html
+        self._keys[node_id] = key
+        self._ids.setdefault(key, node_id)
+
+        while len(self._entries) > self.max_entries:
+            evicted_id, _ = self._entries.popitem(last=False)
+            evicted_key: NodeKey = self._keys.pop(evicted_id)
+            if self._ids.get(evicted_key) == evicted_id:
+                del self._ids[evicted_key]
+
+            canonical: ParentNode | None = self._canonical.pop(evicted_id, None)
+            if canonical is not None and self._interned.get(id(canonical), (None,))[0] == evicted_id:
+                # A node interned again in another escape mode keeps its newer id.
+                del self._interned[id(canonical)]
+
+            self.evictions += 1
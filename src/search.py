@@ -0,0 +1,328 @@
+"""
+This module contains the search index of a site, which browsers query without a
+server.
+
+The index is an inverted index of every term to the pages it occurs on and its
+positions on them, built from the TEXT, BOLD and ITALIC TextNodes of a page
+while the page is rendered (see `extract_terms`), so the generated HTML never
+needs to be parsed again. Terms are the lower-case words of the text.
+
+The index is written to the `search` directory of the output directory:
+
+- `pages.json` holds the URL and title of every page under its page id, along
+  with the shards its terms are in. Removed pages leave a null entry, and their
+  ids are reused by new pages.
+- Every term is kept in the shard named after the first characters of the
+  term, such as `search/terms/se.json` for "search", which maps every term of
+  the shard to the id of every page it occurs on and its positions there. A
+  browser only fetches the shards of the terms it looks up.
+
+An incremental build only updates the shards that hold terms of the pages that
+were built or removed, replacing the postings of those pages and keeping the
+rest.
+"""
+import heapq
+import json
+import os
+import re
+from htmlnode import HTMLNode, ParentNode
+from output import OutputWriter
+from textnode import InlineNode, TextType
+
+SEARCH_DIR: str = "search"
+PAGES_FILE: str = "pages.json"
+SHARD_DIR: str = "terms"
+SHARD_SUFFIX: str = ".json"
+# The number of leading characters of a term that name its shard.
+SHARD_PREFIX_LENGTH: int = 2
+# Changed when the layout of the index changes, so older indexes are rebuilt.
+FORMAT_VERSION: int = 1
+
+TERM_PATTERN: re.Pattern = re.compile(r"\w+")
+
+_INDEXED_TYPES: frozenset[TextType] = frozenset((TextType.TEXT, TextType.BOLD, TextType.ITALIC))
+
+
+def extract_terms(node: HTMLNode) -> dict[str, list[int]]:
+    """
+    Collects the terms of the text of a tree of HTMLNodes.
+
+    :param node: The root of the tree, such as the content of a page.
+    :return: A mapping of every term to its positions, counted in terms from
+        the start of the text.
+    """
+    terms: dict[str, list[int]] = {}
+    add_terms(node, terms)
+
+    return terms
+
+
+def add_terms(node: HTMLNode, terms: dict[str, list[int]], position: int = 0) -> int:
+    """
+    Adds the terms of the text of a tree of HTMLNodes to those of the trees
+    before it, such as the blocks of a page that is rendered one at a time.
+
+    :param node: The root of the tree.
+    :param terms: A mapping of every term to its positions, which is added to.
+    :param position: The position of the first term of the tree.
+    :return: The position after the last term of the tree.
+    """
+    stack: list[HTMLNode] = [node]
+
+    while stack:
+        current: HTMLNode = stack.pop()
+
+        if isinstance(current, InlineNode):
+            for text_node in current.text_nodes:
+                if text_node.text_type in _INDEXED_TYPES:
+                    for term in TERM_PATTERN.findall(text_node.text.lower()):
+                        positions: list[int] | None = terms.get(term)
+                        if positions is None:
+                            terms[term] = [position]
+                        else:
+                            positions.append(position)
+                        position += 1
+        elif isinstance(current, ParentNode):
+            stack.extend(reversed(current.children))
+
+    return position
+
+
+def shard_for(term: str, prefix_length: int = SHARD_PREFIX_LENGTH) -> str:
+    """
+    Finds the shard a term is kept in.
+
+    :param term: The term.
+    :param prefix_length: The number of leading characters that name a shard.
+    :return: The name of the shard.
+    """
+    return term[:prefix_length]
+
+
+class SearchIndex:
+    """
+    Keeps the search index of a site up to date as its pages are built and
+    removed.
+    """
+
+    __slots__ = ("output_dir", "prefix_length", "pages", "shards_written", "_ids", "_free", "_postings", "_shards",
+                 "_fresh")
+
+    def __init__(self, output_dir: str, prefix_length: int = SHARD_PREFIX_LENGTH) -> None:
+        """
+        Instantiates an empty SearchIndex, whose shards replace those in the
+        output directory when it is saved.
+
+        :param output_dir: The directory the site is written to.
+        :param prefix_length: The number of leading characters of a term that
+            name its shard.
+        :raise: ValueError if the prefix length is less than one.
+        """
+        if prefix_length < 1:
+            raise ValueError(f"The shard prefix length must be at least 1, not {prefix_length}.")
+
+        self.output_dir: str = output_dir
+        self.prefix_length: int = prefix_length
+        # The URL, title and shards of every page id, or None for free ids.
+        self.pages: list[list | None] = []
+        self.shards_written: int = 0
+        self._ids: dict[str, int] = {}
+        self._free: list[int] = []
+        # The terms and positions of every page that changed since the index
+        # was loaded, or None for removed pages.
+        self._postings: dict[int, dict[str, list[int]] | None] = {}
+        # The shards holding terms of the changed pages, before or after.
+        self._shards: set[str] = set()
+        self._fresh: bool = True
+
+    @classmethod
+    def load(cls, output_dir: str, prefix_length: int = SHARD_PREFIX_LENGTH) -> "SearchIndex":
+        """
+        Loads the index written to an output directory by an earlier build.
+
+        :param output_dir: The directory the site is written to.
+        :param prefix_length: The number of leading characters of a term that
+            name its shard.
+        :return: The index, or an empty index if there is none or it was
+            written with another format or prefix length.
+        """
+        index: SearchIndex = cls(output_dir, prefix_length)
+
+        try:
+            with open(os.path.join(output_dir, SEARCH_DIR, PAGES_FILE), encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return index
+
+        if (
+            not isinstance(data, dict) or data.get("version") != FORMAT_VERSION
+            or data.get("prefix_length") != prefix_length or not isinstance(data.get("pages"), list)
+        ):
+            return index
+
+        index.pages = data["pages"]
+        for page_id, page in enumerate(index.pages):
+            if page is None:
+                index._free.append(page_id)
+            else:
+                index._ids[page[0]] = page_id
+        index._fresh = False
+
+        return index
+
+    def has(self, url: str) -> bool:
+        """
+        Checks whether a page is in the index.
+
+        :param url: The path of the page, relative to the output directory.
+        :return: Whether the page is in the index.
+        """
+        return url in self._ids
+
+    def urls(self) -> set[str]:
+        """
+        Lists the pages in the index.
+
+        :return: The paths of the pages, relative to the output directory.
+        """
+        return set(self._ids)
+
+    def update(self, url: str, title: str, terms: dict[str, list[int]]) -> None:
+        """
+        Replaces the postings of a page that was built.
+
+        :param url: The path of the page, relative to the output directory.
+        :param title: The title of the page.
+        :param terms: The terms of the page and their positions, as returned by
+            `extract_terms`.
+        """
+        page_id: int | None = self._ids.get(url)
+        if page_id is None:
+            page_id = heapq.heappop(self._free) if self._free else len(self.pages)
+            if page_id == len(self.pages):
+                self.pages.append(None)
+            self._ids[url] = page_id
+        else:
+            self._shards.update(self.pages[page_id][2])
+
+        shards: list[str] = sorted({shard_for(term, self.prefix_length) for term in terms})
+        self.pages[page_id] = [url, title, shards]
+        self._postings[page_id] = terms
+        self._shards.update(shards)
+
+    def remove(self, url: str) -> None:
+        """
+        Removes the postings of a page whose source was deleted.
+
+        :param url: The path of the page, relative to the output directory.
+        """
+        page_id: int | None = self._ids.pop(url, None)
+        if page_id is None:
+            return
+
+        self._shards.update(self.pages[page_id][2])
+        self.pages[page_id] = None
+        self._postings[page_id] = None
+        heapq.heappush(self._free, page_id)
+
+    def save(self, writer: OutputWriter) -> None:
+        """
+        Writes the pages and the shards that changed since the index was
+        loaded. A new index also removes the shards left by earlier indexes.
+
+        :param writer: The writer of the build's output files.
+        """
+        additions: dict[str, dict[str, dict[str, list[int]]]] = {shard: {} for shard in self._shards}
+        for page_id, terms in self._postings.items():
+            for term, positions in (terms or {}).items():
+                additions[shard_for(term, self.prefix_length)].setdefault(term, {})[str(page_id)] = positions
+
+        changed_ids: set[str] = {str(page_id) for page_id in self._postings}
+
+        for shard in sorted(self._shards):
+            postings: dict[str, dict[str, list[int]]] = {} if self._fresh else self._read_shard(shard)
+
+            for term in list(postings):
+                pages: dict[str, list[int]] = {
+                    page_id: positions for page_id, positions in postings[term].items() if page_id not in changed_ids
+                }
+                if pages:
+                    postings[term] = pages
+                else:
+                    del postings[term]
+
+            for term, pages in additions[shard].items():
+                postings.setdefault(term, {}).update(pages)
+
+            path: str = _shard_path(shard)
+            if not postings:
+                writer.remove(path)
+            elif writer.write(
+                path, json.dumps(postings, ensure_ascii=False, separators=(",", ":"), sort_keys=True), compress=False
+            ):
+                self.shards_written += 1
+
+        if self._fresh:
+            self._remove_stale_shards(writer)
+
+        writer.write(
+            f"{SEARCH_DIR}/{PAGES_FILE}",
+            json.dumps(
+                {"version": FORMAT_VERSION, "prefix_length": self.prefix_length, "pages": self.pages},
+                ensure_ascii=False, separators=(",", ":")
+            ),
+            compress=False
+        )
+
+        self._postings = {}
+        self._shards = set()
+        self._fresh = False
+
+    def stats(self) -> dict[str, int]:
+        """
+        Reports the size of the index.
+
+        :return: The number of pages in the index and of shards written.
+        """
+        return {"pages": len(self._ids), "shards_written": self.shards_written}
+
+    def _read_shard(self, shard: str) -> dict[str, dict[str, list[int]]]:
+        """
+        Reads a shard written by an earlier build.
+
+        :param shard: The name of the shard.
+        :return: The postings of the shard, or an empty dict if it does not
+            exist.
+        """
+        try:
+            with open(os.path.join(self.output_dir, _shard_path(shard)), encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def _remove_stale_shards(self, writer: OutputWriter) -> None:
+        """
+        Removes the shards that no page of the index has terms in.
+
+        :param writer: The writer of the build's output files.
+        """
+        shards: set[str] = {shard for page in self.pages if page is not None for shard in page[2]}
+
+        try:
+            names: list[str] = os.listdir(os.path.join(self.output_dir, SEARCH_DIR, SHARD_DIR))
+        except FileNotFoundError:
+            return
+
+        for name in names:
+            if name.endswith(SHARD_SUFFIX) and name[:-len(SHARD_SUFFIX)] not in shards:
+                writer.remove(_shard_path(name[:-len(SHARD_SUFFIX)]))
+
+
+def _shard_path(shard: str) -> str:
+    """
+    Finds the path of a shard.
+
+    :param shard: The name of the shard.
+    :return: The path of the shard, relative to the output directory.
+    """
+    return f"{SEARCH_DIR}/{SHARD_DIR}/{shard}{SHARD_SUFFIX}"
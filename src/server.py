@@ -0,0 +1,452 @@
+"""
+This module contains the development server of the static site generator.
+
+`DevServer` builds the site once and then keeps the generator process running.
+A `DirectoryWatcher` polls the content, template and static files, and only the
+pages affected by a change are regenerated. The output directory is served over
+HTTP with ETag and Last-Modified validation, and every HTML page is served with
+a small script that reloads it as soon as a rebuild has finished.
+"""
+import io
+import os
+import threading
+import time
+import urllib.parse
+from email.utils import parsedate_to_datetime
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from build import (
+    BuildReport, build_site, copy_static_file, output_path_for, page_digest, remove_page, template_digest,
+    write_page
+)
+from manifest import BuildManifest
+
+LIVE_RELOAD_PATH: str = "/__livereload"
+
+# Long-polls the live reload endpoint, and reloads the page once the build
+# generation differs from the one the page was loaded in.
+LIVE_RELOAD_SCRIPT: bytes = b"""<script>
+(function poll(generation) {
+    fetch("/__livereload?since=" + generation)
+        .then(function (response) { return response.text(); })
+        .then(function (next) {
+            if (generation >= 0 && next !== String(generation)) {
+                location.reload();
+            } else {
+                poll(Number(next));
+            }
+        })
+        .catch(function () { setTimeout(function () { poll(generation); }, 1000); });
+})(-1);
+</script>
+"""
+
+
+class DirectoryWatcher:
+    """
+    Detects changes to files by polling their modification time and size.
+    """
+
+    __slots__ = ("paths", "snapshot")
+
+    def __init__(self, paths: list[str]) -> None:
+        """
+        Instantiates a DirectoryWatcher and records the current state of the
+        files.
+
+        :param paths: The files and directories to watch. Directories are
+            watched recursively, and paths that do not exist are ignored.
+        """
+        self.paths = [os.path.normpath(path) for path in paths]
+        self.snapshot = self.scan()
+
+    def scan(self) -> dict[str, tuple[int, int]]:
+        """
+        Records the modification time and size of every watched file.
+
+        :return: A mapping of file path to its modification time and size.
+        """
+        files: dict[str, tuple[int, int]] = {}
+
+        for path in self.paths:
+            if os.path.isfile(path):
+                stat: os.stat_result = os.stat(path)
+                files[path] = (stat.st_mtime_ns, stat.st_size)
+                continue
+
+            for directory, _, names in os.walk(path):
+                for name in names:
+                    file_path: str = os.path.join(directory, name)
+                    try:
+                        stat = os.stat(file_path)
+                    except FileNotFoundError:
+                        continue
+                    files[file_path] = (stat.st_mtime_ns, stat.st_size)
+
+        return files
+
+    def poll(self) -> list[str]:
+        """
+        Finds the files that were created, modified or deleted since the last
+        poll.
+
+        :return: The sorted paths of the changed files.
+        """
+        current: dict[str, tuple[int, int]] = self.scan()
+        changed: list[str] = sorted(
+            path for path in current.keys() | self.snapshot.keys() if current.get(path) != self.snapshot.get(path)
+        )
+        self.snapshot = current
+
+        return changed
+
+
+class BuildGeneration:
+    """
+    Counts the builds of a DevServer so pages can wait for the next one.
+    """
+
+    __slots__ = ("value", "condition")
+
+    def __init__(self) -> None:
+        """
+        Instantiates a BuildGeneration at zero.
+        """
+        self.value: int = 0
+        self.condition: threading.Condition = threading.Condition()
+
+    def advance(self) -> None:
+        """
+        Marks that a build has finished and wakes up every waiting request.
+        """
+        with self.condition:
+            self.value += 1
+            self.condition.notify_all()
+
+    def wait(self, since: int, timeout: float) -> int:
+        """
+        Waits until the generation is different from `since`.
+
+        :param since: The generation the caller has already seen. A negative
+            value returns the current generation immediately.
+        :param timeout: The most seconds to wait.
+        :return: The current generation.
+        """
+        with self.condition:
+            if since >= 0:
+                self.condition.wait_for(lambda: self.value != since, timeout)
+
+            return self.value
+
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Serves the output directory of a DevServer with cache validation and live
+    reloading.
+    """
+
+    # The most seconds a live reload request is held open for.
+    live_reload_timeout: float = 25.0
+
+    def do_GET(self) -> None:
+        """
+        Serves the live reload endpoint or a file from the output directory.
+        """
+        url: urllib.parse.SplitResult = urllib.parse.urlsplit(self.path)
+        if url.path == LIVE_RELOAD_PATH:
+            self.send_live_reload(url.query)
+            return
+
+        super().do_GET()
+
+    def send_live_reload(self, query: str) -> None:
+        """
+        Responds with the build generation once it differs from the `since`
+        query parameter.
+
+        :param query: The query string of the request.
+        """
+        try:
+            since: int = int(urllib.parse.parse_qs(query).get("since", ["-1"])[0])
+        except ValueError:
+            since = -1
+
+        body: bytes = str(self.server.generation.wait(since, self.live_reload_timeout)).encode()
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_head(self) -> io.BytesIO | None:
+        """
+        Sends the headers of a file response, or a 304 response when the
+        client's copy is still valid.
+
+        :return: The body of the response, or None if there is no body.
+        """
+        path: str = self.translate_path(self.path)
+
+        if os.path.isdir(path):
+            if not urllib.parse.urlsplit(self.path).path.endswith("/"):
+                return super().send_head()
+            path = os.path.join(path, "index.html")
+
+        if not os.path.isfile(path):
+            return super().send_head()
+
+        try:
+            with open(path, "rb") as file:
+                body: bytes = file.read()
+                stat: os.stat_result = os.fstat(file.fileno())
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        etag: str = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        if self.is_not_modified(etag, stat.st_mtime):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return None
+
+        content_type: str = self.guess_type(path)
+        if content_type == "text/html":
+            body = inject_live_reload(body)
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Last-Modified", self.date_time_string(stat.st_mtime))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        return io.BytesIO(body)
+
+    def is_not_modified(self, etag: str, mtime: float) -> bool:
+        """
+        Checks the conditional headers of the request against a file.
+
+        :param etag: The ETag of the file.
+        :param mtime: The modification time of the file.
+        :return: Whether the client already has the current version.
+        """
+        if_none_match: str | None = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags: list[str] = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+
+        if_modified_since: str | None = self.headers.get("If-Modified-Since")
+        if if_modified_since is None:
+            return False
+
+        try:
+            since: float = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return False
+
+        return int(mtime) <= since
+
+
+def inject_live_reload(html: bytes) -> bytes:
+    """
+    Adds the live reload script to a HTML page.
+
+    :param html: The page to add the script to.
+    :return: The page with the script before its closing body tag, or at the
+        end if it has none.
+    """
+    index: int = html.rfind(b"</body>")
+    if index == -1:
+        return html + LIVE_RELOAD_SCRIPT
+
+    return html[:index] + LIVE_RELOAD_SCRIPT + html[index:]
+
+
+class DevServer:
+    """
+    Keeps a site built while its files are edited, and serves it locally.
+    """
+
+    def __init__(
+        self,
+        source_dir: str,
+        output_dir: str,
+        template_path: str,
+        static_dir: str = None,
+        manifest_path: str = None,
+        poll_interval: float = 0.05
+    ) -> None:
+        """
+        Instantiates a DevServer.
+
+        :param source_dir: The directory holding the Markdown files.
+        :param output_dir: The directory the site is built into and served from.
+        :param template_path: The HTML template of every page.
+        :param static_dir: A directory of files copied into the output as they are.
+        :param manifest_path: The file the build manifest is kept in.
+        :param poll_interval: The seconds between checks for changed files.
+        """
+        self.source_dir: str = os.path.normpath(source_dir)
+        self.output_dir: str = output_dir
+        self.template_path: str = os.path.normpath(template_path)
+        self.static_dir: str | None = None if static_dir is None else os.path.normpath(static_dir)
+        self.manifest_path: str | None = manifest_path
+        self.poll_interval: float = poll_interval
+        self.generation: BuildGeneration = BuildGeneration()
+
+        self.template: str = ""
+        self.template_hash: str = ""
+        self.manifest: BuildManifest = BuildManifest(manifest_path)
+
+    def build(self) -> BuildReport:
+        """
+        Builds every page whose inputs changed since the last build, and keeps
+        the template and manifest in memory for later rebuilds.
+
+        :return: The report of the build.
+        """
+        report: BuildReport = build_site(
+            self.source_dir, self.output_dir, self.template_path,
+            incremental=True, manifest_path=self.manifest_path, static_dir=self.static_dir
+        )
+
+        with open(self.template_path, "rb") as file:
+            template_bytes: bytes = file.read()
+        self.template = template_bytes.decode("utf-8")
+        self.template_hash = template_digest(template_bytes)
+
+        if self.manifest_path is not None:
+            self.manifest = BuildManifest.load(self.manifest_path)
+
+        return report
+
+    def rebuild(self, changed: list[str]) -> BuildReport:
+        """
+        Regenerates only the outputs affected by changed files. A changed
+        template affects every page.
+
+        :param changed: The paths of the created, modified or deleted files.
+        :return: The report of the rebuild.
+        """
+        if self.template_path in changed:
+            return self.build()
+
+        start: float = time.perf_counter()
+        report: BuildReport = BuildReport()
+
+        for path in changed:
+            if path.endswith(".md") and _is_within(path, self.source_dir):
+                source: str = os.path.relpath(path, self.source_dir).replace(os.sep, "/")
+
+                if not os.path.isfile(path):
+                    removed: str | None = remove_page(self.output_dir, self.manifest, source)
+                    if removed is not None:
+                        report.removed.append(removed)
+                    continue
+
+                with open(path, "rb") as file:
+                    source_bytes: bytes = file.read()
+
+                if not write_page(self.output_dir, source, source_bytes.decode("utf-8"), self.template):
+                    report.unchanged.append(source)
+                self.manifest.record(source, page_digest(self.template_hash, source_bytes), output_path_for(source))
+                report.built.append(source)
+
+            elif self.static_dir is not None and _is_within(path, self.static_dir):
+                relative_path: str = os.path.relpath(path, self.static_dir)
+                output_file: str = os.path.join(self.output_dir, relative_path)
+
+                if os.path.isfile(path):
+                    if copy_static_file(self.static_dir, self.output_dir, relative_path):
+                        report.copied.append(relative_path.replace(os.sep, "/"))
+                elif os.path.isfile(output_file):
+                    os.remove(output_file)
+                    report.removed.append(relative_path.replace(os.sep, "/"))
+
+        if self.manifest_path is not None:
+            self.manifest.save()
+
+        report.seconds = time.perf_counter() - start
+
+        return report
+
+    def watch(self, stop: threading.Event) -> None:
+        """
+        Rebuilds the site whenever its files change, until `stop` is set.
+
+        :param stop: The event that ends the watch.
+        """
+        paths: list[str] = [self.source_dir, self.template_path]
+        if self.static_dir is not None:
+            paths.append(self.static_dir)
+
+        watcher: DirectoryWatcher = DirectoryWatcher(paths)
+
+        while not stop.wait(self.poll_interval):
+            changed: list[str] = watcher.poll()
+            if not changed:
+                continue
+
+            try:
+                report: BuildReport = self.rebuild(changed)
+            except (OSError, ValueError) as error:
+                print(f"Rebuild failed: {error}")
+                continue
+
+            self.generation.advance()
+            print(report.summary())
+
+    def make_server(self, host: str, port: int) -> ThreadingHTTPServer:
+        """
+        Creates the HTTP server for the output directory.
+
+        :param host: The address to listen on.
+        :param port: The port to listen on, or 0 for any free port.
+        :return: The HTTP server, which is not serving yet.
+        """
+        handler = partial(DevRequestHandler, directory=self.output_dir)
+        server: ThreadingHTTPServer = ThreadingHTTPServer((host, port), handler)
+        server.daemon_threads = True
+        server.generation = self.generation
+
+        return server
+
+    def serve_forever(self, host: str = "127.0.0.1", port: int = 8000, watch: bool = True) -> None:
+        """
+        Builds the site and serves it until interrupted.
+
+        :param host: The address to listen on.
+        :param port: The port to listen on.
+        :param watch: Whether to rebuild the site when its files change.
+        """
+        print(self.build().summary())
+
+        stop: threading.Event = threading.Event()
+        if watch:
+            threading.Thread(target=self.watch, args=(stop,), daemon=True).start()
+
+        with self.make_server(host, port) as server:
+            print(f"Serving {self.output_dir} at http://{host}:{server.server_address[1]}/")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                stop.set()
+
+
+def _is_within(path: str, directory: str) -> bool:
+    """
+    Checks whether a path is inside a directory.
+
+    :param path: The path to check.
+    :param directory: The directory it might be in.
+    :return: Whether `path` is inside `directory`.
+    """
+    return path.startswith(directory + os.sep)
+
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+from astcache import ASTCache, dump_tree, encode_tree, load_tree
+from blocks import markdown_to_html_node
+from htmlnode import LeafNode, ParentNode
+from textnode import InlineNode, TextNode, TextType
+
+DOCUMENT: str = """# Title
+
+A **bold** [link](/to) and ![image](/of.png)
+
+- One
+- `Two`
+
+```
+code & more
+```"""
+
+class TestASTCache(unittest.TestCase):
+    """
+    Unit tests for the on-disk cache of parsed documents.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_dir: str = os.path.join(self.directory.name, "ast")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_round_trip(self) -> None:
+        """
+        Tests that a serialized tree loads as the same tree.
+        """
+        node: ParentNode = markdown_to_html_node(DOCUMENT)
+        node.children.append(LeafNode("a", "Home", {"href": "/"}))
+        loaded = load_tree(dump_tree(node))
+
+        self.assertEqual(loaded.to_html(), node.to_html())
+        self.assertEqual(encode_tree(loaded), encode_tree(node))
+        self.assertIsInstance(loaded.children[1], InlineNode)
+        self.assertEqual(loaded.children[1].text_nodes[1], TextNode("bold", TextType.BOLD))
+        self.assertEqual(loaded.children[-1].props, {"href": "/"})
+        self.assertRaises(TypeError, dump_tree, ParentNode("div", [TextNode("text", TextType.TEXT)]))
+
+    def test_corruption(self) -> None:
+        """
+        Tests that truncated, corrupted and foreign data is rejected.
+        """
+        data: bytes = dump_tree(markdown_to_html_node(DOCUMENT))
+        flipped: bytearray = bytearray(data)
+        flipped[-3] ^= 0xFF
+
+        for corrupted in [b"", data[:10], data[:-1], bytes(flipped), b"XXXX" + data[4:], data[:4] + b"\x09" + data[5:]]:
+            with self.subTest(corrupted=corrupted[:8]):
+                self.assertRaises(ValueError, load_tree, corrupted)
+
+    def test_parse(self) -> None:
+        """
+        Tests that documents are parsed once and loaded afterwards, including
+        by a new cache on the same directory.
+        """
+        cache: ASTCache = ASTCache(self.cache_dir)
+        first: ParentNode = cache.parse(DOCUMENT)
+        second: ParentNode = cache.parse(DOCUMENT)
+        reopened: ASTCache = ASTCache(self.cache_dir)
+
+        self.assertEqual(second.to_html(), markdown_to_html_node(DOCUMENT).to_html())
+        self.assertIsNot(first, second)
+        self.assertEqual(reopened.parse(DOCUMENT).to_html(), second.to_html())
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual((reopened.hits, reopened.misses, reopened.stats()["entries"]), (1, 0, 1))
+        self.assertNotEqual(ASTCache.key(DOCUMENT), ASTCache.key(DOCUMENT + " "))
+
+    def test_corrupted_file(self) -> None:
+        """
+        Tests that a corrupted file is removed and the document parsed again.
+        """
+        cache: ASTCache = ASTCache(self.cache_dir)
+        cache.parse(DOCUMENT)
+        path: str = os.path.join(self.cache_dir, ASTCache.key(DOCUMENT) + ".ast")
+        with open(path, "r+b") as file:
+            file.seek(-2, os.SEEK_END)
+            file.write(b"\x00\x00")
+
+        node: ParentNode = cache.parse(DOCUMENT)
+
+        self.assertEqual(node.to_html(), markdown_to_html_node(DOCUMENT).to_html())
+        self.assertEqual(cache.stats()["corrupt"], 1)
+        with open(path, "rb") as file:
+            self.assertEqual(load_tree(file.read()).to_html(), node.to_html())
+
+    def test_eviction(self) -> None:
+        """
+        Tests that the least recently used trees are evicted to stay within the
+        size of the cache.
+        """
+        documents: list[str] = [f"Page {index}\n\n{DOCUMENT}" for index in range(4)]
+        size: int = len(dump_tree(markdown_to_html_node(documents[0])))
+        cache: ASTCache = ASTCache(self.cache_dir, max_bytes=size * 3)
+
+        for document in documents[:3]:
+            cache.parse(document)
+        cache.parse(documents[0])
+        cache.parse(documents[3])
+
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertLessEqual(cache.stats()["bytes"], size * 3)
+        self.assertIsNone(cache.load(ASTCache.key(documents[1])))
+        self.assertIsNotNone(cache.load(ASTCache.key(documents[0])))
+        self.assertEqual(len(os.listdir(self.cache_dir)), 3)
+
+        self.assertFalse(cache.store("big", markdown_to_html_node(DOCUMENT * 20)))
+        cache.max_bytes = size
+        self.assertEqual(cache.stats()["entries"], 1)
+        cache.clear()
+        self.assertEqual(os.listdir(self.cache_dir), [])
+        self.assertRaises(ValueError, ASTCache, self.cache_dir, 0)
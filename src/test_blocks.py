@@ -0,0 +1,80 @@
+import io
+import unittest
+from blocks import BlockType, block_to_block_type, iter_blocks, markdown_to_html_node, render_markdown
+
+class TestBlocks(unittest.TestCase):
+    """
+    Unit tests for parsing the blocks of Markdown documents.
+    """
+
+    def test_iter_blocks(self) -> None:
+        """
+        Tests that lines are grouped into blocks, keeping fenced code together.
+        """
+        lines: list[str] = [
+            "# Title\n", "Some\n", "text\r\n", "\n", "  \n", "- one\n", "- two\n", "## Heading\n",
+            "```\n", "code\n", "\n", "more\n", "```\n", "after\n",
+        ]
+
+        self.assertEqual(list(iter_blocks([])), [])
+        self.assertEqual(
+            list(iter_blocks(lines)),
+            ["# Title", "Some\ntext", "- one\n- two", "## Heading", "```\ncode\n\nmore\n```", "after"]
+        )
+        self.assertEqual(list(iter_blocks(["text\n", "```python\n", "x = 1\n"])), ["text", "```python\nx = 1"])
+
+    def test_iter_blocks_is_lazy(self) -> None:
+        """
+        Tests that a block is yielded before the lines after it are read.
+        """
+        def lines():
+            yield "First block\n"
+            yield "\n"
+            raise AssertionError("Read past the first block")
+
+        self.assertEqual(next(iter_blocks(lines())), "First block")
+
+    def test_block_to_block_type(self) -> None:
+        """
+        Tests that every type of block is recognised.
+        """
+        self.assertEqual(block_to_block_type("###### Heading"), BlockType.HEADING)
+        self.assertEqual(block_to_block_type("####### Heading"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("```\ncode\n```"), BlockType.CODE)
+        self.assertEqual(block_to_block_type("> quote\n>more"), BlockType.QUOTE)
+        self.assertEqual(block_to_block_type("> quote\nmore"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("- one\n* two"), BlockType.UNORDERED_LIST)
+        self.assertEqual(block_to_block_type("*italic* text"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("1. one\n2. two"), BlockType.ORDERED_LIST)
+        self.assertEqual(block_to_block_type("1. one\n3. two"), BlockType.PARAGRAPH)
+
+    def test_markdown_to_html_node(self) -> None:
+        """
+        Tests that every type of block is converted into HTML elements.
+        """
+        markdown: str = (
+            "> A **bold**\n> quote\n\n- one\n- *two*\n-  \n\n1. first\n2. `second`\n\n"
+            "```\n<b>not bold</b>\n\n  indented\n```"
+        )
+
+        self.assertEqual(
+            markdown_to_html_node(markdown).to_html(),
+            "<div><blockquote>A <b>bold</b> quote</blockquote>"
+            "<ul><li>one</li><li><i>two</i></li><li></li></ul>"
+            "<ol><li>first</li><li><code>second</code></li></ol>"
+            "<pre><code>&lt;b&gt;not bold&lt;/b&gt;\n\n  indented\n</code></pre></div>"
+        )
+
+    def test_render_markdown(self) -> None:
+        """
+        Tests that streaming a document renders the same HTML as its tree.
+        """
+        markdown: str = "# Title\n\nSome *text*\n\n- item\n\n```\ncode\n```\n"
+        writer: io.StringIO = io.StringIO()
+        render_markdown(io.StringIO(markdown), writer)
+
+        self.assertEqual(writer.getvalue(), markdown_to_html_node(markdown).to_html())
+
+        empty: io.StringIO = io.StringIO()
+        render_markdown(io.StringIO("\n\n"), empty)
+        self.assertEqual(empty.getvalue(), "")
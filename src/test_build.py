@@ -0,0 +1,427 @@
+import gzip
+import os
+import tempfile
+import unittest
+from build import build_site, find_sources, output_path_for
+from manifest import BuildManifest, content_digest
+
+class TestBuild(unittest.TestCase):
+    """
+    Unit tests for building a site.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a site with a template and two pages in a temporary directory.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.source_dir: str = os.path.join(self.directory.name, "content")
+        self.output_dir: str = os.path.join(self.directory.name, "public")
+        self.template_path: str = os.path.join(self.directory.name, "template.html")
+        self.manifest_path: str = os.path.join(self.directory.name, ".cache", "manifest.json")
+
+        self.write(self.template_path, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.source_dir, "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join(self.source_dir, "blog", "post.md"), "# Post\n\nA *post*")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write(self, path: str, text: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def read(self, path: str) -> str:
+        with open(os.path.join(self.output_dir, path), encoding="utf-8", newline="") as file:
+            return file.read()
+
+    def build(self, incremental: bool = True):
+        return build_site(
+            self.source_dir, self.output_dir, self.template_path,
+            incremental=incremental, manifest_path=self.manifest_path
+        )
+
+    def test_paths(self) -> None:
+        """
+        Tests that sources are found in a stable order and mapped to outputs.
+        """
+        self.assertEqual(find_sources(self.source_dir), ["blog/post.md", "index.md"])
+        self.assertEqual(output_path_for("blog/post.md"), "blog/post.html")
+        self.assertEqual(
+            content_digest(b"template", path=os.path.join(self.source_dir, "index.md")),
+            content_digest(b"template", b"# Home\n\nWelcome")
+        )
+
+    def test_full_build(self) -> None:
+        """
+        Tests that every page is rendered into the template.
+        """
+        report = self.build(incremental=False)
+
+        self.assertEqual(report.built, ["blog/post.md", "index.md"])
+        self.assertEqual(self.read("index.html"), "<title>Home</title><div><h1>Home</h1><p>Welcome</p></div>")
+        self.assertEqual(self.read("blog/post.html"), "<title>Post</title><div><h1>Post</h1><p>A <i>post</i></p></div>")
+        self.assertEqual(sorted(BuildManifest.load(self.manifest_path).pages), ["blog/post.md", "index.md"])
+        self.assertIsNone(report.render_cache)
+
+    def test_parallel_build(self) -> None:
+        """
+        Tests that building in several processes writes the same bytes as a
+        serial build.
+        """
+        for index in range(8):
+            self.write(os.path.join(self.source_dir, "docs", f"page{index}.md"), f"Page **{index}**\r\nof [docs](/docs)")
+
+        self.build(incremental=False)
+        serial: dict[str, str] = {path: self.read(path) for path in ["index.html", "docs/page7.html"]}
+
+        report = build_site(self.source_dir, self.output_dir, self.template_path, jobs=3)
+
+        self.assertEqual(len(report.built), 10)
+        self.assertEqual({path: self.read(path) for path in serial}, serial)
+        self.assertRaises(ValueError, build_site, self.source_dir, self.output_dir, self.template_path, jobs=0)
+
+    def test_inline_cache(self) -> None:
+        """
+        Tests that an inline cache reuses repeated fragments without changing
+        the output.
+        """
+        self.write(os.path.join(self.source_dir, "about.md"), "# About\n\nWelcome")
+
+        report = build_site(self.source_dir, self.output_dir, self.template_path, inline_cache_size=16)
+
+        self.assertEqual(report.inline_cache["hits"], 1)
+        self.assertEqual(self.read("index.html"), "<title>Home</title><div><h1>Home</h1><p>Welcome</p></div>")
+        self.assertIn("inline cache: 1 hits", report.summary())
+        self.assertIsNone(self.build().inline_cache)
+
+    def test_ast_cache(self) -> None:
+        """
+        Tests that a rebuild loads the trees of unchanged documents instead of
+        parsing them, without changing the output.
+        """
+        ast_cache_dir: str = os.path.join(self.directory.name, ".cache", "ast")
+
+        cold = build_site(self.source_dir, self.output_dir, self.template_path, ast_cache_dir=ast_cache_dir)
+        self.write(self.template_path, "<h1>{{ Title }}</h1>{{ Content }}")
+        warm = build_site(self.source_dir, self.output_dir, self.template_path, ast_cache_dir=ast_cache_dir)
+        parallel = build_site(self.source_dir, self.output_dir, self.template_path, jobs=2, ast_cache_dir=ast_cache_dir)
+
+        self.assertEqual((cold.ast_cache["hits"], cold.ast_cache["misses"]), (0, 2))
+        self.assertEqual((warm.ast_cache["hits"], warm.ast_cache["misses"]), (2, 0))
+        self.assertIn("parse cache: 2 hits", warm.summary())
+        self.assertEqual(len(parallel.built), 2)
+        self.assertEqual(self.read("blog/post.html"), "<h1>Post</h1><div><h1>Post</h1><p>A <i>post</i></p></div>")
+        self.assertIsNone(self.build().ast_cache)
+
+    def test_ast_cache_parallel_budget(self) -> None:
+        """
+        Tests that a parallel build leaves the parse cache within its budget,
+        although no worker sees the trees the others store.
+        """
+        def sizes(directory: str) -> list[int]:
+            return [
+                os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names
+            ]
+
+        serial_dir: str = os.path.join(self.directory.name, ".cache", "serial")
+        parallel_dir: str = os.path.join(self.directory.name, ".cache", "parallel")
+        build_site(self.source_dir, self.output_dir, self.template_path, ast_cache_dir=serial_dir)
+        budget: int = max(sizes(serial_dir))
+        build_site(
+            self.source_dir, self.output_dir, self.template_path, jobs=2, ast_cache_dir=parallel_dir,
+            ast_cache_size=budget
+        )
+
+        self.assertEqual(len(sizes(serial_dir)), 2)
+        self.assertLessEqual(sum(sizes(parallel_dir)), budget)
+
+    def test_unchanged_output(self) -> None:
+        """
+        Tests that a full rebuild leaves outputs whose bytes did not change
+        untouched.
+        """
+        self.build(incremental=False)
+        os.utime(os.path.join(self.output_dir, "index.html"), ns=(0, 0))
+        self.write(os.path.join(self.source_dir, "blog", "post.md"), "# Post\n\nAn *edited* post")
+
+        report = self.build(incremental=False)
+        parallel = build_site(self.source_dir, self.output_dir, self.template_path, jobs=2)
+
+        self.assertEqual(report.unchanged, ["index.md"])
+        self.assertIn("Built 2 pages, wrote 1,", report.summary())
+        self.assertEqual(parallel.unchanged, ["blog/post.md", "index.md"])
+        self.assertEqual(os.stat(os.path.join(self.output_dir, "index.html")).st_mtime_ns, 0)
+
+    def test_gzip(self) -> None:
+        """
+        Tests that compressed copies of the pages are written by serial and
+        parallel builds, and that turning compression on rebuilds every page.
+        """
+        self.build()
+        report = build_site(
+            self.source_dir, self.output_dir, self.template_path,
+            incremental=True, manifest_path=self.manifest_path, gzip_level=6
+        )
+        os.remove(os.path.join(self.output_dir, "blog", "post.html.gz"))
+        parallel = build_site(self.source_dir, self.output_dir, self.template_path, jobs=2, gzip_level=6)
+
+        self.assertEqual(report.built, ["blog/post.md", "index.md"])
+        self.assertEqual(sorted(report.compression), [".", "blog"])
+        self.assertIn("(gzip: 2 pages, ratio", report.summary())
+        self.assertIn("blog", report.compression_summary())
+        self.assertEqual(list(parallel.compression), ["blog"])
+        with gzip.open(os.path.join(self.output_dir, "blog", "post.html.gz"), "rt", encoding="utf-8") as file:
+            self.assertEqual(file.read(), self.read("blog/post.html"))
+        self.assertRaises(ValueError, build_site, self.source_dir, self.output_dir, self.template_path, gzip_level=10)
+
+        searched = build_site(self.source_dir, self.output_dir, self.template_path, gzip_level=6, search=True)
+        self.assertNotIn("search", searched.compression)
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "search", "pages.json.gz")))
+        uncompressed = build_site(self.source_dir, self.output_dir, self.template_path)
+        self.assertEqual(uncompressed.unchanged, ["blog/post.md", "index.md"])
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "index.html.gz")))
+
+    def test_check_links(self) -> None:
+        """
+        Tests that broken links are reported by serial and parallel builds,
+        and that incremental builds only check the pages affected by changes.
+        """
+        static_dir: str = os.path.join(self.directory.name, "static")
+        self.write(os.path.join(static_dir, "img", "logo.png"), "png")
+        self.write(os.path.join(self.source_dir, "index.md"), "# Home\n\n![logo](/img/logo.png) [about](about)")
+
+        def build(jobs: int = 1):
+            return build_site(
+                self.source_dir, self.output_dir, self.template_path, incremental=True,
+                manifest_path=self.manifest_path, jobs=jobs, static_dir=static_dir, check_links=True
+            )
+
+        self.build()
+        first = build()
+        unchanged = build()
+        self.write(os.path.join(self.source_dir, "about.md"), "# About\n\n[Home](/) and [the post](blog/post)")
+        added = build(jobs=2)
+
+        self.assertEqual(first.built, ["blog/post.md", "index.md"])
+        self.assertEqual(first.links["checked"], ["blog/post.md", "index.md"])
+        self.assertEqual(first.links["broken"], {"index.md": [["link", "about"]]})
+        self.assertIn("(links: 1 broken in 1 pages, 2 pages checked)", first.summary())
+        self.assertEqual(unchanged.links, {"checked": [], "broken": {"index.md": [["link", "about"]]}})
+        self.assertEqual(added.links, {"checked": ["about.md", "index.md"], "broken": {}})
+        self.assertIsNone(self.build().links)
+
+    def test_search(self) -> None:
+        """
+        Tests that serial and parallel builds write the same search index, and
+        that an incremental build only rewrites the shards of changed pages.
+        """
+        def build(jobs: int = 1, incremental: bool = True):
+            return build_site(
+                self.source_dir, self.output_dir, self.template_path, incremental=incremental,
+                manifest_path=self.manifest_path, jobs=jobs, search=True
+            )
+
+        self.build()
+        first = build()
+        index: str = self.read("search/pages.json")
+        self.assertEqual(build(jobs=2, incremental=False).search, {"pages": 2, "shards_written": 0})
+        self.assertEqual(self.read("search/pages.json"), index)
+
+        self.write(os.path.join(self.source_dir, "blog", "post.md"), "# Post\n\nAnother *post*")
+        changed = build()
+
+        self.assertEqual(first.built, ["blog/post.md", "index.md"])
+        self.assertEqual(first.search, {"pages": 2, "shards_written": 4})
+        self.assertIn("(search: 2 pages, 1 shards written)", changed.summary())
+        self.assertEqual(self.read("search/terms/an.json"), '{"another":{"0":[1]}}')
+        self.assertEqual(self.read("search/terms/po.json"), '{"post":{"0":[0,2]}}')
+        self.assertIsNone(self.build().search)
+
+    def test_listings(self) -> None:
+        """
+        Tests that listings, a feed and a sitemap are written from the front
+        matter of the pages, and that the front matter of unchanged pages is
+        not read again.
+        """
+        self.write(os.path.join(self.source_dir, "blog", "post.md"), "---\ndate: 2024-05-01\ntags: a\n---\n# Post")
+
+        def build():
+            return build_site(
+                self.source_dir, self.output_dir, self.template_path, incremental=True,
+                manifest_path=self.manifest_path, listings=True, site_url="https://example.com",
+                metadata_cache_path=os.path.join(self.directory.name, ".cache", "metadata.json"), check_links=True
+            )
+
+        first = build()
+        second = build()
+
+        self.assertEqual(first.listings, {"posts": 1, "pages": 1, "hits": 0, "misses": 2})
+        self.assertEqual(second.listings, {"posts": 1, "pages": 1, "hits": 2, "misses": 0})
+        self.assertIn("(listings: 1 posts on 1 pages)", first.summary())
+        self.assertEqual(self.read("blog/post.html"), "<title>Post</title><div><h1>Post</h1></div>")
+        self.assertIn('<a href="../blog/post.html">post</a>', self.read("posts/index.html"))
+        self.assertIn("<loc>https://example.com/posts/</loc>", self.read("sitemap.xml"))
+        self.assertIn("<category>a</category>", self.read("feed.xml"))
+        self.assertEqual(second.links["broken"], {})
+
+    def test_stream(self) -> None:
+        """
+        Tests that serial and parallel builds in stream mode write the same
+        pages, links and search index as a normal build, and report their
+        memory and throughput.
+        """
+        self.write(
+            os.path.join(self.source_dir, "about.md"),
+            "---\r\ntitle: About\r\n---\r\nSee [the post](blog/post) and `code`\r\n\r\n> quote\r\n"
+        )
+        paths: list[str] = ["about.html", "blog/post.html", "index.html", "index.html.gz", "search/pages.json"]
+
+        def build(output_dir: str, stream: bool, jobs: int = 1):
+            report = build_site(
+                self.source_dir, output_dir, self.template_path, incremental=True, manifest_path=output_dir + ".json",
+                jobs=jobs, check_links=True, search=True, gzip_level=6, stream=stream
+            )
+            files: dict[str, bytes] = {}
+            for path in paths:
+                with open(os.path.join(output_dir, path), "rb") as file:
+                    files[path] = file.read()
+            return report, files
+
+        normal, normal_files = build(self.output_dir, False)
+        streamed, streamed_files = build(os.path.join(self.directory.name, "streamed"), True)
+        parallel, parallel_files = build(os.path.join(self.directory.name, "parallel"), True, jobs=2)
+        skipped, _ = build(os.path.join(self.directory.name, "streamed"), True)
+
+        self.assertIsNone(normal.memory)
+        self.assertEqual(streamed_files, normal_files)
+        self.assertEqual(parallel_files, normal_files)
+        self.assertEqual(streamed.links, normal.links)
+        self.assertEqual(parallel.built, ["about.md", "blog/post.md", "index.md"])
+        self.assertEqual(skipped.skipped, ["about.md", "blog/post.md", "index.md"])
+        self.assertEqual(sorted(streamed.memory), ["mb_per_second", "pages_per_second", "peak_rss"])
+        self.assertIn("(stream: ", parallel.summary())
+
+    def test_listings_next_to_pages(self) -> None:
+        """
+        Tests that listing pages never replace or remove the pages of a site
+        in the listing directory, and can be written to another directory.
+        """
+        self.write(os.path.join(self.source_dir, "posts", "a.md"), "---\ndate: 2024-05-01\n---\n# A")
+        self.write(os.path.join(self.source_dir, "posts", "2.md"), "# Page two")
+
+        def build(listing_dir: str = "posts"):
+            return build_site(
+                self.source_dir, self.output_dir, self.template_path, listings=True, listing_dir=listing_dir
+            )
+
+        build()
+        self.assertIn("Page two", self.read("posts/2.html"))
+        self.assertIn('<a href="a.html">a</a>', self.read("posts/index.html"))
+
+        self.write(os.path.join(self.source_dir, "posts", "index.md"), "# My posts")
+        with self.assertRaisesRegex(ValueError, "replace the pages posts/index.html"):
+            build()
+        self.assertEqual(self.read("posts/index.html"), "<title>My posts</title><div><h1>My posts</h1></div>")
+
+        archive = build("archive")
+        self.assertEqual(archive.listings["pages"], 1)
+        self.assertIn('<a href="../posts/a.html">a</a>', self.read("archive/index.html"))
+        self.assertIn("Page two", self.read("posts/2.html"))
+
+    def test_incremental_build(self) -> None:
+        """
+        Tests that incremental builds only regenerate pages whose inputs changed.
+        """
+        self.build()
+        unchanged = self.build()
+
+        self.write(os.path.join(self.source_dir, "index.md"), "# Home\n\nWelcome back")
+        changed_source = self.build()
+
+        self.write(self.template_path, "<h1>{{ Title }}</h1>{{ Content }}")
+        changed_template = self.build()
+
+        os.remove(os.path.join(self.source_dir, "blog", "post.md"))
+        removed_source = self.build()
+
+        self.assertEqual(unchanged.built, [])
+        self.assertEqual(unchanged.skipped, ["blog/post.md", "index.md"])
+        self.assertEqual(changed_source.built, ["index.md"])
+        self.assertEqual(changed_template.built, ["blog/post.md", "index.md"])
+        self.assertEqual(removed_source.removed, ["blog/post.html"])
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "blog", "post.html")))
+
+    def test_full_build_keeps_manifest(self) -> None:
+        """
+        Tests that a full build rebuilds every page but still loads the
+        manifest, so the output of a page deleted before it is removed.
+        """
+        self.build()
+        os.remove(os.path.join(self.source_dir, "blog", "post.md"))
+        full = self.build(incremental=False)
+        incremental = self.build()
+
+        self.assertEqual(full.built, ["index.md"])
+        self.assertEqual(full.removed, ["blog/post.html"])
+        self.assertEqual(incremental.skipped, ["index.md"])
+        self.assertEqual(list(BuildManifest.load(self.manifest_path).pages), ["index.md"])
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "blog", "post.html")))
+
+    def test_full_build_removes_stale_outputs(self) -> None:
+        """
+        Tests that a full build removes the page and compressed copy of a
+        deleted source, and drops it from the search index.
+        """
+        def build(incremental: bool):
+            return build_site(
+                self.source_dir, self.output_dir, self.template_path, incremental=incremental,
+                manifest_path=self.manifest_path, gzip_level=6, search=True
+            )
+
+        build(False)
+        os.remove(os.path.join(self.source_dir, "blog", "post.md"))
+        full = build(False)
+
+        self.assertEqual(full.removed, ["blog/post.html"])
+        self.assertIn("removed 1", full.summary())
+        self.assertEqual(os.listdir(os.path.join(self.output_dir, "blog")), [])
+        self.assertNotIn("post.html", self.read("search/pages.json"))
+        self.assertEqual(build(True).removed, [])
+
+    def test_raw_html(self) -> None:
+        """
+        Tests that text is escaped by default, and that changing the escape
+        mode rebuilds every page.
+        """
+        self.write(os.path.join(self.source_dir, "index.md"), "# Fish & Chips\n\nA <em>tasty</em> meal")
+
+        self.build()
+        escaped: str = self.read("index.html")
+        raw = build_site(
+            self.source_dir, self.output_dir, self.template_path,
+            incremental=True, manifest_path=self.manifest_path, raw_html=True
+        )
+
+        self.assertEqual(
+            escaped,
+            "<title>Fish &amp; Chips</title><div><h1>Fish &amp; Chips</h1><p>A &lt;em&gt;tasty&lt;/em&gt; meal</p></div>"
+        )
+        self.assertEqual(raw.built, ["blog/post.md", "index.md"])
+        self.assertEqual(self.read("index.html"), "<title>Fish & Chips</title><div><h1>Fish & Chips</h1><p>A <em>tasty</em> meal</p></div>")
+
+    def test_missing_output(self) -> None:
+        """
+        Tests that a page is rebuilt when its output was deleted, and that a
+        corrupt manifest causes a full rebuild.
+        """
+        self.build()
+        os.remove(os.path.join(self.output_dir, "index.html"))
+        missing_output = self.build()
+
+        self.write(self.manifest_path, "{not json")
+        corrupt_manifest = self.build()
+
+        self.assertEqual(missing_output.built, ["index.md"])
+        self.assertEqual(corrupt_manifest.built, ["blog/post.md", "index.md"])
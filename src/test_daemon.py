@@ -0,0 +1,105 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from build import BuildReport
+from client import DaemonError, send_request
+from daemon import BuildDaemon
+
+class TestDaemon(unittest.TestCase):
+    """
+    Unit tests for the build daemon and its client.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a site in a temporary directory and starts a daemon for it.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.source_dir: str = os.path.join(self.directory.name, "content")
+        self.output_dir: str = os.path.join(self.directory.name, "public")
+        self.template_path: str = os.path.join(self.directory.name, "template.html")
+        self.socket_path: str = os.path.join(self.directory.name, ".cache", "daemon.sock")
+
+        self.write(self.template_path, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.source_dir, "index.md"), "# Home\n\nWelcome to the **site**")
+
+        self.daemon: BuildDaemon = BuildDaemon(self.socket_path)
+        self.thread: threading.Thread = threading.Thread(target=self.daemon.serve_forever)
+        self.thread.start()
+        while send_request(self.socket_path, {"command": "ping"}) is None:
+            time.sleep(0.01)
+
+    def tearDown(self) -> None:
+        send_request(self.socket_path, {"command": "shutdown"})
+        self.thread.join()
+        self.directory.cleanup()
+
+    def write(self, path: str, text: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def build(self) -> dict:
+        return send_request(self.socket_path, {
+            "command": "build", "source": self.source_dir, "output": self.output_dir, "template": self.template_path
+        })
+
+    def test_build(self) -> None:
+        """
+        Tests that the daemon builds sites and keeps its caches across builds.
+        """
+        requests: int = send_request(self.socket_path, {"command": "ping"})["requests"]
+        first: dict = self.build()
+        second: dict = self.build()
+
+        with open(os.path.join(self.output_dir, "index.html"), encoding="utf-8") as file:
+            self.assertEqual(file.read(), "<title>Home</title><div><h1>Home</h1><p>Welcome to the <b>site</b></p></div>")
+
+        self.assertEqual(BuildReport.from_dict(first["report"]).built, ["index.md"])
+        self.assertIn("Built 1 pages", second["summary"])
+        self.assertGreaterEqual(second["seconds"], 0)
+        self.assertEqual(second["report"]["inline_cache"]["hits"], 2)
+        self.assertEqual(send_request(self.socket_path, {"command": "ping"})["requests"], requests + 3)
+        self.assertEqual(os.stat(self.socket_path).st_mode & 0o777, 0o600)
+
+    def test_template(self) -> None:
+        """
+        Tests that the daemon reads a template again only once it changed.
+        """
+        self.build()
+        self.write(self.template_path, "<h1>{{ Title }}</h1>{{ Content }}")
+        os.utime(self.template_path, ns=(0, 0))
+        self.build()
+
+        with open(os.path.join(self.output_dir, "index.html"), encoding="utf-8") as file:
+            self.assertEqual(file.read(), "<h1>Home</h1><div><h1>Home</h1><p>Welcome to the <b>site</b></p></div>")
+        self.assertEqual(send_request(self.socket_path, {"command": "ping"})["templates"], 1)
+
+        # A template of the same size and modification time is not read again.
+        self.write(self.template_path, "<h2>{{ Title }}</h2>{{ Content }}")
+        os.utime(self.template_path, ns=(0, 0))
+        self.assertEqual(self.daemon.read_template(self.template_path), b"<h1>{{ Title }}</h1>{{ Content }}")
+
+    def test_errors(self) -> None:
+        """
+        Tests that failed requests are reported to the client without stopping
+        the daemon, and that a missing daemon is not an error.
+        """
+        self.assertRaises(DaemonError, send_request, self.socket_path, {"command": "unknown"})
+        self.assertRaises(DaemonError, send_request, self.socket_path, {"command": "build", "source": "missing"})
+        self.assertRaises(RuntimeError, BuildDaemon(self.socket_path).make_server)
+        self.assertTrue(send_request(self.socket_path, {"command": "ping"})["ok"])
+        self.assertIsNone(send_request(os.path.join(self.directory.name, "none.sock"), {"command": "ping"}))
+
+    def test_stale_socket(self) -> None:
+        """
+        Tests that a socket file left behind by a stopped daemon is replaced.
+        """
+        stale_path: str = os.path.join(self.directory.name, "stale.sock")
+        self.write(stale_path, "")
+
+        with BuildDaemon(stale_path).make_server():
+            self.assertFalse(os.path.isfile(stale_path))
+            self.assertTrue(os.path.exists(stale_path))
@@ -0,0 +1,63 @@
+import io
+import os
+import tempfile
+import unittest
+from frontmatter import MetadataCache, empty_metadata, read_front_matter, split_front_matter, split_front_matter_lines
+
+class TestFrontMatter(unittest.TestCase):
+    """
+    Unit tests for front matter and the scanner of the front matter of files.
+    """
+
+    def test_split_front_matter(self) -> None:
+        """
+        Tests that the fields of the header are parsed and the header is
+        removed from the body.
+        """
+        metadata, body = split_front_matter(
+            "---\ntitle: \"Hello: world\"\nDate: 2024-05-01\ntags: [python, 'static sites',]\nauthor: me\n---\n# Body\n"
+        )
+
+        self.assertEqual(metadata, {"title": "Hello: world", "date": "2024-05-01", "tags": ["python", "static sites"]})
+        self.assertEqual(body, "# Body\n")
+        self.assertEqual(split_front_matter("# Title\n---\n"), (empty_metadata(), "# Title\n---\n"))
+        self.assertEqual(split_front_matter("---\ntitle: Unclosed\n\nText")[1], "---\ntitle: Unclosed\n\nText")
+        self.assertEqual(split_front_matter("---\r\ntags: a, b\r\n---\r\nText")[0]["tags"], ["a", "b"])
+        self.assertRaises(ValueError, split_front_matter, "---\ndate: May 1st\n---\n")
+
+    def test_read_lines(self) -> None:
+        """
+        Tests that lines are only read up to the closing fence.
+        """
+        file: io.StringIO = io.StringIO("---\ntitle: Post\n---\nBody\n")
+        metadata, lines = split_front_matter_lines(file)
+
+        self.assertEqual(metadata["title"], "Post")
+        self.assertEqual(file.tell(), len("---\ntitle: Post\n---\n"))
+        self.assertEqual(list(lines), ["Body\n"])
+        self.assertEqual(list(split_front_matter_lines(["Text\n", "More\n"])[1]), ["Text\n", "More\n"])
+
+    def test_metadata_cache(self) -> None:
+        """
+        Tests that files are only read again when their modification time or
+        size changed, and that the cache survives being saved and loaded.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path: str = os.path.join(directory, "post.md")
+            cache_path: str = os.path.join(directory, "cache", "metadata.json")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("---\ntitle: Post\n---\nBody")
+
+            cache: MetadataCache = MetadataCache.load(cache_path)
+            self.assertEqual(cache.scan_all(directory, ["post.md"])["post.md"]["title"], "Post")
+            cache.save()
+
+            loaded: MetadataCache = MetadataCache.load(cache_path)
+            self.assertEqual(loaded.scan(directory, "post.md"), read_front_matter(path))
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("---\ntitle: Edited post\n---\nBody")
+            self.assertEqual(loaded.scan(directory, "post.md")["title"], "Edited post")
+            self.assertEqual(loaded.stats(), {"hits": 1, "misses": 1})
+
+            self.assertEqual(loaded.scan_all(directory, []), {})
+            self.assertEqual(loaded.entries, {})
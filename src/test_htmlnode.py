@@ -1,5 +1,8 @@
+import html
+import io
+import sys
 import unittest
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import EscapeMode, HTMLNode, LeafNode, ParentNode, escape_html, escape_mode, get_escape_mode
 
 class TestHTMLNode(unittest.TestCase):
     """
@@ -21,6 +24,19 @@ class TestHTMLNode(unittest.TestCase):
         self.assertEqual(repr(node3), "HTMLNode(None, None, [HTMLNode(h1, None, None, None)], None)")
         self.assertEqual(repr(node4), "HTMLNode(None, None, None, {'href': 'www.google.com'})")
     
+    def test_compact_layout(self) -> None:
+        """
+        Tests that none of the HTMLNode classes carry a per-instance `__dict__`.
+        """
+        nodes: list[HTMLNode] = [
+            HTMLNode("h1"),
+            LeafNode("p", "Hello World"),
+            ParentNode("div", [LeafNode("p", "Hello World")]),
+        ]
+
+        for node in nodes:
+            self.assertFalse(hasattr(node, "__dict__"))
+
     def test_to_html(self) -> None:
         """
         Test to see if the `to_html` method raises an error.
@@ -28,6 +44,7 @@ class TestHTMLNode(unittest.TestCase):
         node: HTMLNode = HTMLNode("a")
         
         self.assertRaises(NotImplementedError,node.to_html)
+        self.assertRaises(NotImplementedError, node.render_to, io.StringIO())
 
     def test_props_to_html(self) -> None:
         """
@@ -52,6 +69,57 @@ class TestHTMLNode(unittest.TestCase):
             node_many_props.props_to_html(), "href=\"www.google.com\" target=\"_blank\" css=\"styles.css\""
         )
 
+    def test_props_to_html_mutation(self) -> None:
+        """
+        Tests that attribute strings shared between nodes follow changes to
+        the props of a node.
+        """
+        props: dict[str, str] = {"href": "www.google.com"}
+        node: HTMLNode = HTMLNode(props=props)
+        same_props: HTMLNode = HTMLNode(props={"href": "www.google.com"})
+        unhashable_props: HTMLNode = HTMLNode(props={"class": ["a", "b"]})
+
+        self.assertEqual(node.props_to_html(), same_props.props_to_html())
+
+        props["target"] = "_blank"
+        self.assertEqual(node.props_to_html(), "href=\"www.google.com\" target=\"_blank\"")
+        self.assertEqual(same_props.props_to_html(), "href=\"www.google.com\"")
+
+        node.props = {"href": "www.boot.dev"}
+        self.assertEqual(node.props_to_html(), "href=\"www.boot.dev\"")
+        self.assertEqual(unhashable_props.props_to_html(), "class=\"[&#x27;a&#x27;, &#x27;b&#x27;]\"")
+
+    def test_props_to_html_equal_values(self) -> None:
+        """
+        Tests that values that are equal but render differently, such as 1,
+        1.0 and True, do not share an attribute string.
+        """
+        self.assertEqual(HTMLNode(props={"x": 1}).props_to_html(), "x=\"1\"")
+        self.assertEqual(HTMLNode(props={"x": True}).props_to_html(), "x=\"True\"")
+        self.assertEqual(HTMLNode(props={"x": 1.0}).props_to_html(), "x=\"1.0\"")
+        self.assertEqual(HTMLNode(props={1: "x"}).props_to_html(), "1=\"x\"")
+        self.assertEqual(HTMLNode(props={True: "x"}).props_to_html(), "True=\"x\"")
+
+    def test_escaping(self) -> None:
+        """
+        Tests that text and attribute values are escaped unless the escape
+        mode is RAW, and that cached attributes follow the mode.
+        """
+        node: LeafNode = LeafNode("a", "Fish & <Chips>", {"href": "/search?q=\"fish\"&page='2'"})
+        escaped: str = '<a href="/search?q=&quot;fish&quot;&amp;page=&#x27;2&#x27;">Fish &amp; &lt;Chips&gt;</a>'
+
+        for text in ("", "plain text", "&amp; <>\"'", "a & b & c", "\u00e9<\u00e9"):
+            self.assertEqual(escape_html(text), html.escape(text))
+        self.assertEqual(node.to_html(), escaped)
+        self.assertEqual(LeafNode(None, "1 < 2").to_html(), "1 &lt; 2")
+
+        with escape_mode(EscapeMode.RAW):
+            self.assertIs(get_escape_mode(), EscapeMode.RAW)
+            self.assertEqual(node.to_html(), "<a href=\"/search?q=\"fish\"&page='2'\">Fish & <Chips></a>")
+
+        self.assertIs(get_escape_mode(), EscapeMode.ESCAPE)
+        self.assertEqual(node.to_html(), escaped)
+
 class TestLeafNode(unittest.TestCase):
     """
     Unit tests for LeafNode
@@ -173,4 +241,49 @@ class TestParentNode(unittest.TestCase):
             node_props.to_html(),
             "<a href=\"www.google.com\">The <i><b style=\"styles.css\">Google</b></i> Homepage</a>"
         )
- 
\ No newline at end of file
+ 
+
+    def test_streaming_render(self) -> None:
+        """
+        Tests that `iter_html` and `render_to` produce the same HTML as
+        `to_html`.
+        """
+        node: ParentNode = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode(None, "Some "), LeafNode("b", "bold"), LeafNode(None, " text")]),
+                LeafNode("a", "A link", {"href": "www.google.com"}),
+            ],
+            {"class": "content"}
+        )
+        node_no_children: ParentNode = ParentNode("div", [ParentNode("p", [])])
+        buffer: io.StringIO = io.StringIO()
+
+        node.render_to(buffer)
+
+        self.assertEqual(
+            list(node.iter_html()),
+            [
+                "<div class=\"content\">", "<p>", "Some ", "<b>bold</b>", " text", "</p>",
+                "<a href=\"www.google.com\">A link</a>", "</div>"
+            ]
+        )
+        self.assertEqual(buffer.getvalue(), node.to_html())
+        self.assertRaises(ValueError, node_no_children.render_to, io.StringIO())
+
+    def test_deep_render(self) -> None:
+        """
+        Tests that trees deeper than the recursion limit can be rendered.
+        """
+        depth: int = sys.getrecursionlimit() * 2
+        node: ParentNode = ParentNode("li", [LeafNode(None, "leaf")])
+        for _ in range(depth - 1):
+            node = ParentNode("ul", [LeafNode("b", "x"), node, LeafNode(None, "y")])
+
+        expected: str = "<ul><b>x</b>" * (depth - 1) + "<li>leaf</li>" + "y</ul>" * (depth - 1)
+        buffer: io.StringIO = io.StringIO()
+        node.render_to(buffer)
+
+        self.assertEqual(node.to_html(), expected)
+        self.assertEqual("".join(node.iter_html()), expected)
+        self.assertEqual(buffer.getvalue(), expected)
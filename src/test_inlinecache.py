@@ -0,0 +1,70 @@
+import unittest
+from inlinecache import InlineCache
+from markdown import text_to_textnodes
+from textnode import FrozenTextNode
+
+class TestInlineCache(unittest.TestCase):
+    """
+    Unit tests for the cache of parsed inline Markdown.
+    """
+
+    def test_parse(self) -> None:
+        """
+        Tests that cached results are the same as parsing, and are reused.
+        """
+        cache: InlineCache = InlineCache(8)
+        text: str = "A **bold** [link](/to) and ![image](/of.png)"
+
+        first: tuple[FrozenTextNode, ...] = cache.parse(text)
+        second: tuple[FrozenTextNode, ...] = cache.parse(text)
+
+        self.assertEqual(list(first), text_to_textnodes(text))
+        self.assertIs(first, second)
+        self.assertTrue(all(isinstance(node, FrozenTextNode) for node in first))
+        self.assertEqual(cache.parse(""), ())
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2, "evictions": 0, "entries": 2, "max_entries": 8})
+
+    def test_immutable(self) -> None:
+        """
+        Tests that callers cannot change cached results.
+        """
+        cache: InlineCache = InlineCache()
+        nodes: tuple[FrozenTextNode, ...] = cache.parse("Some `code`")
+
+        with self.assertRaises(AttributeError):
+            nodes[0].text = "Changed"
+        with self.assertRaises(AttributeError):
+            del nodes[1].url
+        self.assertEqual(cache.parse("Some `code`")[0].text, "Some ")
+
+    def test_errors(self) -> None:
+        """
+        Tests that invalid Markdown is not cached.
+        """
+        cache: InlineCache = InlineCache()
+
+        self.assertRaises(ValueError, cache.parse, "Not **closed")
+        self.assertRaises(ValueError, cache.parse, "Not **closed")
+        self.assertEqual(cache.stats()["entries"], 0)
+        self.assertRaises(ValueError, InlineCache, 0)
+
+    def test_capacity(self) -> None:
+        """
+        Tests that the least recently used fragments are evicted, including
+        when the capacity shrinks.
+        """
+        cache: InlineCache = InlineCache(3)
+        for text in ("a", "b", "c", "a", "d"):
+            cache.parse(text)
+
+        self.assertEqual(cache.stats()["evictions"], 1)
+        cache.parse("a")
+        self.assertEqual(cache.hits, 2)
+
+        cache.max_entries = 1
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 4, "evictions": 3, "entries": 1, "max_entries": 1})
+        with self.assertRaises(ValueError):
+            cache.max_entries = 0
+
+        cache.clear()
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 0, "evictions": 0, "entries": 0, "max_entries": 1})
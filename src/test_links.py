@@ -0,0 +1,79 @@
+import unittest
+from blocks import markdown_to_html_node
+from links import check_links, extract_links, find_broken_links, link_candidates, record_links, resolve_link
+from manifest import BuildManifest
+
+class TestLinks(unittest.TestCase):
+    """
+    Unit tests for the link index and the check for broken links.
+    """
+
+    def test_extract_links(self) -> None:
+        """
+        Tests that links and images are collected from every block in order.
+        """
+        node = markdown_to_html_node(
+            "# [Home](/)\n\n![logo](img/logo.png) and [about](about#team)\n\n- [a](a.html)\n\n> [quote](q)"
+        )
+
+        self.assertEqual(extract_links(node), [
+            ["link", "/"], ["image", "img/logo.png"], ["link", "about#team"], ["link", "a.html"], ["link", "q"]
+        ])
+
+    def test_resolve_link(self) -> None:
+        """
+        Tests that internal links are resolved against the page they are on,
+        and that external links and anchors are ignored.
+        """
+        self.assertEqual(resolve_link("/docs/", "blog/post.html"), "docs/")
+        self.assertEqual(resolve_link("/", "blog/post.html"), "")
+        self.assertEqual(resolve_link("../img/a%20b.png?v=2", "blog/post.html"), "img/a b.png")
+        self.assertEqual(resolve_link("other#top", "blog/post.html"), "blog/other")
+        self.assertEqual(resolve_link("./", "blog/post.html"), "blog/")
+        self.assertEqual(resolve_link("../../x.html", "blog/post.html"), "../x.html")
+        for url in ["https://example.com", "mailto:a@b.c", "//cdn.example.com/a.js", "#top", ""]:
+            with self.subTest(url=url):
+                self.assertIsNone(resolve_link(url, "blog/post.html"))
+
+        self.assertEqual(link_candidates(""), ("index.html",))
+        self.assertEqual(link_candidates("docs"), ("docs", "docs.html", "docs/index.html"))
+        self.assertEqual(link_candidates("a.png"), ("a.png",))
+
+    def test_find_broken_links(self) -> None:
+        """
+        Tests that links are looked up in the set of targets.
+        """
+        targets: set[str] = {"index.html", "blog/post.html", "docs/index.html", "img/logo.png"}
+        links: list[list[str]] = [
+            ["link", "/"], ["link", "post"], ["link", "/docs"], ["image", "../img/logo.png"],
+            ["image", "logo.png"], ["link", "/missing"], ["link", "https://example.com"]
+        ]
+
+        self.assertEqual(
+            find_broken_links("blog/post.html", links, targets), [["image", "logo.png"], ["link", "/missing"]]
+        )
+
+    def test_check_links(self) -> None:
+        """
+        Tests that only pages whose links changed, or that link to an added or
+        removed target, are checked again.
+        """
+        manifest: BuildManifest = BuildManifest(None)
+        for source, links in [("index.md", [["link", "/about"]]), ("blog.md", [["link", "/blog/"]])]:
+            manifest.record(source, "hash", source.replace(".md", ".html"))
+            record_links(manifest, source, links, None)
+
+        broken, checked = check_links(manifest, {"index.html", "blog.html"})
+        self.assertEqual(broken, {"index.md": [["link", "/about"]], "blog.md": [["link", "/blog/"]]})
+        self.assertEqual(checked, ["blog.md", "index.md"])
+
+        broken, checked = check_links(manifest, {"index.html", "blog.html", "about.html"})
+        self.assertEqual((broken, checked), ({"blog.md": [["link", "/blog/"]]}, ["index.md"]))
+
+        previous: dict = dict(manifest.pages["blog.md"])
+        manifest.record("blog.md", "hash2", "blog.html")
+        record_links(manifest, "blog.md", [["link", "/blog/"]], previous)
+        self.assertEqual(check_links(manifest, {"index.html", "blog.html", "about.html"})[1], [])
+
+        record_links(manifest, "index.md", [["link", "/"]], manifest.pages["index.md"])
+        self.assertEqual(check_links(manifest, {"index.html", "blog.html", "about.html"})[1], ["index.md"])
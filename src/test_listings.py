@@ -0,0 +1,68 @@
+import unittest
+from listings import absolute_url, generate_listings, listing_path, sort_posts
+
+class TestListings(unittest.TestCase):
+    """
+    Unit tests for listing pages, feeds and sitemaps.
+    """
+
+    def setUp(self) -> None:
+        self.pages: dict[str, dict] = {
+            "index.html": {"title": "Home", "date": None, "tags": []},
+            "blog/old.html": {"title": None, "date": "2023-01-02", "tags": []},
+            "blog/new.html": {"title": "New & shiny", "date": "2024-05-01", "tags": ["python", "web"]},
+            "blog/also-new.html": {"title": "Also new", "date": "2024-05-01", "tags": []},
+        }
+
+    def test_sort_posts(self) -> None:
+        """
+        Tests that only pages with a date are posts, newest first.
+        """
+        self.assertEqual(
+            [url for url, _ in sort_posts(self.pages)], ["blog/also-new.html", "blog/new.html", "blog/old.html"]
+        )
+        self.assertEqual(listing_path(1), "posts/index.html")
+        self.assertEqual(listing_path(3), "posts/3.html")
+        self.assertEqual(absolute_url("https://example.com/", "blog/index.html"), "https://example.com/blog/")
+
+    def test_listing_pages(self) -> None:
+        """
+        Tests that posts are paginated and linked to from the listing pages.
+        """
+        files: dict[str, str] = generate_listings(self.pages, "<title>{{ Title }}</title>{{ Content }}", per_page=2)
+
+        self.assertEqual(sorted(files), ["posts/2.html", "posts/index.html"])
+        self.assertEqual(
+            files["posts/index.html"],
+            '<title>Posts</title><div><h1>Posts</h1><ul><li><a href="../blog/also-new.html">Also new</a> '
+            '<time datetime="2024-05-01">2024-05-01</time></li><li><a href="../blog/new.html">New &amp; shiny</a> '
+            '<time datetime="2024-05-01">2024-05-01</time> <span class="tags">python, web</span></li></ul>'
+            '<nav><a href="2.html">Older posts</a></nav></div>'
+        )
+        self.assertIn('<a href="../blog/old.html">old</a>', files["posts/2.html"])
+        self.assertIn('<a href="index.html">Newer posts</a>', files["posts/2.html"])
+        self.assertEqual(list(generate_listings({}, "{{ Content }}")), ["posts/index.html"])
+        self.assertRaises(ValueError, generate_listings, self.pages, "", per_page=0)
+        colliding: dict[str, dict] = {**self.pages, "posts/2.html": self.pages["index.html"]}
+        self.assertRaisesRegex(ValueError, "posts/2.html", generate_listings, colliding, "", per_page=2)
+        self.assertEqual(sorted(generate_listings(self.pages, "", listing_dir="blog/all")), ["blog/all/index.html"])
+
+    def test_feed_and_sitemap(self) -> None:
+        """
+        Tests that the feed and sitemap are written with absolute URLs when
+        the URL of the site is known.
+        """
+        files: dict[str, str] = generate_listings(self.pages, "{{ Content }}", "https://example.com")
+
+        self.assertIn(
+            "<item><title>New &amp; shiny</title><link>https://example.com/blog/new.html</link>"
+            '<guid isPermaLink="true">https://example.com/blog/new.html</guid>'
+            "<pubDate>Wed, 01 May 2024 00:00:00 +0000</pubDate><category>python</category><category>web</category>"
+            "</item>",
+            files["feed.xml"]
+        )
+        self.assertIn("<url><loc>https://example.com/</loc></url>", files["sitemap.xml"])
+        self.assertIn("<url><loc>https://example.com/posts/</loc></url>", files["sitemap.xml"])
+        self.assertIn(
+            "<url><loc>https://example.com/blog/old.html</loc><lastmod>2023-01-02</lastmod></url>", files["sitemap.xml"]
+        )
@@ -1,10 +1,15 @@
 """
 This module is a test suite for Markdown parsing functions.
 """
+import random
 import unittest
 from typing import Tuple
 from textnode import TextNode, TextType
-from markdown import split_node_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_images, split_nodes_link
+from markdown import (
+    INLINE_DELIMITERS, split_node_delimiter, extract_markdown_images, extract_markdown_links,
+    split_nodes_images, split_nodes_link, split_nodes_images_and_links, text_to_textnodes,
+    extract_markdown_image_spans, extract_markdown_link_spans, _IMAGE_PATTERN, _LINK_PATTERN
+)
 
 class TestMarkdownParsing(unittest.TestCase):
     """
@@ -112,6 +117,48 @@ class TestMarkdownParsing(unittest.TestCase):
             [("to boot dev", "https://www.boot.dev"), ("to youtube", "https://www.youtube.com/@bootdotdev")]
         )
         
+    def test_markdown_spans(self) -> None:
+        """
+        Tests that image and link spans point at their position in the raw
+        Markdown.
+        """
+        normal_md: str = "An ![image](www.image.com) and a [link](www.link.com)."
+
+        self.assertEqual(extract_markdown_image_spans(""), [])
+        self.assertEqual(extract_markdown_link_spans("No links here"), [])
+        self.assertEqual(extract_markdown_image_spans(normal_md), [(3, 26, "image", "www.image.com")])
+        self.assertEqual(extract_markdown_link_spans(normal_md), [(33, 53, "link", "www.link.com")])
+        self.assertEqual(normal_md[33:53], "[link](www.link.com)")
+
+    def test_scanner_matches_patterns(self) -> None:
+        """
+        Tests that images and links are found exactly where the regular
+        expressions of their syntax match, including in malformed Markdown.
+        """
+        generator: random.Random = random.Random(16)
+        texts: list[str] = ["![a](b)[c](d)", "!![a](b)", "[a]![b](c)", "[a](b(c)d)", "[[a](b)]", "x](y)[z"]
+        texts.extend("".join(generator.choice("![]()ab ") for _ in range(generator.randint(0, 16))) for _ in range(2000))
+
+        for text in texts:
+            images: list[tuple[int, int, str, str]] = [(m.start(), m.end(), *m.groups()) for m in _IMAGE_PATTERN.finditer(text)]
+            links: list[tuple[int, int, str, str]] = [(m.start(), m.end(), *m.groups()) for m in _LINK_PATTERN.finditer(text)]
+
+            self.assertEqual(extract_markdown_image_spans(text), images, text)
+            self.assertEqual(extract_markdown_link_spans(text), links, text)
+            self.assertEqual(extract_markdown_images(text), _IMAGE_PATTERN.findall(text), text)
+            self.assertEqual(extract_markdown_links(text), _LINK_PATTERN.findall(text), text)
+
+    def test_adversarial_links(self) -> None:
+        """
+        Tests that long runs of unmatched brackets and parentheses are left as
+        text.
+        """
+        for text in ("[" * 10000, "[a](" * 10000, "](" * 10000, "[a]" * 10000, "[a](b(" * 10000 + ")"):
+            self.assertEqual(extract_markdown_links(text), [])
+            self.assertEqual(text_to_textnodes(text), [TextNode(text, TextType.TEXT)])
+
+        self.assertEqual(extract_markdown_links("[" * 10000 + "[a](b)"), [("a", "b")])
+
     def test_split_images(self) -> None:
         """
         Tests to see if parsing TextNodes for images is a successful operation.
@@ -259,3 +306,121 @@ class TestMarkdownParsing(unittest.TestCase):
                 TextNode("link_end", TextType.LINK, "www.link-end.com")
             ]
         )
+
+    def test_split_repeated_links(self) -> None:
+        """
+        Tests that the same link or image text appearing more than once is
+        split at the position it was found at.
+        """
+        image_then_link: list[TextNode] = split_nodes_link(
+            [TextNode("![same](www.link.com) and [same](www.link.com)", TextType.TEXT)]
+        )
+        repeated_image: list[TextNode] = split_nodes_images(
+            [TextNode("![a](b) then ![a](b) again", TextType.TEXT)]
+        )
+
+        self.assertEqual(
+            image_then_link,
+            [
+                TextNode("![same](www.link.com) and ", TextType.TEXT),
+                TextNode("same", TextType.LINK, "www.link.com")
+            ]
+        )
+        self.assertEqual(
+            repeated_image,
+            [
+                TextNode("a", TextType.IMAGE, "b"),
+                TextNode(" then ", TextType.TEXT),
+                TextNode("a", TextType.IMAGE, "b"),
+                TextNode(" again", TextType.TEXT)
+            ]
+        )
+
+    def test_split_images_and_links(self) -> None:
+        """
+        Tests that the combined scan matches splitting images and then links.
+        """
+        nodes: list[TextNode] = [
+            TextNode("![image](www.image.com) next to a [link](www.link.com)!", TextType.TEXT),
+            TextNode("[not parsed](www.link.com)", TextType.BOLD),
+            TextNode("Nothing to split", TextType.TEXT),
+            TextNode("[link](www.link.com)![image](www.image.com)", TextType.TEXT),
+        ]
+
+        self.assertEqual(split_nodes_images_and_links(None), [])
+        self.assertEqual(split_nodes_images_and_links([]), [])
+        self.assertEqual(split_nodes_images_and_links(nodes), split_nodes_link(split_nodes_images(nodes)))
+
+    def test_image_inside_link_url(self) -> None:
+        """
+        Tests that an image found in the URL of a link wins over the link, as
+        images are split before links.
+        """
+        text: str = "[l](u![alt)](img)"
+
+        self.assertEqual(
+            text_to_textnodes(text), [TextNode("[l](u", TextType.TEXT), TextNode("alt)", TextType.IMAGE, "img")]
+        )
+        self.assertEqual(
+            split_nodes_images_and_links([TextNode(text, TextType.TEXT)]),
+            split_nodes_link(split_nodes_images([TextNode(text, TextType.TEXT)]))
+        )
+
+    def test_text_to_textnodes(self) -> None:
+        """
+        Tests that the single pass inline parser matches chaining the
+        individual splitting functions.
+        """
+        def chained_split(text: str) -> list[TextNode]:
+            nodes: list[TextNode] = [TextNode(text, TextType.TEXT)]
+            for delimiter, text_type in INLINE_DELIMITERS:
+                nodes = split_node_delimiter(nodes, delimiter, text_type)
+            return split_nodes_link(split_nodes_images(nodes))
+
+        normal_md: str = (
+            "This is **text** with an *italic* word and a `code block` and an "
+            "![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)"
+        )
+        cases: list[str] = [
+            "",
+            "Plain text only",
+            normal_md,
+            "**bold** at the start and *italic* at the end*",
+            "***",
+            "****empty bold",
+            "`code with **stars** inside`",
+            "*[link in italics](www.link.com)*",
+            "![image](www.image.com)[link](www.link.com)![image](www.image.com)",
+            "a [link](www.link.com) and the same [link](www.link.com)",
+        ]
+
+        self.assertEqual(text_to_textnodes(None), [])
+        self.assertEqual(text_to_textnodes(""), [])
+        self.assertEqual(
+            text_to_textnodes(normal_md),
+            [
+                TextNode("This is ", TextType.TEXT),
+                TextNode("text", TextType.BOLD),
+                TextNode(" with an ", TextType.TEXT),
+                TextNode("italic", TextType.ITALIC),
+                TextNode(" word and a ", TextType.TEXT),
+                TextNode("code block", TextType.CODE),
+                TextNode(" and an ", TextType.TEXT),
+                TextNode("obi wan image", TextType.IMAGE, "https://i.imgur.com/fJRm4Vk.jpeg"),
+                TextNode(" and a ", TextType.TEXT),
+                TextNode("link", TextType.LINK, "https://boot.dev"),
+            ]
+        )
+
+        for case in cases:
+            try:
+                expected: list[TextNode] = chained_split(case)
+            except ValueError:
+                self.assertRaises(ValueError, text_to_textnodes, case)
+                continue
+
+            self.assertEqual(text_to_textnodes(case), expected)
+
+        with self.assertRaises(ValueError) as e_unclosed:
+            text_to_textnodes("An **unclosed delimiter")
+        self.assertEqual(str(e_unclosed.exception), "Invalid markdown: '**' is unclosed.")
@@ -0,0 +1,126 @@
+import gzip
+import os
+import tempfile
+import unittest
+from output import OutputWriter, compression_report, page_class
+
+class TestOutputWriter(unittest.TestCase):
+    """
+    Unit tests for the writer of output files.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.writer: OutputWriter = OutputWriter(self.directory.name)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def path(self, relative_path: str) -> str:
+        return os.path.join(self.directory.name, relative_path)
+
+    def test_write(self) -> None:
+        """
+        Tests that files are only written when their bytes change, and that no
+        temporary files are left behind.
+        """
+        self.assertTrue(self.writer.write("blog/post.html", "<p>Café</p>"))
+        os.utime(self.path("blog/post.html"), ns=(0, 0))
+
+        self.assertFalse(self.writer.write("blog/post.html", "<p>Café</p>".encode("utf-8")))
+        self.assertEqual(os.stat(self.path("blog/post.html")).st_mtime_ns, 0)
+
+        self.assertTrue(self.writer.write("blog/post.html", "<p>Cafe</p>"))
+        self.assertTrue(self.writer.write("blog/post.html", "<p>Tea</p>"))
+        with open(self.path("blog/post.html"), encoding="utf-8") as file:
+            self.assertEqual(file.read(), "<p>Tea</p>")
+
+        self.assertEqual(os.listdir(self.path("blog")), ["post.html"])
+        self.assertEqual(self.writer.written, ["blog/post.html"] * 3)
+        self.assertEqual(self.writer.unchanged, ["blog/post.html"])
+
+    def test_remove(self) -> None:
+        """
+        Tests that stale files are removed and counted once.
+        """
+        self.writer.prepare(["index.html", "a/b/c.html", "a/d.html"])
+        self.writer.write("index.html", "<p>Home</p>")
+
+        self.assertTrue(os.path.isdir(self.path("a/b")))
+        self.assertTrue(self.writer.remove("index.html"))
+        self.assertFalse(self.writer.remove("index.html"))
+        self.assertFalse(os.path.exists(self.path("index.html")))
+        self.assertEqual(self.writer.stats(), {"written": 1, "unchanged": 0, "removed": 1})
+
+    def test_compression(self) -> None:
+        """
+        Tests that compressed copies are written with their files, in threads
+        or not, are only compressed again when their file changed, and are
+        removed with their files.
+        """
+        threaded: OutputWriter = OutputWriter(self.directory.name, 9, compress_threads=2)
+        threaded.write("blog/post.html", "<p>Post</p>" * 100)
+        threaded.write("index.html", "<p>Home</p>")
+        threaded.close()
+
+        with gzip.open(self.path("blog/post.html.gz"), "rb") as file:
+            self.assertEqual(file.read(), ("<p>Post</p>" * 100).encode("utf-8"))
+        self.assertEqual(sorted(threaded.compression), [".", "blog"])
+        self.assertEqual(threaded.compression["blog"][:2], [1, 1100])
+        report = compression_report(threaded.compression)
+        self.assertLess(report["blog"]["ratio"], 0.1)
+        self.assertEqual(report["."]["pages"], 1)
+
+        writer: OutputWriter = OutputWriter(self.directory.name, 9)
+        writer.write("blog/post.html", "<p>Post</p>" * 100)
+        self.assertEqual(writer.take_compression(), {})
+        os.remove(self.path("index.html.gz"))
+        writer.write("index.html", "<p>Home</p>")
+        self.assertEqual(list(writer.take_compression()), ["."])
+
+        self.writer.write("index.html", "<p>Changed</p>")
+        self.assertFalse(os.path.exists(self.path("index.html.gz")))
+        self.assertFalse(self.writer.write("blog/post.html", "<p>Post</p>" * 100))
+        self.assertFalse(os.path.exists(self.path("blog/post.html.gz")))
+        writer.write("feed.xml", "<rss></rss>", compress=False)
+        self.assertFalse(os.path.exists(self.path("feed.xml.gz")))
+        self.writer.remove("blog/post.html")
+        self.assertEqual(os.listdir(self.path("blog")), [])
+        self.assertRaises(ValueError, OutputWriter, self.directory.name, 10)
+
+    def test_open(self) -> None:
+        """
+        Tests that streamed files are only replaced when their bytes change,
+        are compressed like written files, and are left as they were when
+        streaming fails.
+        """
+        writer: OutputWriter = OutputWriter(self.directory.name, 6)
+        writer.write("index.html", "<p>Home</p>" * 100)
+        with open(self.path("index.html.gz"), "rb") as file:
+            compressed: bytes = file.read()
+        os.remove(self.path("index.html.gz"))
+
+        with writer.open("index.html") as file:
+            file.write("<p>Home</p>" * 100)
+        with open(self.path("index.html.gz"), "rb") as file:
+            self.assertEqual(file.read(), compressed)
+
+        with writer.open("blog/post.html") as file:
+            file.write("<p>Café</p>\r\n")
+        with self.assertRaises(KeyError):
+            with writer.open("blog/post.html") as file:
+                file.write("<p>Partial")
+                raise KeyError
+        with open(self.path("blog/post.html"), "rb") as file:
+            self.assertEqual(file.read(), "<p>Café</p>\r\n".encode("utf-8"))
+
+        self.assertEqual(sorted(os.listdir(self.path("blog"))), ["post.html", "post.html.gz"])
+        self.assertEqual(writer.written, ["index.html", "blog/post.html"])
+        self.assertEqual(writer.unchanged, ["index.html"])
+
+    def test_page_class(self) -> None:
+        """
+        Tests that pages are classed by their top-level directory.
+        """
+        self.assertEqual(page_class("index.html"), ".")
+        self.assertEqual(page_class("blog/2024/post.html"), "blog")
@@ -0,0 +1,115 @@
+import io
+import unittest
+import os
+import tempfile
+from links import extract_links
+from page import extract_title, markdown_to_html_node, read_title, render_page, render_page_to, stream_page
+from search import extract_terms
+
+class TestPage(unittest.TestCase):
+    """
+    Unit tests for rendering Markdown documents into pages.
+    """
+
+    def test_markdown_to_html_node(self) -> None:
+        """
+        Tests that headings and paragraphs are converted into HTML elements.
+        """
+        markdown: str = "# Title\n\nThis is **bold**\ntext.\n\n\n\n## A *small* heading\n\n#hashtag"
+
+        self.assertEqual(markdown_to_html_node("").children, [])
+        self.assertEqual(
+            markdown_to_html_node(markdown).to_html(),
+            "<div><h1>Title</h1><p>This is <b>bold</b> text.</p><h2>A <i>small</i> heading</h2><p>#hashtag</p></div>"
+        )
+
+    def test_extract_title(self) -> None:
+        """
+        Tests that the first level one heading is used as the title.
+        """
+        self.assertIsNone(extract_title("No title\n\n## Not a title"))
+        self.assertEqual(extract_title("Intro\n\n# The Title  \n\n# Another"), "The Title")
+
+    def test_render_page(self) -> None:
+        """
+        Tests that the title and content are placed into the template.
+        """
+        template: str = "<title>{{ Title }}</title><main>{{ Content }}</main>"
+
+        self.assertEqual(
+            render_page("# Hello\n\nWorld", template),
+            "<title>Hello</title><main><div><h1>Hello</h1><p>World</p></div></main>"
+        )
+        self.assertEqual(render_page("", template, "index"), "<title>index</title><main></main>")
+        self.assertEqual(
+            render_page("---\ntitle: Front\n---\n# Hello", template),
+            "<title>Front</title><main><div><h1>Hello</h1></div></main>"
+        )
+
+    def test_render_page_to(self) -> None:
+        """
+        Tests that streaming a page writes the same HTML as rendering it.
+        """
+        markdown: str = "# Hello\n\nWorld\n"
+
+        for template in ("<title>{{ Title }}</title>{{ Content }}!", "{{ Content }}|{{ Content }}", "No content"):
+            writer: io.StringIO = io.StringIO()
+            render_page_to(io.StringIO(markdown), template, writer, extract_title(io.StringIO(markdown)))
+
+            self.assertEqual(writer.getvalue(), render_page(markdown, template))
+
+        writer = io.StringIO()
+        render_page_to(io.StringIO(f"---\ntitle: Hello\n---\n{markdown}"), "{{ Content }}", writer, "Hello")
+        self.assertEqual(writer.getvalue(), render_page(markdown, "{{ Content }}"))
+
+    def test_stream_page(self) -> None:
+        """
+        Tests that streaming a file collects the same links and terms as
+        rendering its document, and writes the same HTML.
+        """
+        markdown: str = "---\ntitle: Front\n---\n# Hello [home](/)\n\nWorld, hello ![logo](logo.png)\n"
+        node = markdown_to_html_node(markdown.split("---\n", 2)[2])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path: str = os.path.join(directory, "page.md")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(markdown)
+
+            for template in ("<title>{{ Title }}</title>{{ Content }}", "No content"):
+                writer: io.StringIO = io.StringIO()
+                links: list = []
+                terms: dict[str, list[int]] = {}
+                stream_page(path, template, writer, "page", links=links, terms=terms)
+
+                self.assertEqual(writer.getvalue(), render_page(markdown, template, "page"))
+                self.assertEqual(links, extract_links(node))
+                self.assertEqual(terms, extract_terms(node))
+
+            self.assertEqual(read_title(path), "Front")
+
+    def test_stream_page_titles(self) -> None:
+        """
+        Tests that streaming a file finds the same title as rendering its
+        document, wherever its first heading is, and returns it.
+        """
+        documents: dict[str, str | None] = {
+            "# Top\n\nText": "Top",
+            "Intro\n\n# Later\n\nText": "Later",
+            "---\ntitle: ''\n---\n---\n\n# Heading": "Heading",
+            "No heading\n\n- at all": None,
+            "Long\n\n" * 12000 + "# Far": "Far",
+            "Long\n\n" * 12000: None,
+        }
+
+        template: str = "<title>{{ Title }}</title>{{ Content }}"
+
+        with tempfile.TemporaryDirectory() as directory:
+            path: str = os.path.join(directory, "page.md")
+            for markdown, title in documents.items():
+                with self.subTest(markdown=markdown[:20]):
+                    with open(path, "w", encoding="utf-8") as file:
+                        file.write(markdown)
+                    writer: io.StringIO = io.StringIO()
+
+                    self.assertEqual(stream_page(path, template, writer, "page"), title or "page")
+                    self.assertEqual(writer.getvalue(), render_page(markdown, template, "page"))
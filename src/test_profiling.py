@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import unittest
+from build import build_site, write_page
+from profiling import BuildProfile, get_profile, profiling
+
+class TestProfiling(unittest.TestCase):
+    """
+    Unit tests for the instrumentation of the build pipeline.
+    """
+
+    def test_stages(self) -> None:
+        """
+        Tests that nested stages are timed, with the time of each stack of
+        stages excluding the stages nested in it.
+        """
+        profile: BuildProfile = BuildProfile()
+        profile.start("page")
+        profile.start("parse")
+        parse: float = profile.stop()
+        profile.start("parse")
+        profile.stop()
+        page: float = profile.stop()
+        profile.count("blocks", 3)
+        profile.count("blocks")
+
+        self.assertEqual(profile.stages["parse"][1], 2)
+        self.assertEqual(profile.stages["page"], [page, 1])
+        self.assertGreaterEqual(page, parse)
+        self.assertAlmostEqual(sum(profile.as_dict()["stacks"].values()), page)
+        self.assertEqual([line.split(" ")[0] for line in profile.folded().splitlines()], ["page", "page;parse"])
+        self.assertEqual(profile.counters, {"blocks": 4})
+        self.assertRaises(IndexError, profile.stop)
+
+    def test_pages(self) -> None:
+        """
+        Tests that only the slowest pages are kept, and that profiles survive
+        being merged and converted to and from dicts.
+        """
+        profile: BuildProfile = BuildProfile(2)
+        for index, seconds in enumerate([0.3, 0.1, 0.5, 0.2]):
+            profile.record_page(f"page{index}.md", seconds, 10, 20)
+
+        merged: BuildProfile = BuildProfile(2)
+        merged.merge(BuildProfile.from_dict(json.loads(json.dumps(profile.as_dict()))))
+        merged.record_page("slow.md", 1.0, 1, 2)
+
+        self.assertEqual(profile.slowest_pages(), [("page2.md", 0.5), ("page0.md", 0.3)])
+        self.assertEqual((profile.counters["pages"], profile.bytes_in, profile.bytes_out), (4, 40, 80))
+        self.assertEqual(merged.slowest_pages(), [("slow.md", 1.0), ("page2.md", 0.5)])
+        self.assertEqual((merged.counters["pages"], merged.bytes_in), (5, 41))
+
+    def test_failed_page(self) -> None:
+        """
+        Tests that a page that fails to build closes the stages it opened.
+        """
+        with tempfile.TemporaryDirectory() as directory, profiling(BuildProfile()) as profile:
+            profile.start("build")
+            markdown: str = "---\ndate: soon\n---\n# Bad"
+            self.assertRaises(ValueError, write_page, directory, "bad.md", markdown, "{{ Content }}")
+            profile.stop()
+
+        self.assertEqual(profile.stages["build"][1], 1)
+        self.assertEqual((profile.stages["page"][1], profile.stages["parse"][1]), (1, 1))
+
+    def test_build(self) -> None:
+        """
+        Tests that a profiled build reports every stage, including those of
+        pages generated in worker processes, and that profiling is off by
+        default.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            source_dir: str = os.path.join(directory, "content")
+            template_path: str = os.path.join(directory, "template.html")
+            os.makedirs(source_dir)
+            for index in range(3):
+                with open(os.path.join(source_dir, f"page{index}.md"), "w", encoding="utf-8") as file:
+                    file.write(f"# Page {index}\n\nSome *text*\n\n- One\n- Two")
+            with open(template_path, "w", encoding="utf-8") as file:
+                file.write("{{ Content }}")
+
+            self.assertIsNone(get_profile())
+            serial: BuildProfile = BuildProfile()
+            build_site(source_dir, os.path.join(directory, "serial"), template_path, profile=serial)
+            with profiling(BuildProfile()) as parallel:
+                build_site(source_dir, os.path.join(directory, "parallel"), template_path, jobs=2)
+            self.assertIsNone(get_profile())
+
+            for profile in [serial, parallel]:
+                with self.subTest(serial=profile is serial):
+                    stages: set[str] = {"read", "page", "parse", "inline", "render", "inline_html", "write"}
+                    self.assertLessEqual(stages, set(profile.stages))
+                    self.assertEqual(profile.counters, {"pages": 3, "blocks": 9, "text_nodes": 15})
+                    self.assertEqual(len(profile.slowest_pages()), 3)
+                    self.assertIn("page;parse;inline ", profile.folded())
+
+            profile_path: str = os.path.join(directory, "profile.json")
+            serial.save(profile_path)
+            with open(profile_path, encoding="utf-8") as file:
+                self.assertEqual(json.load(file)["bytes_out"], serial.bytes_out)
+            self.assertRaises(ValueError, serial.save, profile_path, "svg")
@@ -0,0 +1,153 @@
+import unittest
+from htmlnode import EscapeMode, HTMLNode, LeafNode, ParentNode, escape_mode
+from rendercache import RenderCache
+
+def make_navbar() -> ParentNode:
+    """
+    Creates a new, but always identical, navigation bar.
+    """
+    return ParentNode(
+        "nav",
+        [ParentNode("ul", [ParentNode("li", [LeafNode("a", f"Page {index}", {"href": f"/{index}"})]) for index in range(3)])],
+        {"class": "top"}
+    )
+
+class TestRenderCache(unittest.TestCase):
+    """
+    Unit tests for the RenderCache.
+    """
+
+    def test_render(self) -> None:
+        """
+        Tests that the cache renders the same HTML as `to_html`, and reuses the
+        HTML of identical subtrees.
+        """
+        cache: RenderCache = RenderCache()
+        pages: list[ParentNode] = [
+            ParentNode("body", [make_navbar(), ParentNode("p", [LeafNode(None, f"Page {index}")]), make_navbar()])
+            for index in range(3)
+        ]
+
+        rendered: list[str] = [cache.render(page) for page in pages]
+
+        self.assertEqual(rendered, [page.to_html() for page in pages])
+        self.assertEqual(cache.stats(), {"hits": 5, "misses": 11, "evictions": 0, "entries": 11})
+        self.assertEqual(cache.render(LeafNode("b", "leaf")), "<b>leaf</b>")
+        self.assertRaises(ValueError, cache.render, ParentNode("div", []))
+
+    def test_structure(self) -> None:
+        """
+        Tests that subtrees that differ in any way, including after being
+        mutated, are not mixed up.
+        """
+        cache: RenderCache = RenderCache()
+        props: dict[str, str] = {"class": "a"}
+        node: ParentNode = ParentNode("div", [LeafNode("b", "text")], props)
+        similar_nodes: list[HTMLNode] = [
+            ParentNode("div", [LeafNode("i", "text")], {"class": "a"}),
+            ParentNode("div", [LeafNode("b", "text")], {"class": "b"}),
+            ParentNode("div", [LeafNode("b", "text"), LeafNode("b", "text")], {"class": "a"}),
+            ParentNode("div", [ParentNode("b", [LeafNode(None, "text")])], {"class": "a"}),
+            ParentNode("span", [LeafNode("b", "text")], {"class": "a"}),
+        ]
+
+        cache.render(node)
+        for similar_node in similar_nodes:
+            self.assertEqual(cache.render(similar_node), similar_node.to_html())
+
+        props["class"] = "changed"
+        node.children.append(LeafNode(None, "more"))
+
+        self.assertEqual(cache.render(node), node.to_html())
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(cache.render(ParentNode("div", [LeafNode(None, "x")], {"class": ["a"]})), "<div class=\"[&#x27;a&#x27;]\">x</div>")
+
+    def test_props_values(self) -> None:
+        """
+        Tests that trees are keyed by their rendered attributes, so props that
+        cannot be hashed are cached and equal values that render differently
+        are not mixed up.
+        """
+        cache: RenderCache = RenderCache(max_entries=10)
+
+        for index in range(50):
+            node: ParentNode = ParentNode("div", [ParentNode("p", [LeafNode(None, str(index))])], {"class": ["a"]})
+            self.assertEqual(cache.render(node), node.to_html())
+        self.assertEqual(cache.render(node), node.to_html())
+
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(len(cache._ids), 10)
+        self.assertEqual(cache.render(ParentNode("p", [LeafNode(None, "x")], {"x": 1})), "<p x=\"1\">x</p>")
+        self.assertEqual(cache.render(ParentNode("p", [LeafNode(None, "x")], {"x": True})), "<p x=\"True\">x</p>")
+
+    def test_deep_tree(self) -> None:
+        """
+        Tests that trees deeper than the recursion limit are keyed, rendered
+        and interned.
+        """
+        cache: RenderCache = RenderCache(max_entries=100_000)
+        node: HTMLNode = LeafNode(None, "deep")
+        for _ in range(5000):
+            node = ParentNode("div", [node])
+
+        self.assertEqual(cache.render(node), node.to_html())
+        self.assertIs(cache.intern(node), node)
+        self.assertEqual(cache.render(ParentNode("main", [node])), f"<main>{node.to_html()}</main>")
+        self.assertEqual(cache.misses, 5001)
+
+    def test_escape_mode(self) -> None:
+        """
+        Tests that HTML rendered in one escape mode is not reused in another.
+        """
+        cache: RenderCache = RenderCache()
+        node: ParentNode = cache.intern(ParentNode("p", [ParentNode("b", [LeafNode(None, "<&>")])], {"title": "'"}))
+        escaped: str = node.to_html()
+
+        with escape_mode(EscapeMode.RAW):
+            self.assertEqual(cache.render(node), "<p title=\"'\"><b><&></b></p>")
+            self.assertIs(cache.intern(node), node)
+
+        self.assertEqual(cache.render(node), escaped)
+        self.assertEqual(escaped, "<p title=\"&#x27;\"><b>&lt;&amp;&gt;</b></p>")
+
+    def test_intern(self) -> None:
+        """
+        Tests that identical subtrees are hash-consed to one canonical node,
+        which is rendered without being traversed again.
+        """
+        cache: RenderCache = RenderCache()
+        navbar: HTMLNode = cache.intern(make_navbar())
+        leaf: LeafNode = LeafNode("b", "leaf")
+
+        self.assertIs(cache.intern(make_navbar()), navbar)
+        self.assertIs(cache.intern(leaf), leaf)
+        self.assertIsNot(cache.intern(ParentNode("nav", [LeafNode(None, "other")])), navbar)
+
+        misses: int = cache.misses
+        page: ParentNode = ParentNode("body", [navbar, ParentNode("p", [LeafNode(None, "text")]), navbar])
+
+        self.assertEqual(cache.render(page), page.to_html())
+        self.assertEqual(cache.misses - misses, 2)
+
+    def test_eviction(self) -> None:
+        """
+        Tests that the cache never holds more than its bound, and can be
+        cleared.
+        """
+        cache: RenderCache = RenderCache(max_entries=2)
+
+        for index in range(5):
+            cache.render(ParentNode("p", [LeafNode(None, str(index))]))
+
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 5, "evictions": 3, "entries": 2})
+        self.assertEqual(cache.render(ParentNode("p", [LeafNode(None, "4")])), "<p>4</p>")
+        self.assertEqual(cache.hits, 1)
+
+        interned: HTMLNode = cache.intern(ParentNode("p", [LeafNode(None, "interned")]))
+        for index in range(5):
+            cache.render(ParentNode("p", [LeafNode(None, str(index))]))
+        self.assertIsNot(cache.intern(ParentNode("p", [LeafNode(None, "interned")])), interned)
+
+        cache.clear()
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 0, "evictions": 0, "entries": 0})
+        self.assertRaises(ValueError, RenderCache, 0)
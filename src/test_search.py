@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+import unittest
+from blocks import markdown_to_html_node
+from output import OutputWriter
+from search import SearchIndex, extract_terms, shard_for
+
+class TestSearch(unittest.TestCase):
+    """
+    Unit tests for the search index.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.writer: OutputWriter = OutputWriter(self.directory.name)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def read(self, path: str) -> dict:
+        with open(os.path.join(self.directory.name, "search", path), encoding="utf-8") as file:
+            return json.load(file)
+
+    def test_extract_terms(self) -> None:
+        """
+        Tests that the terms of text, bold and italic nodes are collected with
+        their positions, and that code and URLs are not.
+        """
+        node = markdown_to_html_node("# Café Search\n\nSearch **fast**, `code` and *search* [link](/url)\n\n```\nx\n```")
+
+        self.assertEqual(extract_terms(node), {"café": [0], "search": [1, 2, 5], "fast": [3], "and": [4]})
+        self.assertEqual(shard_for("search"), "se")
+        self.assertEqual(shard_for("a", 3), "a")
+
+    def test_incremental_update(self) -> None:
+        """
+        Tests that an index only rewrites the shards of changed pages, and
+        that removed pages leave their ids to new pages.
+        """
+        index: SearchIndex = SearchIndex(self.directory.name)
+        index.update("a.html", "A", {"search": [0], "index": [1]})
+        index.update("b.html", "B", {"search": [3], "page": [0]})
+        index.save(self.writer)
+
+        self.assertEqual(self.read("terms/se.json"), {"search": {"0": [0], "1": [3]}})
+        self.assertEqual(self.read("pages.json")["pages"], [["a.html", "A", ["in", "se"]], ["b.html", "B", ["pa", "se"]]])
+
+        loaded: SearchIndex = SearchIndex.load(self.directory.name)
+        loaded.update("b.html", "B", {"seen": [0]})
+        loaded.remove("a.html")
+        loaded.update("c.html", "C", {"index": [2]})
+        loaded.save(self.writer)
+
+        self.assertEqual(self.read("terms/se.json"), {"seen": {"1": [0]}})
+        self.assertEqual(self.read("terms/in.json"), {"index": {"0": [2]}})
+        self.assertFalse(os.path.exists(os.path.join(self.directory.name, "search", "terms", "pa.json")))
+        self.assertEqual(loaded.pages[0], ["c.html", "C", ["in"]])
+        self.assertEqual(loaded.stats(), {"pages": 2, "shards_written": 2})
+        self.assertFalse(SearchIndex.load(self.directory.name, 3).has("c.html"))
+
+    def test_new_index(self) -> None:
+        """
+        Tests that a new index removes the shards left by an earlier index.
+        """
+        index: SearchIndex = SearchIndex(self.directory.name)
+        index.update("a.html", "A", {"old": [0]})
+        index.save(self.writer)
+
+        rebuilt: SearchIndex = SearchIndex(self.directory.name)
+        rebuilt.update("a.html", "A", {"new": [0]})
+        rebuilt.save(self.writer)
+
+        self.assertEqual(os.listdir(os.path.join(self.directory.name, "search", "terms")), ["ne.json"])
+        self.assertRaises(ValueError, SearchIndex, self.directory.name, 0)
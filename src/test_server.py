@@ -0,0 +1,116 @@
+import os
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from server import LIVE_RELOAD_SCRIPT, DevServer, DirectoryWatcher, inject_live_reload
+
+class TestServer(unittest.TestCase):
+    """
+    Unit tests for the development server.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a site with a template, a page and a static file in a temporary
+        directory.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.source_dir: str = os.path.join(self.directory.name, "content")
+        self.output_dir: str = os.path.join(self.directory.name, "public")
+        self.static_dir: str = os.path.join(self.directory.name, "static")
+        self.template_path: str = os.path.join(self.directory.name, "template.html")
+
+        self.write(self.template_path, "<body>{{ Content }}</body>")
+        self.write(os.path.join(self.source_dir, "index.md"), "Home")
+        self.write(os.path.join(self.source_dir, "about.md"), "About")
+        self.write(os.path.join(self.static_dir, "style.css"), "body {}")
+
+        self.server: DevServer = DevServer(
+            self.source_dir, self.output_dir, self.template_path, static_dir=self.static_dir,
+            manifest_path=os.path.join(self.directory.name, ".cache", "manifest.json")
+        )
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write(self, path: str, text: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def test_watcher(self) -> None:
+        """
+        Tests that created, modified and deleted files are reported once.
+        """
+        watcher: DirectoryWatcher = DirectoryWatcher([self.source_dir, self.template_path])
+        index: str = os.path.join(self.source_dir, "index.md")
+        new_page: str = os.path.join(self.source_dir, "blog", "new.md")
+
+        self.write(index, "Home page")
+        self.write(new_page, "New")
+        os.remove(os.path.join(self.source_dir, "about.md"))
+
+        self.assertEqual(watcher.poll(), sorted([index, new_page, os.path.join(self.source_dir, "about.md")]))
+        self.assertEqual(watcher.poll(), [])
+
+    def test_rebuild(self) -> None:
+        """
+        Tests that a rebuild only regenerates the outputs of changed files.
+        """
+        self.assertEqual(self.server.build().built, ["about.md", "index.md"])
+
+        index: str = os.path.join(self.source_dir, "index.md")
+        self.write(index, "Home **page**")
+        self.write(os.path.join(self.static_dir, "style.css"), "body { margin: 0 }")
+        os.remove(os.path.join(self.source_dir, "about.md"))
+
+        report = self.server.rebuild([
+            os.path.join(self.source_dir, "about.md"), index, os.path.join(self.static_dir, "style.css")
+        ])
+
+        self.assertEqual(report.built, ["index.md"])
+        self.assertEqual(report.removed, ["about.html"])
+        self.assertEqual(report.copied, ["style.css"])
+        with open(os.path.join(self.output_dir, "index.html"), encoding="utf-8") as file:
+            self.assertEqual(file.read(), "<body><div><p>Home <b>page</b></p></div></body>")
+
+        self.write(self.template_path, "<main>{{ Content }}</main>")
+        self.assertEqual(self.server.rebuild([os.path.normpath(self.template_path)]).built, ["index.md"])
+
+    def test_http(self) -> None:
+        """
+        Tests that pages are served with validators and the live reload script,
+        and that the live reload endpoint reports new builds.
+        """
+        self.server.build()
+        http_server = self.server.make_server("127.0.0.1", 0)
+        threading.Thread(target=http_server.serve_forever, daemon=True).start()
+        url: str = f"http://127.0.0.1:{http_server.server_address[1]}"
+
+        try:
+            with urllib.request.urlopen(f"{url}/") as response:
+                body: bytes = response.read()
+                etag: str = response.headers["ETag"]
+                last_modified: str = response.headers["Last-Modified"]
+
+            for header, value in [("If-None-Match", etag), ("If-Modified-Since", last_modified)]:
+                with self.assertRaises(urllib.error.HTTPError) as not_modified:
+                    urllib.request.urlopen(urllib.request.Request(f"{url}/index.html", headers={header: value}))
+                self.assertEqual(not_modified.exception.code, 304)
+
+            with urllib.request.urlopen(f"{url}/style.css") as response:
+                css: bytes = response.read()
+
+            self.server.generation.advance()
+            with urllib.request.urlopen(f"{url}/__livereload?since=0") as response:
+                generation: bytes = response.read()
+        finally:
+            http_server.shutdown()
+            http_server.server_close()
+
+        self.assertEqual(body, b"<body><div><p>Home</p></div>" + LIVE_RELOAD_SCRIPT + b"</body>")
+        self.assertEqual(css, b"body {}")
+        self.assertEqual(generation, b"1")
+        self.assertEqual(inject_live_reload(b"<p>No body</p>"), b"<p>No body</p>" + LIVE_RELOAD_SCRIPT)
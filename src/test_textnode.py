@@ -1,6 +1,6 @@
 import unittest
 from htmlnode import LeafNode
-from textnode import TextNode, TextType, text_node_to_html_node
+from textnode import FrozenTextNode, InlineNode, TextNode, TextType, text_node_to_html_node, text_nodes_to_html
 
 class TestTextNode(unittest.TestCase):
     """
@@ -25,6 +25,31 @@ class TestTextNode(unittest.TestCase):
         self.assertNotEqual(control_node, diff_url)
         self.assertNotEqual(control_node, no_url)
         
+    def test_compact_layout(self) -> None:
+        """
+        Tests that TextNodes do not carry a per-instance `__dict__`.
+        """
+        node: TextNode = TextNode("test string", TextType.LINK, "www.google.com")
+
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertRaises(AttributeError, setattr, node, "alt", "text")
+        self.assertEqual(repr(node), "TextNode(test string, link, www.google.com)")
+
+    def test_frozen(self) -> None:
+        """
+        Tests that FrozenTextNodes equal TextNodes but cannot be changed.
+        """
+        node: TextNode = TextNode("test string", TextType.LINK, "www.google.com")
+        frozen: FrozenTextNode = FrozenTextNode.freeze(node)
+
+        self.assertEqual(frozen, node)
+        self.assertIs(FrozenTextNode.freeze(frozen), frozen)
+        self.assertEqual(hash(frozen), hash(FrozenTextNode("test string", TextType.LINK, "www.google.com")))
+        self.assertFalse(hasattr(frozen, "__dict__"))
+        self.assertRaises(AttributeError, setattr, frozen, "text", "changed")
+        self.assertRaises(AttributeError, delattr, frozen, "url")
+        self.assertEqual(text_node_to_html_node(frozen).to_html(), text_node_to_html_node(node).to_html())
+
     def test_text_to_html(self) -> None:
         """
         Tests to see if TextNodes convert correctly to LeafNodes.
@@ -62,3 +87,35 @@ class TestTextNode(unittest.TestCase):
             repr(text_node_to_html_node(image)),
             "LeafNode(img, , {'src': 'www.image.com', 'alt': 'this is an image'})"
         )
+
+    def test_text_nodes_to_html(self) -> None:
+        """
+        Tests that rendering TextNodes in a batch matches rendering their
+        LeafNodes.
+        """
+        nodes: list[TextNode] = [
+            TextNode("plain ", TextType.TEXT),
+            TextNode("bold", TextType.BOLD),
+            TextNode("italic", TextType.ITALIC),
+            TextNode("code", TextType.CODE),
+            TextNode("link", TextType.LINK, "www.google.com"),
+            TextNode("image", TextType.IMAGE, "www.image.com"),
+            TextNode(None, TextType.IMAGE),
+        ]
+
+        self.assertEqual(text_nodes_to_html(nodes), "".join(text_node_to_html_node(node).to_html() for node in nodes))
+        self.assertEqual(text_nodes_to_html([]), "")
+        self.assertRaises(ValueError, text_nodes_to_html, [TextNode("This should not work", "fake")])
+        self.assertRaises(ValueError, text_nodes_to_html, [TextNode(None, TextType.BOLD)])
+
+    def test_inline_node(self) -> None:
+        """
+        Tests that an InlineNode renders the same as a ParentNode of LeafNodes.
+        """
+        nodes: list[TextNode] = [TextNode("A ", TextType.TEXT), TextNode("link", TextType.LINK, "/to")]
+        node: InlineNode = InlineNode("p", nodes, {"class": "intro"})
+
+        self.assertEqual(node.to_html(), '<p class="intro">A <a href="/to">link</a></p>')
+        self.assertEqual("".join(node.iter_html()), node.to_html())
+        self.assertEqual(InlineNode("li", []).to_html(), "<li></li>")
+        self.assertEqual(repr(InlineNode("b", nodes[:1])), "InlineNode(b, [TextNode(A , text, None)], None)")
@@ -4,13 +4,18 @@ This modules contains classes that represent inline Markdown elements.
 The TextType class is an Enum that stores the different Markdown formatting
 styles/inline elements.
 
-TextNode is a class that holds information about a chunk of Markdown.
+TextNode is a class that holds information about a chunk of Markdown, and
+FrozenTextNode is an immutable TextNode that can be shared between documents.
 
 In addition, there is a function to convert a TextNode to a LeafNode called
-`text_node_to_html_node`.
+`text_node_to_html_node`. Runs of TextNodes can also be rendered straight to
+HTML with `text_nodes_to_html`, or held by an InlineNode element, without
+creating a LeafNode for every TextNode.
 """
 from enum import Enum
-from htmlnode import LeafNode
+from typing import Callable, Iterable, Iterator
+from htmlnode import LeafNode, escape_value
+from profiling import BuildProfile, get_profile
 
 class TextType(Enum):
     """
@@ -29,6 +34,8 @@ class TextNode:
     Holds information about a block of text within a Markdown document.
     """
 
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text: str, text_type: TextType, url: str = None) -> None:
         """
         Instantiates a TextNode object.
@@ -57,6 +64,62 @@ class TextNode:
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
 
 
+class FrozenTextNode(TextNode):
+    """
+    A TextNode that cannot be changed once it is created, so it can be shared
+    by every document that contains the same text, such as by a cache.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, text: str, text_type: TextType, url: str = None) -> None:
+        """
+        Instantiates a FrozenTextNode object.
+
+        :param text: The text content of the node.
+        :param text_type: The formatting style of the text.
+        :param url: The URL of a link or image. By default, it is set to None.
+        """
+        object.__setattr__(self, "text", text)
+        object.__setattr__(self, "text_type", text_type)
+        object.__setattr__(self, "url", url)
+
+    @classmethod
+    def freeze(cls, node: TextNode) -> "FrozenTextNode":
+        """
+        Creates an immutable copy of a TextNode.
+
+        :param node: The TextNode to copy.
+        :return: The node itself if it is already frozen, otherwise a copy.
+        """
+        if isinstance(node, FrozenTextNode):
+            return node
+
+        return cls(node.text, node.text_type, node.url)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        """
+        Prevents the attributes of the node from being changed.
+
+        :raise: AttributeError always.
+        """
+        raise AttributeError(f"FrozenTextNode is immutable, cannot set '{name}'.")
+
+    def __delattr__(self, name: str) -> None:
+        """
+        Prevents the attributes of the node from being deleted.
+
+        :raise: AttributeError always.
+        """
+        raise AttributeError(f"FrozenTextNode is immutable, cannot delete '{name}'.")
+
+    def __hash__(self) -> int:
+        """
+        Hashes the node by its properties, which never change.
+        """
+        return hash((self.text, self.text_type, self.url))
+
+
 def text_node_to_html_node(text_node: TextNode) -> LeafNode:
     """
     Converts a Markdown text node to a HTML node (specifically a LeafNode).
@@ -80,3 +143,97 @@ def text_node_to_html_node(text_node: TextNode) -> LeafNode:
             return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
         case _:
             raise ValueError(f"'{text_node.text_type}' is not a valid TextType value.")
+
+
+# Renders a TextNode the same way as its LeafNode from `text_node_to_html_node`.
+_HTML_EMITTERS: dict[TextType, Callable[[TextNode], str]] = {
+    TextType.TEXT: lambda node: escape_value(node.text),
+    TextType.BOLD: lambda node: f"<b>{escape_value(node.text)}</b>",
+    TextType.ITALIC: lambda node: f"<i>{escape_value(node.text)}</i>",
+    TextType.CODE: lambda node: f"<code>{escape_value(node.text)}</code>",
+    TextType.LINK: lambda node: f"<a href=\"{escape_value(node.url)}\">{escape_value(node.text)}</a>",
+    TextType.IMAGE: lambda node: f"<img src=\"{escape_value(node.url)}\" alt=\"{escape_value(node.text)}\"></img>",
+}
+
+
+def iter_text_nodes_html(text_nodes: Iterable[TextNode]) -> Iterator[str]:
+    """
+    Renders TextNodes to HTML fragments without creating their LeafNodes.
+
+    :param text_nodes: The TextNodes to render.
+    :return: An iterator over the HTML of every TextNode, the same as
+        `text_node_to_html_node(node).to_html()`.
+    :raise: ValueError if a TextNode has no text or an invalid type.
+    """
+    emitters: dict[TextType, Callable[[TextNode], str]] = _HTML_EMITTERS
+
+    for node in text_nodes:
+        emit: Callable[[TextNode], str] | None = emitters.get(node.text_type)
+        if emit is None:
+            raise ValueError(f"'{node.text_type}' is not a valid TextType value.")
+        if node.text is None and node.text_type is not TextType.IMAGE:
+            raise ValueError("Elements without children must have a value")
+
+        yield emit(node)
+
+
+def text_nodes_to_html(text_nodes: Iterable[TextNode]) -> str:
+    """
+    Renders a run of TextNodes to HTML without creating their LeafNodes.
+
+    :param text_nodes: The TextNodes to render.
+    :return: The HTML of the TextNodes, the same as joining the output of
+        `text_node_to_html_node(node).to_html()` for every TextNode.
+    :raise: ValueError if a TextNode has no text or an invalid type.
+    """
+    return "".join(iter_text_nodes_html(text_nodes))
+
+
+class InlineNode(LeafNode):
+    """
+    Represents a HTML element that only contains inline Markdown, such as a
+    paragraph or a list item. The TextNodes of its contents are rendered
+    straight to HTML when the element is rendered.
+    """
+
+    __slots__ = ("text_nodes",)
+
+    def __init__(self, tag: str, text_nodes: Iterable[TextNode], props: dict[str, str] = None) -> None:
+        """
+        Instantiates an InlineNode.
+
+        :param tag: The tag of the HTML element.
+        :param text_nodes: The inline contents of the element.
+        :param props: Key-value pairs for attributes (with their values) for a HTML tag.
+        """
+        super().__init__(tag, "", props)
+        self.text_nodes: tuple[TextNode, ...] = tuple(text_nodes)
+
+    def to_html(self) -> str:
+        """
+        Renders the element and its inline contents.
+
+        :return: The same HTML as a ParentNode holding the LeafNodes of the
+            TextNodes, or an empty element if there are no TextNodes.
+        :raise: ValueError if a TextNode has no text or an invalid type.
+        """
+        tag_attr: str = "" if self.props is None else f" {self.props_to_html()}"
+
+        profile: BuildProfile | None = get_profile()
+        if profile is not None:
+            profile.start("inline_html")
+        try:
+            html: str = text_nodes_to_html(self.text_nodes)
+        finally:
+            if profile is not None:
+                profile.stop()
+
+        return f"<{self.tag}{tag_attr}>{html}</{self.tag}>"
+
+    def __repr__(self) -> str:
+        """
+        Returns the string representation for an InlineNode.
+
+        :return: The InlineNode string representation.
+        """
+        return f"InlineNode({self.tag}, {list(self.text_nodes)}, {self.props})"